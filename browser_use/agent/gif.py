@@ -125,11 +125,12 @@ def create_history_gif(
 
 	# Process each history item
 	for i, item in enumerate(history.history, 1):
-		if not item.state.screenshot:
+		screenshot = history.get_screenshot(item)
+		if not screenshot:
 			continue
 
 		# Convert base64 screenshot to PIL Image
-		img_data = base64.b64decode(item.state.screenshot)
+		img_data = base64.b64decode(screenshot)
 		image = Image.open(io.BytesIO(img_data))
 
 		if show_goals and item.model_output:
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import logging
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import get_buffer_string
+
+from browser_use.agent.memory.views import MemoryConfig
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain the procedural memory of a browser automation agent.
+You get the agent's previous memory (if any) followed by its latest steps. Write the updated memory:
+- the task and the progress made so far, step by step, with the concrete results (urls, names, numbers, extracted data)
+- what failed and should not be retried the same way
+- what remains to be done
+Be concise and factual, keep every detail the agent may need later. Reply with the memory only."""
+
+
+def embed_text(text: str, dims: int) -> np.ndarray:
+	"""
+	Unit length hashed bag of words vector of a text (feature hashing of words and word pairs).
+	Needs no embedding model: good enough to recall earlier summaries mentioning the same pages, companies or fields.
+	"""
+	vector = np.zeros(dims, dtype=np.float32)
+	words = re.findall(r'\w+', text.lower())
+	for feature in [*words, *(f'{a} {b}' for a, b in zip(words, words[1:]))]:
+		digest = zlib.crc32(feature.encode())
+		vector[digest % dims] += 1.0 if digest & 0x80000000 else -1.0
+	norm = np.linalg.norm(vector)
+	return vector / norm if norm else vector
+
+
+class NativeMemory:
+	"""
+	Procedural memory backend without mem0, vector store or embedding model.
+
+	Each consolidation asks the LLM to fold the latest messages into the previous memory (a rolling summary).
+	The summaries are kept in a small cosine index, the ones most similar to the latest messages are recalled
+	below the new summary. With MemoryConfig.native_memory_path they are also persisted to that json file and
+	reloaded by later runs, otherwise they only live as long as the agent.
+	"""
+
+	def __init__(self, llm: BaseChatModel, config: MemoryConfig):
+		self.llm = llm
+		self.config = config
+		self.path = Path(config.native_memory_path) if config.native_memory_path else None
+		self.summaries: list[dict] = []
+		self.vectors = np.zeros((0, config.native_embedding_dims), dtype=np.float32)
+		# index of the last summary created by this run, it is part of the messages as the previous memory
+		self._latest: int | None = None
+		self._load()
+
+	def create(self, messages: list[BaseMessage], current_step: int) -> str | None:
+		"""Updated memory for the given messages (the previous memory message first, if any)"""
+		conversation = get_buffer_string(messages)
+		try:
+			response = self.llm.invoke([SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=conversation)])
+		except Exception as e:
+			logger.error(f'Error creating procedural memory: {type(e).__name__}: {e}')
+			return None
+
+		summary = str(response.content).strip()
+		if not summary:
+			return None
+
+		# the latest summary of this run is part of the messages as the previous memory, only recall the others
+		recalled = self.recall(conversation, skip_latest=True)
+		self._add(summary, current_step)
+		if recalled:
+			summary += '\n\nRelated earlier memories:\n' + '\n'.join(f'- step {s["step"]}: {s["summary"]}' for s in recalled)
+		return summary
+
+	def recall(self, text: str, skip_latest: bool = False) -> list[dict]:
+		"""Stored summaries most similar to a text, best first. skip_latest leaves out the last summary of this run."""
+		if not len(self.vectors):
+			return []
+		similarities = self.vectors @ embed_text(text, self.config.native_embedding_dims)
+		if skip_latest and self._latest is not None:
+			similarities[self._latest] = -np.inf
+		best = np.argsort(-similarities)[: self.config.native_recall_top_k]
+		return [self.summaries[i] for i in best if similarities[i] >= self.config.native_recall_min_similarity]
+
+	def _add(self, summary: str, current_step: int) -> None:
+		self.summaries.append({'step': current_step, 'summary': summary})
+		self.vectors = np.vstack([self.vectors, embed_text(summary, self.config.native_embedding_dims)])
+		self._latest = len(self.summaries) - 1
+		self._save()
+
+	def _load(self) -> None:
+		if self.path is None or not self.path.exists():
+			return
+		try:
+			self.summaries = json.loads(self.path.read_text())['summaries']
+		except Exception as e:
+			logger.warning(f'⚠️ Ignoring unreadable procedural memory file {self.path}: {type(e).__name__}: {e}')
+			self.summaries = []
+			return
+		dims = self.config.native_embedding_dims
+		self.vectors = np.array([embed_text(s['summary'], dims) for s in self.summaries], dtype=np.float32).reshape(-1, dims)
+		logger.debug(f'Loaded {len(self.summaries)} procedural memories from {self.path}')
+
+	def _save(self) -> None:
+		if self.path is None:
+			return
+		try:
+			self.path.parent.mkdir(parents=True, exist_ok=True)
+			self.path.write_text(json.dumps({'agent_id': self.config.agent_id, 'summaries': self.summaries}))
+		except Exception as e:
+			logger.warning(f'⚠️ Failed to save procedural memory to {self.path}: {type(e).__name__}: {e}')
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+from typing import TYPE_CHECKING
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import (
@@ -15,6 +17,9 @@ from browser_use.agent.message_manager.service import MessageManager
 from browser_use.agent.message_manager.views import ManagedMessage, MessageMetadata
 from browser_use.utils import time_execution_sync
 
+if TYPE_CHECKING:
+	from browser_use.agent.memory.native import NativeMemory
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +27,8 @@ class Memory:
 	"""
 	Manages procedural memory for agents.
 
-	This class implements a procedural memory management system using Mem0 that transforms agent interaction history
+	This class implements a procedural memory management system using Mem0 (or the lightweight NativeMemory backend,
+	see MemoryConfig.memory_backend) that transforms agent interaction history
 	into concise, structured representations at specified intervals. It serves to optimize context window
 	utilization during extended task execution by converting verbose historical information into compact,
 	yet comprehensive memory constructs that preserve essential operational knowledge.
@@ -33,9 +39,14 @@ class Memory:
 		message_manager: MessageManager,
 		llm: BaseChatModel,
 		config: MemoryConfig | None = None,
+		summary_llm: BaseChatModel | None = None,
 	):
 		self.message_manager = message_manager
 		self.llm = llm
+		self.mem0 = None
+		self.native: NativeMemory | None = None
+		# background procedural memory in progress: (task, messages it replaces, step it was started at)
+		self._pending: tuple[asyncio.Task[str | None], list[ManagedMessage], int] | None = None
 
 		# Initialize configuration with defaults based on the LLM if not provided
 		if config is None:
@@ -60,6 +71,13 @@ class Memory:
 			self.config = MemoryConfig.model_validate(config)  # revalidate using Pydantic
 			self.config.llm_instance = llm
 
+		if self.config.memory_backend == 'native':
+			# summarizes with the page extraction llm (when given), needs no other packages or services
+			from browser_use.agent.memory.native import NativeMemory
+
+			self.native = NativeMemory(llm=summary_llm or llm, config=self.config)
+			return
+
 		# Check for required packages
 		try:
 			# also disable mem0's telemetry when ANONYMIZED_TELEMETRY=False
@@ -86,55 +104,130 @@ class Memory:
 		"""
 		Create a procedural memory if needed based on the current step.
 
+		Blocks until mem0 is done, Agent.step() uses start_procedural_memory() instead.
+
 		Args:
 		    current_step: The current step number of the agent
 		"""
 		logger.debug(f'Creating procedural memory at step {current_step}')
 
-		# Get all messages
-		all_messages = self.message_manager.state.history.messages
+		messages = self._get_messages_to_process()
+		if messages is None:
+			return
+		messages_to_process, messages_to_replace = messages
+		# Create a procedural memory
+		memory_content = self._create([m.message for m in messages_to_process], current_step)
+		self._consolidate(memory_content, messages_to_replace)
+
+	def start_procedural_memory(self, current_step: int) -> None:
+		"""
+		Start creating a procedural memory in a worker thread over a snapshot of the current history.
+		The agent keeps running meanwhile, apply_procedural_memory() splices the result in once it is ready.
+		"""
+		if self._pending is not None:
+			logger.debug(f'Procedural memory from step {self._pending[2]} still in progress, not starting another one')
+			return
+
+		logger.debug(f'Creating procedural memory at step {current_step} in the background')
+		messages = self._get_messages_to_process()
+		if messages is None:
+			return
+		messages_to_process, messages_to_replace = messages
 
-		# Separate messages into those to keep as-is and those to process for memory
-		new_messages = []
-		messages_to_process = []
+		task = asyncio.create_task(asyncio.to_thread(self._create, [m.message for m in messages_to_process], current_step))
+		self._pending = (task, messages_to_replace, current_step)
 
-		for msg in all_messages:
-			if isinstance(msg, ManagedMessage) and msg.metadata.message_type in {'init', 'memory'}:
-				# Keep system and memory messages as they are
-				new_messages.append(msg)
+	def apply_procedural_memory(self) -> None:
+		"""Splice a finished background procedural memory into the history, call at a step boundary"""
+		if self._pending is None or not self._pending[0].done():
+			return
+
+		task, messages_to_replace, current_step = self._pending
+		self._pending = None
+		try:
+			memory_content = task.result()
+		except Exception as e:
+			logger.error(f'Error creating procedural memory from step {current_step}: {type(e).__name__}: {e}')
+			return
+		self._consolidate(memory_content, messages_to_replace)
+
+	def cancel_procedural_memory(self) -> None:
+		"""Drop a background procedural memory still in progress (its thread finishes on its own)"""
+		if self._pending is not None:
+			self._pending[0].cancel()
+			self._pending = None
+
+	@property
+	def _kept_message_types(self) -> set[str]:
+		"""
+		Message types never consolidated, the native backend folds the previous memory into the new one.
+		The kept screenshot (skip_unchanged_screenshots) is not summarized either.
+		"""
+		return {'init', 'screenshot'} if self.native else {'init', 'memory', 'screenshot'}
+
+	def _get_messages_to_process(self) -> tuple[list[ManagedMessage], list[ManagedMessage]] | None:
+		"""
+		Messages to consolidate into a procedural memory and the messages the memory replaces, or None if there are not
+		enough of them. The replaced messages also include the ones without content (model output tool calls and their
+		empty tool responses), only system and memory messages and the native backend's recent window are kept.
+		"""
+		# Keep system and memory messages as they are
+		messages_to_replace = [
+			msg
+			for msg in self.message_manager.state.history.messages
+			if msg.metadata.message_type not in self._kept_message_types
+		]
+		messages_to_process = [msg for msg in messages_to_replace if len(msg.message.content) > 0]
+		if self.native and self.config.native_window:
+			# the most recent messages stay verbatim, along with the tool calls between them
+			if len(messages_to_process) <= self.config.native_window:
+				messages_to_process = []
 			else:
-				if len(msg.message.content) > 0:
-					messages_to_process.append(msg)
+				first_kept = messages_to_replace.index(messages_to_process[-self.config.native_window])
+				while first_kept > 0 and not messages_to_replace[first_kept - 1].message.content:
+					first_kept -= 1
+				messages_to_process = messages_to_process[: -self.config.native_window]
+				messages_to_replace = messages_to_replace[:first_kept]
 
 		# Need at least 2 messages to create a meaningful summary
 		if len(messages_to_process) <= 1:
 			logger.debug('Not enough non-memory messages to summarize')
-			return
-		# Create a procedural memory
-		memory_content = self._create([m.message for m in messages_to_process], current_step)
+			return None
+		return messages_to_process, messages_to_replace
 
+	def _consolidate(self, memory_content: str | None, messages_to_replace: list[ManagedMessage]) -> None:
+		"""
+		Replace the messages with the consolidated memory, placed after the system and memory messages.
+		Messages that were not replaced (added while the memory was created, or kept verbatim) stay after it, in order.
+		"""
 		if not memory_content:
 			logger.warning('Failed to create procedural memory')
 			return
 
-		# Replace the processed messages with the consolidated memory
+		history = self.message_manager.state.history
+		replaced_ids = {id(m) for m in messages_to_replace}
+		kept_types = self._kept_message_types
+		kept_messages = [m for m in history.messages if m.metadata.message_type in kept_types]
+		newer_messages = [m for m in history.messages if m.metadata.message_type not in kept_types and id(m) not in replaced_ids]
+
 		memory_message = HumanMessage(content=memory_content)
 		memory_tokens = self.message_manager._count_tokens(memory_message)
 		memory_metadata = MessageMetadata(tokens=memory_tokens, message_type='memory')
 
-		# Calculate the total tokens being removed
-		removed_tokens = sum(m.metadata.tokens for m in messages_to_process)
-
-		# Add the memory message
-		new_messages.append(ManagedMessage(message=memory_message, metadata=memory_metadata))
+		# Calculate the total tokens being removed (some replaced messages may already be gone, e.g. state messages)
+		removed_messages = [m for m in history.messages if id(m) in replaced_ids]
+		removed_tokens = sum(m.metadata.tokens for m in removed_messages)
 
 		# Update the history
-		self.message_manager.state.history.messages = new_messages
-		self.message_manager.state.history.current_tokens -= removed_tokens
-		self.message_manager.state.history.current_tokens += memory_tokens
-		logger.info(f'Messages consolidated: {len(messages_to_process)} messages converted to procedural memory')
+		history.messages = [*kept_messages, ManagedMessage(message=memory_message, metadata=memory_metadata), *newer_messages]
+		history.current_tokens -= removed_tokens
+		history.current_tokens += memory_tokens
+		logger.info(f'Messages consolidated: {len(removed_messages)} messages converted to procedural memory')
 
 	def _create(self, messages: list[BaseMessage], current_step: int) -> str | None:
+		if self.native:
+			return self.native.create(messages, current_step)
+
 		parsed_messages = convert_to_openai_messages(messages)
 		try:
 			results = self.mem0.add(
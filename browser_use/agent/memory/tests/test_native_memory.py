@@ -0,0 +1,70 @@
+import numpy as np
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+
+from browser_use.agent.memory.native import NativeMemory, embed_text
+from browser_use.agent.memory.views import MemoryConfig
+
+
+def make_native(tmp_path=None, responses: list[str] | None = None, **config) -> NativeMemory:
+	memory_config = MemoryConfig(
+		memory_backend='native', native_memory_path=str(tmp_path / 'memory.json') if tmp_path else None, **config
+	)
+	return NativeMemory(llm=FakeListChatModel(responses=responses or ['summary']), config=memory_config)
+
+
+def test_embed_text():
+	vector = embed_text('Open the LinkedIn jobs page', 64)
+
+	assert vector.shape == (64,)
+	assert np.isclose(np.linalg.norm(vector), 1)
+	assert np.array_equal(vector, embed_text('open the linkedin JOBS page', 64))
+	assert not embed_text('', 64).any()
+
+	related = embed_text('Applied to the data engineer job on the LinkedIn jobs page', 512)
+	unrelated = embed_text('Weather forecast for Madrid tomorrow', 512)
+	query = embed_text('LinkedIn data engineer job', 512)
+	assert query @ related > query @ unrelated
+
+
+def test_recall_best_first_within_top_k_and_min_similarity():
+	native = make_native(native_recall_top_k=2, native_recall_min_similarity=0.2)
+	native._add('Searched LinkedIn for data engineer jobs in Madrid', 1)
+	native._add('Applied to the Acme data engineer job', 2)
+	native._add('Weather forecast checked for tomorrow', 3)
+
+	recalled = native.recall('Acme data engineer job application')
+	assert [s['step'] for s in recalled] == [2, 1]
+	assert native.recall('completely different words here') == []
+	# the last summary of this run is skipped
+	assert [s['step'] for s in native.recall('Weather forecast tomorrow', skip_latest=True)] == []
+
+
+def test_summaries_are_not_persisted_by_default(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	native = make_native()
+	native.create([HumanMessage(content='Action result: opened jobs page')], current_step=1)
+
+	assert native.path is None
+	assert list(tmp_path.iterdir()) == []
+
+
+def test_persisted_summaries_round_trip(tmp_path):
+	native = make_native(tmp_path)
+	native._add('Searched LinkedIn for data engineer jobs', 1)
+	native._add('Applied to the Acme data engineer job', 2)
+
+	reloaded = make_native(tmp_path, responses=['Applied to more data engineer jobs'])
+	assert reloaded.summaries == native.summaries
+	assert np.allclose(reloaded.vectors, native.vectors)
+
+	# summaries of an earlier run are recalled, only this run's latest one is skipped
+	memory = reloaded.create([HumanMessage(content='Applied to the Acme data engineer job')], current_step=3)
+	assert memory.startswith('Applied to more data engineer jobs')
+	assert '- step 2: Applied to the Acme data engineer job' in memory
+	assert len(make_native(tmp_path).summaries) == 3
+
+
+def test_unreadable_file_is_ignored(tmp_path):
+	(tmp_path / 'memory.json').write_text('not json')
+	assert make_native(tmp_path).summaries == []
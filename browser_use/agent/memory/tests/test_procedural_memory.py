@@ -0,0 +1,84 @@
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from browser_use.agent.memory import Memory, MemoryConfig
+from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
+from browser_use.agent.message_manager.views import MessageManagerState
+
+
+def make_message_manager(steps: int) -> MessageManager:
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='Test actions'),
+		settings=MessageManagerSettings(),
+		state=MessageManagerState(),
+	)
+	for step in range(steps):
+		tool_call = {'name': 'AgentOutput', 'args': {'step': step}, 'id': str(step), 'type': 'tool_call'}
+		message_manager._add_message_with_tokens(AIMessage(content='', tool_calls=[tool_call]))
+		message_manager.add_tool_message(content='')
+		message_manager._add_message_with_tokens(HumanMessage(content=f'Action result: step {step}'))
+	return message_manager
+
+
+def make_memory(message_manager: MessageManager, tmp_path, **config) -> Memory:
+	llm = FakeListChatModel(responses=['SUMMARY'])
+	memory_config = MemoryConfig(memory_backend='native', native_memory_path=str(tmp_path / 'memory.json'), **config)
+	return Memory(message_manager=message_manager, llm=llm, config=memory_config)
+
+
+def contents(message_manager: MessageManager) -> list:
+	return [m.message.content for m in message_manager.state.history.messages]
+
+
+def test_consolidation_drops_model_outputs(tmp_path):
+	message_manager = make_message_manager(steps=3)
+	init_messages = [m.message.content for m in message_manager.state.history.messages if m.metadata.message_type == 'init']
+	memory = make_memory(message_manager, tmp_path, native_window=0)
+
+	memory.create_procedural_memory(current_step=3)
+
+	assert contents(message_manager) == [*init_messages, 'SUMMARY']
+	history = message_manager.state.history
+	assert history.current_tokens == sum(m.metadata.tokens for m in history.messages)
+
+
+def test_consolidation_with_mem0_semantics_keeps_memory_messages(tmp_path):
+	message_manager = make_message_manager(steps=3)
+	init_messages = [m.message.content for m in message_manager.state.history.messages if m.metadata.message_type == 'init']
+	memory = make_memory(message_manager, tmp_path, native_window=0)
+	# mem0 backend behaviour without mem0's embedder: memory messages are kept, everything else is replaced
+	memory.native = None
+	memory._create = lambda messages, current_step: f'SUMMARY {current_step}'
+
+	memory.create_procedural_memory(current_step=3)
+	assert contents(message_manager) == [*init_messages, 'SUMMARY 3']
+
+
+def test_native_window_keeps_recent_steps_with_their_tool_calls(tmp_path):
+	message_manager = make_message_manager(steps=3)
+	messages = list(message_manager.state.history.messages)
+	memory = make_memory(message_manager, tmp_path, native_window=1)
+
+	memory.create_procedural_memory(current_step=3)
+
+	# the last result stays verbatim, the last model output before it too
+	kept = message_manager.state.history.messages
+	assert kept[-1] is messages[-1]
+	assert kept[-2] is messages[-2]
+	assert kept[-3] is messages[-3]
+	assert kept[-4].message.content.startswith('SUMMARY')
+	assert not any(m is messages[-4] or m is messages[-6] for m in kept)
+
+
+async def test_background_memory_keeps_messages_added_meanwhile(tmp_path):
+	message_manager = make_message_manager(steps=3)
+	init_messages = [m.message.content for m in message_manager.state.history.messages if m.metadata.message_type == 'init']
+	memory = make_memory(message_manager, tmp_path, native_window=0)
+
+	memory.start_procedural_memory(current_step=3)
+	message_manager._add_message_with_tokens(HumanMessage(content='Action result: step 3'))
+	await memory._pending[0]
+	memory.apply_procedural_memory()
+
+	assert contents(message_manager) == [*init_messages, 'SUMMARY', 'Action result: step 3']
@@ -15,6 +15,21 @@ class MemoryConfig(BaseModel):
 	agent_id: str = Field(default='browser_use_agent', min_length=1)
 	memory_interval: int = Field(default=10, gt=1, lt=100)
 
+	# Backend: mem0 (vector store + embedder) or native (rolling LLM summary + local cosine index, no extra services)
+	memory_backend: Literal['mem0', 'native'] = 'mem0'
+
+	# Native backend settings
+	native_window: int = Field(
+		default=4, ge=0, description='Most recent messages kept verbatim, older ones are folded into the summary.'
+	)
+	native_recall_top_k: int = Field(default=3, ge=0, description='Earlier summaries recalled below the new one.')
+	native_recall_min_similarity: float = Field(default=0.2, ge=0, le=1)
+	native_embedding_dims: int = Field(default=512, gt=10, lt=10000)
+	native_memory_path: str | None = Field(
+		default=None,
+		description='Optional: json file the summaries are persisted to and reloaded from, use one file per task. Not persisted by default.',
+	)
+
 	# Embedder settings
 	embedder_provider: Literal['openai', 'gemini', 'ollama', 'huggingface'] = 'huggingface'
 	embedder_model: str = Field(min_length=2, default='all-MiniLM-L6-v2')
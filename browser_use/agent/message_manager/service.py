@@ -13,8 +13,10 @@ from langchain_core.messages import (
 )
 from pydantic import BaseModel
 
-from browser_use.agent.message_manager.views import MessageMetadata
-from browser_use.agent.prompts import AgentMessagePrompt
+from browser_use.agent.message_manager.tokenizers import Tokenizer, get_tokenizer
+from browser_use.agent.message_manager.utils import format_elements_delta, get_element_entries
+from browser_use.agent.message_manager.views import ElementsSnapshot, MessageMetadata
+from browser_use.agent.prompts import AgentMessagePrompt, get_screenshot_mime_type
 from browser_use.agent.views import ActionResult, AgentOutput, AgentStepInfo, MessageManagerState
 from browser_use.browser.views import BrowserStateSummary
 from browser_use.utils import time_execution_sync
@@ -183,11 +185,30 @@ def _log_format_message_line(
 # ========== End of Logging Helper Functions ==========
 
 
+# Rough size of the state message without the interactive elements (url, tabs, step info, action results)
+STATE_MESSAGE_OVERHEAD_TOKENS = 1000
+
+
 class MessageManagerSettings(BaseModel):
 	max_input_tokens: int = 128000
 	estimated_characters_per_token: int = 3
+	# picks the tokenizer used to count tokens, see tokenizers.get_tokenizer()
+	model_name: str | None = None
 	image_tokens: int = 800
 	include_attributes: list[str] = []
+	# cap on the tokens of the interactive elements in each state message, None = only limited by max_input_tokens
+	max_elements_tokens: int | None = None
+	# floor on that budget when the history is close to max_input_tokens, enough for the elements on screen
+	min_elements_tokens: int = 2000
+	# send only the changes to the interactive elements while the url stays the same, with a full dump every N steps
+	dom_delta_messages: bool = False
+	dom_delta_full_dump_interval: int = 10
+	# keep the last screenshot in the history, state messages of unchanged screens refer to it instead of attaching it again
+	skip_unchanged_screenshots: bool = False
+	# keep the history append-only so providers can reuse the prompt prefix, volatile text goes into the state message
+	prompt_cache_layout: bool = False
+	# mark the end of the stable prefix with cache_control breakpoints (anthropic)
+	cache_control_markers: bool = False
 	message_context: str | None = None
 	# Support both old format {key: value} and new format {domain: {key: value}}
 	sensitive_data: dict[str, str | dict[str, str]] | None = None
@@ -201,11 +222,13 @@ class MessageManager:
 		system_message: SystemMessage,
 		settings: MessageManagerSettings = MessageManagerSettings(),
 		state: MessageManagerState = MessageManagerState(),
+		tokenizer: Tokenizer | None = None,
 	):
 		self.task = task
 		self.settings = settings
 		self.state = state
 		self.system_prompt = system_message
+		self.tokenizer = tokenizer or get_tokenizer(settings.model_name, settings.estimated_characters_per_token)
 
 		# Only initialize messages if state is empty
 		if len(self.state.history.messages) == 0:
@@ -289,8 +312,10 @@ class MessageManager:
 		result: list[ActionResult] | None = None,
 		step_info: AgentStepInfo | None = None,
 		use_vision=True,
+		screenshot_unchanged: bool = False,
+		page_actions: str | None = None,
 	) -> None:
-		"""Add browser state as human message"""
+		"""Add browser state as human message, page_actions is appended to it (not kept in the history)"""
 
 		# if keep in memory, add to directly to history and add state without result
 		if result:
@@ -311,14 +336,111 @@ class MessageManager:
 
 		# otherwise add state message and result to next message (which will not stay in memory)
 		assert browser_state_summary
+		screenshot_in_history = False
+		if use_vision and self.settings.skip_unchanged_screenshots and browser_state_summary.screenshot:
+			if not screenshot_unchanged or not self.state.history.has_message_of_type('screenshot'):
+				self._add_screenshot_message(browser_state_summary)
+			screenshot_in_history = True
+
+		# a screenshot in the history is already part of current_tokens
+		max_elements_tokens = self._get_elements_token_budget(browser_state_summary, use_vision and not screenshot_in_history)
+		elements_text = None
+		if self.settings.dom_delta_messages:
+			elements_text = self._get_elements_delta(browser_state_summary, max_elements_tokens)
+
 		state_message = AgentMessagePrompt(
 			browser_state_summary=browser_state_summary,
 			result=result,
 			include_attributes=self.settings.include_attributes,
 			step_info=step_info,
+			max_elements_tokens=max_elements_tokens,
+			characters_per_token=self.settings.estimated_characters_per_token,
+			elements_text=elements_text,
+			screenshot_in_history=screenshot_in_history,
+			screenshot_unchanged=screenshot_unchanged,
 		).get_user_message(use_vision)
+		if page_actions:
+			if isinstance(state_message.content, list):
+				state_message.content.append({'type': 'text', 'text': page_actions})
+			else:
+				state_message.content += '\n' + page_actions
 		self._add_message_with_tokens(state_message)
 
+	def _add_screenshot_message(self, browser_state_summary: BrowserStateSummary) -> None:
+		"""
+		Keep the screenshot in a message that stays in the history (replacing the previous one), state messages are
+		removed after every step. Steps whose screen did not change refer to it instead of attaching the image again.
+		"""
+		self.state.history.remove_messages_of_type('screenshot')
+		screenshot = browser_state_summary.screenshot
+		screenshot_message = HumanMessage(
+			content=[
+				{'type': 'text', 'text': f'Screenshot of {browser_state_summary.url}:'},
+				{'type': 'image_url', 'image_url': {'url': f'data:{get_screenshot_mime_type(screenshot)};base64,{screenshot}'}},
+			]
+		)
+		self._add_message_with_tokens(screenshot_message, message_type='screenshot')
+
+	def _get_elements_token_budget(self, browser_state_summary: BrowserStateSummary, use_vision: bool) -> int:
+		"""
+		Tokens left for the interactive elements, so cut_messages() does not have to truncate the state message.
+		Never less than min_elements_tokens: without elements to act on, the agent is stuck however short the history.
+		"""
+		budget = self.settings.max_input_tokens - self.state.history.current_tokens - STATE_MESSAGE_OVERHEAD_TOKENS
+		if use_vision and browser_state_summary.screenshot:
+			budget -= self.settings.image_tokens
+		budget = max(budget, self.settings.min_elements_tokens)
+		if self.settings.max_elements_tokens is not None:
+			budget = min(budget, self.settings.max_elements_tokens)
+		return budget
+
+	def _get_elements_delta(self, browser_state_summary: BrowserStateSummary, max_elements_tokens: int) -> str:
+		"""
+		Interactive elements text for the state message in delta mode.
+
+		State messages are removed from the history after every step, so the full element list is
+		added as a separate message that stays in the history (replacing the previous one). The
+		following state messages of the same url only list the changes to it. A new full dump is
+		sent after navigation, every `dom_delta_full_dump_interval` steps, when the dump was dropped
+		from the history (e.g. by procedural memory) or when the changes are longer than the full list.
+		"""
+		element_tree = browser_state_summary.element_tree
+		lines, line_nodes = element_tree.clickable_element_lines(self.settings.include_attributes)
+		entries = get_element_entries(lines, line_nodes)
+
+		snapshot = self.state.elements_snapshot
+		if (
+			snapshot is not None
+			and snapshot.url == browser_state_summary.url
+			and snapshot.steps_since < self.settings.dom_delta_full_dump_interval
+			and self.state.history.has_message_of_type('elements_snapshot')
+		):
+			current_lines = {key: line.lstrip('\t') for key, line in zip(entries, lines)}
+			delta = format_elements_delta(snapshot.entries, entries, current_lines)
+			if len(delta) < sum(len(line) for line in lines):
+				snapshot.steps_since += 1
+				return delta
+
+		elements_text = element_tree.clickable_elements_to_string(
+			include_attributes=self.settings.include_attributes,
+			max_tokens=max_elements_tokens,
+			characters_per_token=self.settings.estimated_characters_per_token,
+		)
+		# only the lines that made it into the dump (within the token budget) are known to the LLM
+		sent_lines = set(elements_text.split('\n'))
+		self.state.elements_snapshot = ElementsSnapshot(
+			url=browser_state_summary.url,
+			entries={key: entry for (key, entry), line in zip(entries.items(), lines) if line in sent_lines},
+		)
+
+		self.state.history.remove_messages_of_type('elements_snapshot')
+		snapshot_message = HumanMessage(
+			content=f'Interactive elements of {browser_state_summary.url} (the next steps on this page only list the changes):\n'
+			+ (elements_text or 'empty page')
+		)
+		self._add_message_with_tokens(snapshot_message, message_type='elements_snapshot')
+		return 'See the interactive elements above.'
+
 	def add_model_output(self, model_output: AgentOutput) -> None:
 		"""Add model output as AI message"""
 		tool_calls = [
@@ -385,8 +507,35 @@ class MessageManager:
 		# Log message history for debugging
 		logger.debug(self._log_history_lines())
 
+		if self.settings.cache_control_markers:
+			msg = self._add_cache_control_markers(msg)
+
 		return msg
 
+	def _add_cache_control_markers(self, messages: list[BaseMessage]) -> list[BaseMessage]:
+		"""
+		Copy of the messages with cache_control breakpoints on the system prompt and on the last human message of the
+		history before the state message: everything up to there is the same in the next step.
+		"""
+		breakpoints = [0]
+		for i in range(len(messages) - 2, 0, -1):
+			if isinstance(messages[i], HumanMessage):
+				breakpoints.append(i)
+				break
+
+		messages = list(messages)
+		for i in breakpoints:
+			message = messages[i]
+			if isinstance(message.content, str):
+				content = [{'type': 'text', 'text': message.content}]
+			else:
+				content = [dict(item) if isinstance(item, dict) else {'type': 'text', 'text': item} for item in message.content]
+			if not content:
+				continue
+			content[-1]['cache_control'] = {'type': 'ephemeral'}
+			messages[i] = message.model_copy(update={'content': content})
+		return messages
+
 	def _add_message_with_tokens(
 		self, message: BaseMessage, position: int | None = None, message_type: str | None = None
 	) -> None:
@@ -462,8 +611,7 @@ class MessageManager:
 
 	def _count_text_tokens(self, text: str) -> int:
 		"""Count tokens in a text string"""
-		tokens = len(text) // self.settings.estimated_characters_per_token  # Rough estimate if no tokenizer available
-		return tokens
+		return self.tokenizer.count(text)
 
 	def cut_messages(self):
 		"""Get current message list, potentially trimmed to max tokens"""
@@ -4,6 +4,7 @@ from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_openai import AzureChatOpenAI, ChatOpenAI
 
 from browser_use.agent.message_manager.service import MessageManager, MessageManagerSettings
+from browser_use.agent.message_manager.views import MessageManagerState
 from browser_use.agent.views import ActionResult
 from browser_use.browser.views import BrowserStateSummary, TabInfo
 from browser_use.dom.views import DOMElementNode, DOMTextNode
@@ -234,4 +235,233 @@ def test_token_overflow_handling_with_real_flow(message_manager: MessageManager,
 		assert message_manager.state.history.current_tokens == total_tokens
 
 
+def test_unchanged_screenshot_refers_to_the_kept_screenshot():
+	"""With skip_unchanged_screenshots the last screenshot stays in the history, unchanged screens refer to it"""
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='Test actions'),
+		settings=MessageManagerSettings(skip_unchanged_screenshots=True),
+		state=MessageManagerState(),
+	)
+
+	def state(screenshot: str) -> BrowserStateSummary:
+		return BrowserStateSummary(
+			url='https://test.com',
+			title='Test Page',
+			element_tree=DOMElementNode(tag_name='div', attributes={}, children=[], is_visible=True, parent=None, xpath='//div'),
+			selector_map={},
+			tabs=[TabInfo(page_id=1, url='https://test.com', title='Test Page')],
+			screenshot=screenshot,
+		)
+
+	def screenshot_messages() -> list:
+		return [m.message for m in message_manager.state.history.messages if m.metadata.message_type == 'screenshot']
+
+	message_manager.add_state_message(browser_state_summary=state('iVBORw0KGgoAAAA'))
+	state_message = message_manager.get_messages()[-1]
+	assert isinstance(state_message.content, str)
+	assert 'the last screenshot above shows the current screen' in state_message.content
+	assert len(screenshot_messages()) == 1
+	# the agent removes the state message after every step, the screenshot stays
+	message_manager._remove_last_state_message()
+
+	message_manager.add_state_message(browser_state_summary=state('iVBORw0KGgoAAAA'), screenshot_unchanged=True)
+	assert 'the screen did not change' in message_manager.get_messages()[-1].content
+	assert len(screenshot_messages()) == 1
+	message_manager._remove_last_state_message()
+
+	# a changed screen replaces the kept screenshot
+	message_manager.add_state_message(browser_state_summary=state('iVBORw0KGgoBBBB'))
+	assert len(screenshot_messages()) == 1
+	assert 'iVBORw0KGgoBBBB' in screenshot_messages()[0].content[1]['image_url']['url']
+
+	# unchanged, but the kept screenshot is gone (e.g. cut from the history): attach it again
+	message_manager._remove_last_state_message()
+	message_manager.state.history.remove_messages_of_type('screenshot')
+	message_manager.add_state_message(browser_state_summary=state('iVBORw0KGgoBBBB'), screenshot_unchanged=True)
+	assert len(screenshot_messages()) == 1
+	assert message_manager.state.history.current_tokens == sum(m.metadata.tokens for m in message_manager.state.history.messages)
+
+
+def test_cache_control_markers():
+	"""Breakpoints go on the system prompt and the last human message before the state message, without mutating them"""
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='Test actions'),
+		settings=MessageManagerSettings(),
+		state=MessageManagerState(),
+	)
+	image = {'type': 'image_url', 'image_url': {'url': 'data:image/png;base64,iVBOR'}}
+	messages = [
+		SystemMessage(content='system'),
+		HumanMessage(content='task'),
+		HumanMessage(content=[{'type': 'text', 'text': 'result'}, image]),
+		AIMessage(content='plan'),
+		HumanMessage(content='state'),
+	]
+	originals = [m.model_copy(deep=True) for m in messages]
+
+	marked = message_manager._add_cache_control_markers(messages)
+
+	assert marked[0].content == [{'type': 'text', 'text': 'system', 'cache_control': {'type': 'ephemeral'}}]
+	assert marked[2].content == [{'type': 'text', 'text': 'result'}, {**image, 'cache_control': {'type': 'ephemeral'}}]
+	# the task message, the AI message and the state message are left as they are
+	assert [marked[i] for i in (1, 3, 4)] == [messages[i] for i in (1, 3, 4)]
+	assert messages == originals
+
+
+def test_tokenizer_memoizes_counts_and_falls_back_to_estimate(monkeypatch):
+	import sys
+	from types import SimpleNamespace
+
+	from browser_use.agent.message_manager.tokenizers import CachedTokenizer, EstimateTokenizer, get_tokenizer
+
+	class CountingTokenizer(EstimateTokenizer):
+		calls = 0
+
+		def count(self, text: str) -> int:
+			self.calls += 1
+			return super().count(text)
+
+	tokenizer = CachedTokenizer(CountingTokenizer(3), max_entries=2)
+	assert tokenizer.count('a' * 30) == 10
+	assert tokenizer.count('a' * 30) == 10
+	assert tokenizer.tokenizer.calls == 1
+	tokenizer.count('b')
+	tokenizer.count('c')
+	assert len(tokenizer._counts) == 2
+
+	# unknown models use the length based estimate
+	assert get_tokenizer('claude-3-5-sonnet-20240620', 3).count('a' * 30) == 10
+
+	# openai models count with their tiktoken encoding
+	encodings = []
+
+	def get_encoding(name: str):
+		encodings.append(name)
+		return SimpleNamespace(encode=lambda text, disallowed_special: text.split())
+
+	monkeypatch.setitem(sys.modules, 'tiktoken', SimpleNamespace(get_encoding=get_encoding))
+	assert get_tokenizer('gpt-4o-mini', 3).count('hello big world') == 3
+	assert get_tokenizer('gpt-4-turbo', 3).count('hello world') == 2
+	assert encodings == ['o200k_base', 'cl100k_base']
+
+	# and fall back to the estimate if the encoding can't be loaded
+	monkeypatch.setitem(sys.modules, 'tiktoken', None)
+	assert get_tokenizer('gpt-4o', 3).count('a' * 30) == 10
+
+
+def test_elements_token_budget_keeps_a_floor():
+	"""A history close to max_input_tokens still leaves room for the elements on screen"""
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='Test actions'),
+		settings=MessageManagerSettings(max_input_tokens=10_000, min_elements_tokens=2000),
+		state=MessageManagerState(),
+	)
+	state = BrowserStateSummary(
+		url='https://test.com',
+		title='Test Page',
+		element_tree=DOMElementNode(tag_name='div', attributes={}, children=[], is_visible=True, parent=None, xpath='//div'),
+		selector_map={},
+		tabs=[],
+	)
+	assert message_manager._get_elements_token_budget(state, use_vision=False) > 2000
+
+	message_manager._add_message_with_tokens(HumanMessage(content='x' * 3 * 9_000))
+	assert message_manager._get_elements_token_budget(state, use_vision=False) == 2000
+
+	# an explicit cap still wins
+	message_manager.settings.max_elements_tokens = 500
+	assert message_manager._get_elements_token_budget(state, use_vision=False) == 500
+
+
+def test_element_entries_and_delta():
+	from types import SimpleNamespace
+
+	from browser_use.agent.message_manager.utils import format_elements_delta, get_element_entries
+
+	def entries(*elements: tuple[str, str]):
+		lines = [f'[{i}]<{xpath} >{text} />' for i, (xpath, text) in enumerate(elements)] + ['Some text', 'Some text']
+		nodes = [SimpleNamespace(xpath=xpath) for xpath, _ in elements] + [SimpleNamespace(), SimpleNamespace()]
+		return get_element_entries(lines, nodes), {key: line for key, line in zip(get_element_entries(lines, nodes), lines)}
+
+	previous, _ = entries(('button', 'Search'), ('a', 'Job A'), ('a2', 'Job B'))
+	assert list(previous) == ['xpath:button', 'xpath:a', 'xpath:a2', 'text:Some text', 'text:Some text#2']
+	assert previous['xpath:a'] == (1, '<a >Job A />')
+	assert previous['text:Some text'] == (None, 'Some text')
+
+	same, same_lines = entries(('button', 'Search'), ('a', 'Job A'), ('a2', 'Job B'))
+	assert format_elements_delta(previous, same, same_lines) == 'No changes to the interactive elements above.'
+
+	# Job A removed (Job B moves to its index), Search changed, a new link added
+	current, current_lines = entries(('button', 'Search jobs'), ('a2', 'Job B'), ('a3', 'Job C'))
+	delta = format_elements_delta(previous, current, current_lines).split('\n')
+	assert delta[1:5] == [
+		'+ [2]<a3 >Job C />',
+		'~ [0]<button >Search jobs />',
+		'- <a >Job A />',
+		'Unchanged elements with a new index (old->new): 2->1',
+	]
+
+
+def test_dom_delta_messages():
+	from browser_use.dom.views import DOMTextNode
+
+	message_manager = MessageManager(
+		task='Test task',
+		system_message=SystemMessage(content='Test actions'),
+		settings=MessageManagerSettings(dom_delta_messages=True, dom_delta_full_dump_interval=2),
+		state=MessageManagerState(),
+	)
+
+	# enough elements for the changes to be shorter than the full list
+	filler = [f'Saved search number {i}' for i in range(20)]
+
+	def state(url: str, *buttons: str) -> BrowserStateSummary:
+		body = DOMElementNode(tag_name='body', xpath='/body', attributes={}, children=[], is_visible=True, parent=None)
+		for i, text in enumerate([*buttons, *filler]):
+			button = DOMElementNode(
+				tag_name='button',
+				xpath=f'/body/button[{text}]',
+				attributes={},
+				children=[],
+				is_visible=True,
+				is_top_element=True,
+				highlight_index=i,
+				parent=body,
+			)
+			button.children.append(DOMTextNode(text=text, is_visible=True, parent=button))
+			body.children.append(button)
+		return BrowserStateSummary(url=url, title='', element_tree=body, selector_map={}, tabs=[])
+
+	def step(browser_state_summary: BrowserStateSummary) -> str:
+		message_manager.add_state_message(browser_state_summary=browser_state_summary)
+		content = message_manager.get_messages()[-1].content
+		message_manager._remove_last_state_message()
+		return content
+
+	def snapshots() -> list[str]:
+		return [
+			m.message.content for m in message_manager.state.history.messages if m.metadata.message_type == 'elements_snapshot'
+		]
+
+	assert 'See the interactive elements above.' in step(state('https://a.com', 'Search', 'Next'))
+	assert len(snapshots()) == 1 and '[1]<button >Next />' in snapshots()[0]
+
+	# the changes are relative to the full dump in the history
+	assert 'No changes to the interactive elements above.' in step(state('https://a.com', 'Search', 'Next'))
+	assert '+ [2]<button >Apply />' in step(state('https://a.com', 'Search', 'Next', 'Apply'))
+
+	# a new full dump after dom_delta_full_dump_interval delta steps, replacing the previous one
+	assert 'See the interactive elements above.' in step(state('https://a.com', 'Search', 'Next', 'Apply'))
+	assert len(snapshots()) == 1 and '[2]<button >Apply />' in snapshots()[0]
+
+	# and after navigation
+	assert 'See the interactive elements above.' in step(state('https://b.com', 'Search', 'Next', 'Apply'))
+	assert len(snapshots()) == 1 and snapshots()[0].startswith('Interactive elements of https://b.com')
+	history = message_manager.state.history
+	assert history.current_tokens == sum(m.metadata.tokens for m in history.messages)
+
+
 # pytest -s browser_use/agent/message_manager/tests.py
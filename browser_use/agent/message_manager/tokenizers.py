@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+
+class Tokenizer(Protocol):
+	def count(self, text: str) -> int: ...
+
+
+class EstimateTokenizer:
+	"""Rough estimate from the text length, for models without a public tokenizer"""
+
+	def __init__(self, characters_per_token: int = 3):
+		self.characters_per_token = characters_per_token
+
+	def count(self, text: str) -> int:
+		return len(text) // self.characters_per_token
+
+
+class TiktokenTokenizer:
+	"""Exact token counts for OpenAI models, falls back to the estimate if tiktoken or its encoding files are not available"""
+
+	def __init__(self, encoding_name: str, fallback: Tokenizer):
+		self.encoding_name = encoding_name
+		self.fallback = fallback
+		self._encoding = None
+		self._failed = False
+
+	def count(self, text: str) -> int:
+		if self._encoding is None and not self._failed:
+			try:
+				import tiktoken
+
+				self._encoding = tiktoken.get_encoding(self.encoding_name)
+			except Exception as e:
+				# tiktoken downloads the encoding files on first use
+				logger.warning(
+					f'⚠️ Could not load the {self.encoding_name} tokenizer, estimating token counts instead: {type(e).__name__}'
+				)
+				self._failed = True
+
+		if self._encoding is None:
+			return self.fallback.count(text)
+		return len(self._encoding.encode(text, disallowed_special=()))
+
+
+class CachedTokenizer:
+	"""Memoizes token counts by content hash, so messages sent again (history, repeated results) are not re-tokenized"""
+
+	def __init__(self, tokenizer: Tokenizer, max_entries: int = 4096):
+		self.tokenizer = tokenizer
+		self.max_entries = max_entries
+		self._counts: OrderedDict[bytes, int] = OrderedDict()
+
+	def count(self, text: str) -> int:
+		key = hashlib.blake2b(text.encode(), digest_size=16).digest()
+		if key in self._counts:
+			self._counts.move_to_end(key)
+			return self._counts[key]
+
+		tokens = self.tokenizer.count(text)
+		self._counts[key] = tokens
+		if len(self._counts) > self.max_entries:
+			self._counts.popitem(last=False)
+		return tokens
+
+
+# model name pattern -> tokenizer factory (characters_per_token for the estimate fallback), first match wins
+TOKENIZERS: list[tuple[re.Pattern, Callable[[int], Tokenizer]]] = [
+	(re.compile(r'^(gpt-4o|gpt-4\.1|gpt-4\.5|o1|o3|o4)'), lambda cpt: TiktokenTokenizer('o200k_base', EstimateTokenizer(cpt))),
+	(re.compile(r'^(gpt-4|gpt-3\.5)'), lambda cpt: TiktokenTokenizer('cl100k_base', EstimateTokenizer(cpt))),
+]
+
+
+def register_tokenizer(model_pattern: str, factory: Callable[[int], Tokenizer]) -> None:
+	"""Use a tokenizer for models matching a regex, e.g. a HuggingFace tokenizer for a local model family"""
+	TOKENIZERS.insert(0, (re.compile(model_pattern), factory))
+
+
+def get_tokenizer(model_name: str | None, characters_per_token: int = 3) -> CachedTokenizer:
+	"""Memoized tokenizer for a model, the length based estimate for unknown models"""
+	for pattern, factory in TOKENIZERS:
+		if model_name and pattern.search(model_name.lower()):
+			return CachedTokenizer(factory(characters_per_token))
+	return CachedTokenizer(EstimateTokenizer(characters_per_token))
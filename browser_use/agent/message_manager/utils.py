@@ -4,7 +4,7 @@ import json
 import logging
 import os
 import re
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from langchain_core.messages import (
 	AIMessage,
@@ -14,8 +14,14 @@ from langchain_core.messages import (
 	ToolMessage,
 )
 
+if TYPE_CHECKING:
+	from browser_use.dom.views import DOMBaseNode
+
 logger = logging.getLogger(__name__)
 
+# highlight index prefix of a clickable_elements_to_string() line, e.g. "\t\t*[12]*"
+ELEMENT_LINE_INDEX_PATTERN = re.compile(r'^\t*\*?\[(\d+)\]\*?')
+
 MODELS_WITHOUT_TOOL_SUPPORT_PATTERNS = [
 	'deepseek-reasoner',
 	'deepseek-r1',
@@ -147,3 +153,60 @@ def _write_response_to_file(f: Any, response: Any) -> None:
 	"""Write model response to conversation file"""
 	f.write(' RESPONSE\n')
 	f.write(json.dumps(json.loads(response.model_dump_json(exclude_unset=True)), indent=2))
+
+
+def get_element_entries(lines: list[str], line_nodes: list[DOMBaseNode]) -> dict[str, tuple[int | None, str]]:
+	"""
+	Key the lines of DOMElementNode.clickable_element_lines() by something that is stable between steps:
+	the xpath for elements, the text itself for text lines (highlight indices are reassigned every step).
+	Values are the highlight index and the line without indentation, index and new element marks.
+	"""
+	entries: dict[str, tuple[int | None, str]] = {}
+	for line, node in zip(lines, line_nodes):
+		match = ELEMENT_LINE_INDEX_PATTERN.match(line)
+		if match:
+			key = f'xpath:{getattr(node, "xpath", "")}'
+			entry = (int(match.group(1)), line[match.end() :])
+		else:
+			key = f'text:{line.strip()}'
+			entry = (None, line.strip())
+
+		# the same xpath can appear in several iframes / shadow roots, and the same text several times
+		unique_key, occurrence = key, 1
+		while unique_key in entries:
+			occurrence += 1
+			unique_key = f'{key}#{occurrence}'
+		entries[unique_key] = entry
+	return entries
+
+
+def format_elements_delta(
+	previous: dict[str, tuple[int | None, str]],
+	current: dict[str, tuple[int | None, str]],
+	current_lines: dict[str, str],
+) -> str:
+	"""
+	Describe the changes between two get_element_entries() results:
+	added / changed lines in full, removed lines shortened, and the new index of unchanged elements that moved.
+	"""
+	added, changed, removed, moved = [], [], [], []
+	for key, (index, content) in current.items():
+		if key not in previous:
+			added.append(f'+ {current_lines[key]}')
+		elif previous[key][1] != content:
+			changed.append(f'~ {current_lines[key]}')
+		elif index != previous[key][0]:
+			moved.append(f'{previous[key][0]}->{index}')
+	for key, (index, content) in previous.items():
+		if key not in current:
+			removed.append(f'- {content[:80]}')
+
+	if not (added or changed or removed or moved):
+		return 'No changes to the interactive elements above.'
+
+	parts = ['Changes to the interactive elements above (+ added, ~ changed, - removed), use the indices listed here:']
+	parts.extend(added + changed + removed)
+	if moved:
+		parts.append(f'Unchanged elements with a new index (old->new): {", ".join(moved)}')
+	parts.append('All other elements are unchanged and keep their index.')
+	return '\n'.join(parts)
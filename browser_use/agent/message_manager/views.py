@@ -125,11 +125,30 @@ class MessageHistory(BaseModel):
 			self.current_tokens -= self.messages[-1].metadata.tokens
 			self.messages.pop()
 
+	def remove_messages_of_type(self, message_type: str) -> None:
+		"""Remove all messages of a message type from history"""
+		# rebuild the list, list.remove() compares messages by equality and could drop an equal message of another type
+		self.current_tokens -= sum(m.metadata.tokens for m in self.messages if m.metadata.message_type == message_type)
+		self.messages = [m for m in self.messages if m.metadata.message_type != message_type]
+
+	def has_message_of_type(self, message_type: str) -> bool:
+		return any(m.metadata.message_type == message_type for m in self.messages)
+
+
+class ElementsSnapshot(BaseModel):
+	"""Interactive elements sent in the last full dump, later state messages only list the changes to them"""
+
+	url: str
+	# element key -> (highlight index, line without the index), see utils.get_element_entries()
+	entries: dict[str, tuple[int | None, str]] = Field(default_factory=dict)
+	steps_since: int = 0
+
 
 class MessageManagerState(BaseModel):
 	"""Holds the state for MessageManager"""
 
 	history: MessageHistory = Field(default_factory=MessageHistory)
 	tool_id: int = 1
+	elements_snapshot: ElementsSnapshot | None = None
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -9,6 +9,15 @@ if TYPE_CHECKING:
 	from browser_use.browser.views import BrowserStateSummary
 
 
+def get_screenshot_mime_type(screenshot_b64: str) -> str:
+	"""Mime type of a base64 encoded screenshot, from the magic bytes of the image format"""
+	if screenshot_b64.startswith('/9j/'):
+		return 'image/jpeg'
+	if screenshot_b64.startswith('UklGR'):
+		return 'image/webp'
+	return 'image/png'
+
+
 class SystemPrompt:
 	def __init__(
 		self,
@@ -66,15 +75,34 @@ class AgentMessagePrompt:
 		result: list['ActionResult'] | None = None,
 		include_attributes: list[str] | None = None,
 		step_info: Optional['AgentStepInfo'] = None,
+		max_elements_tokens: int | None = None,
+		characters_per_token: int = 3,
+		elements_text: str | None = None,
+		screenshot_in_history: bool = False,
+		screenshot_unchanged: bool = False,
 	):
 		self.state: 'BrowserStateSummary' = browser_state_summary
 		self.result = result
 		self.include_attributes = include_attributes or []
 		self.step_info = step_info
+		# token budget for the interactive elements, the least useful elements are left out above it
+		self.max_elements_tokens = max_elements_tokens
+		self.characters_per_token = characters_per_token
+		# precomputed interactive elements text, e.g. only the changes since the previous step
+		self.elements_text = elements_text
+		# the screenshot is the last one kept in the history, leave the image out
+		self.screenshot_in_history = screenshot_in_history
+		self.screenshot_unchanged = screenshot_unchanged
 		assert self.state
 
 	def get_user_message(self, use_vision: bool = True) -> HumanMessage:
-		elements_text = self.state.element_tree.clickable_elements_to_string(include_attributes=self.include_attributes)
+		elements_text = self.elements_text
+		if elements_text is None:
+			elements_text = self.state.element_tree.clickable_elements_to_string(
+				include_attributes=self.include_attributes,
+				max_tokens=self.max_elements_tokens,
+				characters_per_token=self.characters_per_token,
+			)
 
 		has_content_above = (self.state.pixels_above or 0) > 0
 		has_content_below = (self.state.pixels_below or 0) > 0
@@ -123,14 +151,21 @@ Interactive elements from top layer of the current page inside the viewport:
 					error = result.error.split('\n')[-1]
 					state_description += f'\nAction error {i + 1}/{len(self.result)}: ...{error}'
 
-		if self.state.screenshot and use_vision is True:
+		if self.state.screenshot and use_vision is True and self.screenshot_in_history:
+			if self.screenshot_unchanged:
+				state_description += '\nScreenshot: the screen did not change, it still looks like the last screenshot above.'
+			else:
+				state_description += '\nScreenshot: the last screenshot above shows the current screen.'
+		elif self.state.screenshot and use_vision is True:
 			# Format message for vision model
 			return HumanMessage(
 				content=[
 					{'type': 'text', 'text': state_description},
 					{
 						'type': 'image_url',
-						'image_url': {'url': f'data:image/png;base64,{self.state.screenshot}'},  # , 'detail': 'low'
+						'image_url': {
+							'url': f'data:{get_screenshot_mime_type(self.state.screenshot)};base64,{self.state.screenshot}'
+						},  # , 'detail': 'low'
 					},
 				]
 			)
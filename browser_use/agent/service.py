@@ -54,12 +54,13 @@ from browser_use.agent.views import (
 from browser_use.browser import BrowserProfile, BrowserSession
 
 # from lmnr.sdk.decorators import observe
+from browser_use.browser.screenshots import screenshot_hash, screenshots_match
 from browser_use.browser.views import BrowserStateSummary
 from browser_use.controller.registry.views import ActionModel
 from browser_use.controller.service import Controller
 from browser_use.dom.history_tree_processor.service import (
 	DOMHistoryElement,
-	HistoryTreeProcessor,
+	HistoryElementIndex,
 )
 from browser_use.exceptions import LLMException
 from browser_use.telemetry.service import ProductTelemetry
@@ -131,6 +132,10 @@ class Agent(Generic[Context]):
 		override_system_message: str | None = None,
 		extend_system_message: str | None = None,
 		max_input_tokens: int = 128000,
+		max_elements_tokens: int | None = None,
+		dom_delta_messages: bool = False,
+		skip_unchanged_screenshots: bool = False,
+		prompt_cache_layout: bool = False,
 		validate_output: bool = False,
 		message_context: str | None = None,
 		generate_gif: bool | str = False,
@@ -182,6 +187,10 @@ class Agent(Generic[Context]):
 			override_system_message=override_system_message,
 			extend_system_message=extend_system_message,
 			max_input_tokens=max_input_tokens,
+			max_elements_tokens=max_elements_tokens,
+			dom_delta_messages=dom_delta_messages,
+			skip_unchanged_screenshots=skip_unchanged_screenshots,
+			prompt_cache_layout=prompt_cache_layout,
 			validate_output=validate_output,
 			message_context=message_context,
 			generate_gif=generate_gif,
@@ -202,6 +211,8 @@ class Agent(Generic[Context]):
 
 		# Initialize state
 		self.state = injected_agent_state or AgentState()
+		# usage_metadata of the last LLM response, when the provider reports it
+		self._last_llm_usage: dict[str, Any] | None = None
 
 		# Action setup
 		self._setup_action_models()
@@ -261,6 +272,14 @@ class Agent(Generic[Context]):
 			).get_system_message(),
 			settings=MessageManagerSettings(
 				max_input_tokens=self.settings.max_input_tokens,
+				model_name=self.model_name,
+				max_elements_tokens=self.settings.max_elements_tokens,
+				dom_delta_messages=self.settings.dom_delta_messages,
+				skip_unchanged_screenshots=self.settings.skip_unchanged_screenshots,
+				prompt_cache_layout=self.settings.prompt_cache_layout,
+				# anthropic only caches up to explicit cache_control breakpoints, other providers cache prefixes automatically
+				cache_control_markers=self.settings.prompt_cache_layout
+				and self.llm.__class__.__name__ in ['ChatAnthropic', 'AnthropicChat', 'ChatAnthropicVertex'],
 				include_attributes=self.settings.include_attributes,
 				message_context=self.settings.message_context,
 				sensitive_data=sensitive_data,
@@ -276,6 +295,7 @@ class Agent(Generic[Context]):
 					message_manager=self._message_manager,
 					llm=self.llm,
 					config=self.memory_config,
+					summary_llm=self.settings.page_extraction_llm,
 				)
 			except ImportError:
 				logger.warning(
@@ -779,16 +799,30 @@ class Agent(Generic[Context]):
 		result: list[ActionResult] = []
 		step_start_time = time.time()
 		tokens = 0
+		screenshot_unchanged = False
+		# usage of this step's LLM call, stays None if the call fails
+		self._last_llm_usage = None
 
 		try:
-			browser_state_summary = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=True)
+			browser_state_summary = await self.browser_session.get_state_summary(
+				cache_clickable_elements_hashes=True,
+				# text-only runs never look at the screenshots, skip taking them
+				include_screenshot=(
+					self.settings.use_vision
+					or (self.settings.use_vision_for_planner and self.settings.planner_llm is not None)
+					or bool(self.settings.generate_gif)
+				),
+			)
 			current_page = await self.browser_session.get_current_page()
 
 			self._log_step_context(current_page, browser_state_summary)
+			screenshot_unchanged = self._is_screenshot_unchanged(browser_state_summary)
 
-			# generate procedural memory if needed
-			if self.enable_memory and self.memory and self.state.n_steps % self.memory.config.memory_interval == 0:
-				self.memory.create_procedural_memory(self.state.n_steps)
+			# generate procedural memory if needed, in the background so the agent keeps acting meanwhile
+			if self.enable_memory and self.memory:
+				self.memory.apply_procedural_memory()
+				if self.state.n_steps % self.memory.config.memory_interval == 0:
+					self.memory.start_procedural_memory(self.state.n_steps)
 
 			await self._raise_if_stopped_or_paused()
 
@@ -799,9 +833,11 @@ class Agent(Generic[Context]):
 			page_filtered_actions = self.controller.registry.get_prompt_description(current_page)
 
 			# If there are page-specific actions, add them as a special message for this step only
+			page_action_message = None
 			if page_filtered_actions:
 				page_action_message = f'For this page, these additional actions are available:\n{page_filtered_actions}'
-				self._message_manager._add_message_with_tokens(HumanMessage(content=page_action_message))
+				if not self._message_manager.settings.prompt_cache_layout:
+					self._message_manager._add_message_with_tokens(HumanMessage(content=page_action_message))
 
 			# If using raw tool calling method, we need to update the message context with new actions
 			if self.tool_calling_method == 'raw':
@@ -825,6 +861,9 @@ class Agent(Generic[Context]):
 				result=self.state.last_result,
 				step_info=step_info,
 				use_vision=self.settings.use_vision,
+				screenshot_unchanged=screenshot_unchanged,
+				# with the prompt cache layout, the page actions go at the end of the state message, out of the history
+				page_actions=page_action_message if self._message_manager.settings.prompt_cache_layout else None,
 			)
 
 			# Run planner at specified intervals if planner is configured
@@ -937,13 +976,18 @@ class Agent(Generic[Context]):
 				return
 
 			if browser_state_summary:
+				cache_details = (self._last_llm_usage or {}).get('input_token_details') or {}
 				metadata = StepMetadata(
 					step_number=self.state.n_steps,
 					step_start_time=step_start_time,
 					step_end_time=step_end_time,
 					input_tokens=tokens,
+					cached_input_tokens=cache_details.get('cache_read'),
+					cache_creation_input_tokens=cache_details.get('cache_creation'),
+					llm_input_tokens=(self._last_llm_usage or {}).get('input_tokens'),
+					llm_output_tokens=(self._last_llm_usage or {}).get('output_tokens'),
 				)
-				self._make_history_item(model_output, browser_state_summary, result, metadata)
+				self._make_history_item(model_output, browser_state_summary, result, metadata, screenshot_unchanged)
 
 			# Log step completion summary
 			self._log_step_completion_summary(step_start_time, result)
@@ -999,6 +1043,7 @@ class Agent(Generic[Context]):
 		browser_state_summary: BrowserStateSummary,
 		result: list[ActionResult],
 		metadata: StepMetadata | None = None,
+		screenshot_unchanged: bool = False,
 	) -> None:
 		"""Create and store history item"""
 
@@ -1007,18 +1052,50 @@ class Agent(Generic[Context]):
 		else:
 			interacted_elements = [None]
 
+		# an unchanged screenshot is stored once, later history items point to it
+		screenshot, screenshot_ref = browser_state_summary.screenshot, None
+		if screenshot_unchanged and self.state.last_screenshot_history_index is not None:
+			screenshot, screenshot_ref = None, self.state.last_screenshot_history_index
+		elif screenshot and self.settings.skip_unchanged_screenshots:
+			self.state.last_screenshot_history_index = len(self.state.history.history)
+
 		state_history = BrowserStateHistory(
 			url=browser_state_summary.url,
 			title=browser_state_summary.title,
 			tabs=browser_state_summary.tabs,
 			interacted_element=interacted_elements,
-			screenshot=browser_state_summary.screenshot,
+			screenshot=screenshot,
+			screenshot_ref=screenshot_ref,
 		)
 
 		history_item = AgentHistory(model_output=model_output, result=result, state=state_history, metadata=metadata)
 
 		self.state.history.history.append(history_item)
 
+	def _is_screenshot_unchanged(self, browser_state_summary: BrowserStateSummary) -> bool:
+		"""Whether the screenshot looks the same as the last one sent to the LLM, on the same url"""
+		if not self.settings.skip_unchanged_screenshots or not browser_state_summary.screenshot:
+			return False
+
+		try:
+			current_hash = screenshot_hash(browser_state_summary.screenshot)
+		except Exception as e:
+			logger.debug(f'Failed to hash screenshot: {type(e).__name__}: {e}')
+			return False
+
+		if (
+			self.state.last_screenshot_hash is not None
+			and self.state.last_screenshot_url == browser_state_summary.url
+			and screenshots_match(current_hash, self.state.last_screenshot_hash)
+		):
+			logger.debug('🖼️ Screen unchanged since the last screenshot sent, not sending it again')
+			return True
+
+		self.state.last_screenshot_hash = current_hash
+		self.state.last_screenshot_url = browser_state_summary.url
+		self.state.last_screenshot_history_index = None
+		return False
+
 	THINK_TAGS = re.compile(r'<think>.*?</think>', re.DOTALL)
 	STRAY_CLOSE_TAG = re.compile(r'.*?</think>', re.DOTALL)
 
@@ -1111,6 +1188,9 @@ class Agent(Generic[Context]):
 				logger.warning(f'Failed to parse model output: {response["raw"].content} {str(e)}')
 				raise ValueError('Could not parse response.')
 
+		self._last_llm_usage = getattr(response.get('raw'), 'usage_metadata', None)
+		self._log_prompt_cache_usage()
+
 		# cut the number of actions to max_actions_per_step if needed
 		if len(parsed.action) > self.settings.max_actions_per_step:
 			parsed.action = parsed.action[: self.settings.max_actions_per_step]
@@ -1197,6 +1277,18 @@ class Agent(Generic[Context]):
 
 		logger.info(f'📍 Step {self.state.n_steps}: Ran {action_count} actions in {step_duration:.2f}s: {status_str}')
 
+	def _log_prompt_cache_usage(self) -> None:
+		"""Log how many input tokens of the last LLM call were served from the provider's prompt cache"""
+		if not self.settings.prompt_cache_layout or not self._last_llm_usage:
+			return
+		input_tokens = self._last_llm_usage.get('input_tokens', 0)
+		cache_details = self._last_llm_usage.get('input_token_details') or {}
+		cached = cache_details.get('cache_read') or 0
+		written = cache_details.get('cache_creation') or 0
+		logger.debug(
+			f'💾 Prompt cache: {cached} cached + {written} written + {input_tokens - cached - written} uncached input tokens'
+		)
+
 	def _log_llm_call_info(self, input_messages: list[BaseMessage], method: str) -> None:
 		"""Log comprehensive information about the LLM call being made"""
 		# Count messages and check for images
@@ -1448,7 +1540,9 @@ class Agent(Generic[Context]):
 
 		for i, action in enumerate(actions):
 			if action.get_index() is not None and i != 0:
-				new_browser_state_summary = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+				new_browser_state_summary = await self.browser_session.get_state_summary(
+					cache_clickable_elements_hashes=False, include_screenshot=False
+				)
 				new_selector_map = new_browser_state_summary.selector_map
 
 				# Detect index change after previous action
@@ -1518,7 +1612,9 @@ class Agent(Generic[Context]):
 		)
 
 		if self.browser_context:
-			browser_state_summary = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+			browser_state_summary = await self.browser_session.get_state_summary(
+				cache_clickable_elements_hashes=False, include_screenshot=self.settings.use_vision
+			)
 			assert browser_state_summary
 			content = AgentMessagePrompt(
 				browser_state_summary=browser_state_summary,
@@ -1572,6 +1668,7 @@ class Agent(Generic[Context]):
 		max_retries: int = 3,
 		skip_failures: bool = True,
 		delay_between_actions: float = 2.0,
+		fuzzy_match: bool = False,
 	) -> list[ActionResult]:
 		"""
 		Rerun a saved history of actions with error handling and retry logic.
@@ -1581,6 +1678,8 @@ class Agent(Generic[Context]):
 				max_retries: Maximum number of retries per action
 				skip_failures: Whether to skip failed actions or stop execution
 				delay_between_actions: Delay between actions in seconds
+				fuzzy_match: Use the closest element when the historical one changed (e.g. only its attributes match),
+					instead of failing the step. The closest match can be a different element.
 
 		Returns:
 				List of action results
@@ -1608,7 +1707,7 @@ class Agent(Generic[Context]):
 			retry_count = 0
 			while retry_count < max_retries:
 				try:
-					result = await self._execute_history_step(history_item, delay_between_actions)
+					result = await self._execute_history_step(history_item, delay_between_actions, fuzzy_match)
 					results.extend(result)
 					break
 
@@ -1626,17 +1725,23 @@ class Agent(Generic[Context]):
 
 		return results
 
-	async def _execute_history_step(self, history_item: AgentHistory, delay: float) -> list[ActionResult]:
+	async def _execute_history_step(
+		self, history_item: AgentHistory, delay: float, fuzzy_match: bool = False
+	) -> list[ActionResult]:
 		"""Execute a single step from history with element validation"""
-		state = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=False)
+		state = await self.browser_session.get_state_summary(cache_clickable_elements_hashes=False, include_screenshot=False)
 		if not state or not history_item.model_output:
 			raise ValueError('Invalid state or model output')
+		# one index per state, shared by all actions of the step
+		element_index = HistoryElementIndex(state.element_tree)
 		updated_actions = []
 		for i, action in enumerate(history_item.model_output.action):
 			updated_action = await self._update_action_indices(
 				history_item.state.interacted_element[i],
 				action,
 				state,
+				element_index,
+				fuzzy_match,
 			)
 			updated_actions.append(updated_action)
 
@@ -1653,17 +1758,27 @@ class Agent(Generic[Context]):
 		historical_element: DOMHistoryElement | None,
 		action: ActionModel,  # Type this properly based on your action model
 		browser_state_summary: BrowserStateSummary,
+		element_index: HistoryElementIndex | None = None,
+		fuzzy_match: bool = False,
 	) -> ActionModel | None:
 		"""
 		Update action indices based on current page state.
-		Returns updated action or None if element cannot be found.
+		Returns updated action or None if element cannot be found (or only partially matches without fuzzy_match).
 		"""
 		if not historical_element or not browser_state_summary.element_tree:
 			return action
 
-		current_element = HistoryTreeProcessor.find_history_element_in_tree(
-			historical_element, browser_state_summary.element_tree
-		)
+		if element_index is None:
+			element_index = HistoryElementIndex(browser_state_summary.element_tree)
+
+		current_element = element_index.find(historical_element)
+		if current_element is None and fuzzy_match:
+			current_element = element_index.find(historical_element, fuzzy=True)
+			if current_element is not None:
+				logger.warning(
+					f'⚠️ Element changed in DOM, using closest match <{current_element.tag_name}> {current_element.xpath} '
+					f'instead of <{historical_element.tag_name}> {historical_element.xpath}'
+				)
 
 		if not current_element or current_element.highlight_index is None:
 			return None
@@ -1840,6 +1955,10 @@ class Agent(Generic[Context]):
 	async def close(self):
 		"""Close all resources"""
 		try:
+			# Drop a procedural memory still being created in the background
+			if self.memory:
+				self.memory.cancel_procedural_memory()
+
 			# First close browser resources
 			await self.browser_session.stop()
 
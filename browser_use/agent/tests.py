@@ -1,5 +1,7 @@
 import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
 
+from browser_use.agent.service import Agent
 from browser_use.agent.views import (
 	ActionResult,
 	AgentBrain,
@@ -7,9 +9,11 @@ from browser_use.agent.views import (
 	AgentHistoryList,
 	AgentOutput,
 )
+from browser_use.browser.session import BrowserSession
 from browser_use.browser.views import BrowserStateHistory, BrowserStateSummary, TabInfo
 from browser_use.controller.registry.service import Registry
 from browser_use.controller.views import ClickElementAction, DoneAction, ExtractPageContentAction
+from browser_use.dom.history_tree_processor.service import DOMHistoryElement, HistoryTreeProcessor
 from browser_use.dom.views import DOMElementNode
 
 
@@ -193,5 +197,62 @@ def test_action_creation(action_registry):
 	assert click_action.model_dump(exclude_none=True) == {'click_element': {'index': 1}}
 
 
+@pytest.fixture
+def agent(monkeypatch):
+	monkeypatch.setattr('browser_use.agent.service.SKIP_LLM_API_KEY_VERIFICATION', True)
+	return Agent(
+		task='replay',
+		llm=FakeListChatModel(responses=['unused']),
+		browser_session=BrowserSession(),
+		tool_calling_method='raw',
+		enable_memory=False,
+	)
+
+
+def page_with_button(**attributes) -> BrowserStateSummary:
+	body = DOMElementNode(tag_name='body', xpath='html/body', attributes={}, children=[], is_visible=True, parent=None)
+	form = DOMElementNode(tag_name='form', xpath='html/body/form', attributes={}, children=[], is_visible=True, parent=body)
+	button = DOMElementNode(
+		tag_name='button',
+		xpath='html/body/form/button',
+		attributes=attributes,
+		children=[],
+		is_visible=True,
+		parent=form,
+		highlight_index=3,
+	)
+	body.children.append(form)
+	form.children.append(button)
+	return BrowserStateSummary(
+		url='https://example.com', title='Example Page', tabs=[], element_tree=body, selector_map={3: button}
+	)
+
+
+async def test_replay_updates_index_of_exact_match(agent, action_registry):
+	state = page_with_button(type='submit')
+	historical_element = HistoryTreeProcessor.convert_dom_element_to_history_element(state.selector_map[3])
+	historical_element.highlight_index = 1
+
+	action = await agent._update_action_indices(historical_element, action_registry(click_element={'index': 1}), state)
+	assert action is not None and action.get_index() == 3
+
+
+async def test_replay_only_uses_fuzzy_matches_when_enabled(agent, action_registry, caplog):
+	# only the attributes match: same class list, but somewhere else in the page
+	state = page_with_button(**{'class': 'btn primary'})
+	historical_element = DOMHistoryElement(
+		'button', 'html/body/div/button', 1, ['body', 'div', 'button'], {'class': 'btn primary'}
+	)
+
+	action = await agent._update_action_indices(historical_element, action_registry(click_element={'index': 1}), state)
+	assert action is None
+
+	action = await agent._update_action_indices(
+		historical_element, action_registry(click_element={'index': 1}), state, fuzzy_match=True
+	)
+	assert action is not None and action.get_index() == 3
+	assert any(record.levelname == 'WARNING' and 'closest match' in record.message for record in caplog.records)
+
+
 # run this with:
 # pytest browser_use/agent/tests.py
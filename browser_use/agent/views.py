@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import traceback
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Literal
 
@@ -44,6 +45,10 @@ class AgentSettings(BaseModel):
 	max_failures: int = 3
 	retry_delay: int = 10
 	max_input_tokens: int = 128000
+	max_elements_tokens: int | None = None
+	dom_delta_messages: bool = False
+	skip_unchanged_screenshots: bool = False
+	prompt_cache_layout: bool = False
 	validate_output: bool = False
 	message_context: str | None = None
 	generate_gif: bool | str = False
@@ -83,6 +88,10 @@ class AgentState(BaseModel):
 	last_plan: str | None = None
 	paused: bool = False
 	stopped: bool = False
+	# last screenshot sent to the LLM, see Agent._is_screenshot_unchanged()
+	last_screenshot_hash: str | None = None
+	last_screenshot_url: str | None = None
+	last_screenshot_history_index: int | None = None
 
 	message_manager_state: MessageManagerState = Field(default_factory=MessageManagerState)
 
@@ -117,6 +126,12 @@ class StepMetadata(BaseModel):
 	step_end_time: float
 	input_tokens: int  # Approximate tokens from message manager for this step
 	step_number: int
+	# input tokens the provider served from / wrote to its prompt cache, when it reports them
+	cached_input_tokens: int | None = None
+	cache_creation_input_tokens: int | None = None
+	# usage_metadata reported by the LLM for this step (the provider's own count), when available
+	llm_input_tokens: int | None = None
+	llm_output_tokens: int | None = None
 
 	@property
 	def duration_seconds(self) -> float:
@@ -159,8 +174,9 @@ class AgentOutput(BaseModel):
 	)
 
 	@staticmethod
+	@lru_cache(maxsize=64)
 	def type_with_custom_actions(custom_actions: type[ActionModel]) -> type[AgentOutput]:
-		"""Extend actions with custom actions"""
+		"""Extend actions with custom actions, cached per action model (Registry.create_action_model reuses them)"""
 		model_ = create_model(
 			'AgentOutput',
 			__base__=AgentOutput,
@@ -232,18 +248,21 @@ class AgentHistoryList(BaseModel):
 	def total_input_tokens(self) -> int:
 		"""
 		Get total tokens used across all steps.
-		Note: These are from the approximate token counting of the message manager.
-		For accurate token counting, use tools like LangChain Smith or OpenAI's token counters.
+		Note: These are the input tokens reported by the LLM when available, else the message manager's count.
 		"""
-		total = 0
-		for h in self.history:
-			if h.metadata:
-				total += h.metadata.input_tokens
-		return total
+		return sum(self.input_token_usage())
+
+	def total_output_tokens(self) -> int:
+		"""Get total output tokens reported by the LLM across all steps (0 for steps without usage data)"""
+		return sum(h.metadata.llm_output_tokens or 0 for h in self.history if h.metadata)
 
 	def input_token_usage(self) -> list[int]:
 		"""Get token usage for each step"""
-		return [h.metadata.input_tokens for h in self.history if h.metadata]
+		return [
+			h.metadata.llm_input_tokens if h.metadata.llm_input_tokens is not None else h.metadata.input_tokens
+			for h in self.history
+			if h.metadata
+		]
 
 	def __str__(self) -> str:
 		"""Representation of the AgentHistoryList object"""
@@ -365,7 +384,13 @@ class AgentHistoryList(BaseModel):
 
 	def screenshots(self) -> list[str | None]:
 		"""Get all screenshots from history"""
-		return [h.state.screenshot if h.state.screenshot is not None else None for h in self.history]
+		return [self.get_screenshot(h) for h in self.history]
+
+	def get_screenshot(self, history_item: AgentHistory) -> str | None:
+		"""Screenshot of a history item, following the reference of items whose screen was unchanged"""
+		if history_item.state.screenshot is None and history_item.state.screenshot_ref is not None:
+			return self.history[history_item.state.screenshot_ref].state.screenshot
+		return history_item.state.screenshot
 
 	def action_names(self) -> list[str]:
 		"""Get all action names from history"""
@@ -0,0 +1,305 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from browser_use.utils import compile_domain_patterns
+
+if TYPE_CHECKING:
+	from playwright.async_api import Request, Response, Route
+
+logger = logging.getLogger(__name__)
+
+# Define relevant resource types and content types
+RELEVANT_RESOURCE_TYPES = {
+	'document',
+	'stylesheet',
+	'image',
+	'font',
+	'script',
+	'iframe',
+}
+
+RELEVANT_CONTENT_TYPES = {
+	'text/html',
+	'text/css',
+	'application/javascript',
+	'image/',
+	'font/',
+	'application/json',
+}
+
+# Resource types whose endpoints may be learned as background traffic. Documents, scripts and stylesheets
+# are needed to render the page, a slow one must keep delaying the waits however often it timed out.
+LEARNABLE_RESOURCE_TYPES = {
+	'image',
+	'font',
+	'iframe',
+}
+
+STREAMING_CONTENT_TYPES = {
+	'streaming',
+	'video',
+	'audio',
+	'webm',
+	'mp4',
+	'event-stream',
+	'websocket',
+	'protobuf',
+}
+
+# Additional patterns to filter out
+IGNORED_URL_PATTERNS = {
+	# Analytics and tracking
+	'analytics',
+	'tracking',
+	'telemetry',
+	'beacon',
+	'metrics',
+	# Ad-related
+	'doubleclick',
+	'adsystem',
+	'adserver',
+	'advertising',
+	# Social media widgets
+	'facebook.com/plugins',
+	'platform.twitter',
+	'linkedin.com/embed',
+	# Live chat and support
+	'livechat',
+	'zendesk',
+	'intercom',
+	'crisp.chat',
+	'hotjar',
+	# Push notifications
+	'push-notifications',
+	'onesignal',
+	'pushwoosh',
+	# Background sync/heartbeat
+	'heartbeat',
+	'ping',
+	'alive',
+	# WebRTC and streaming
+	'webrtc',
+	'rtmp://',
+	'wss://',
+	# Common CDNs for dynamic content
+	'cloudfront.net',
+	'fastly.net',
+}
+
+
+# Analytics, tracking and ad requests, blocked by every resource blocking profile (matched against hostname + path)
+TRACKING_URL_PATTERNS = {
+	'analytics',
+	'tracking',
+	'telemetry',
+	'beacon',
+	'doubleclick',
+	'adsystem',
+	'adserver',
+	'advertising',
+	'googletagmanager',
+	'hotjar',
+}
+
+# resource blocking profile -> (blocked resource types, blocked url patterns), see BrowserProfile.resource_blocking
+RESOURCE_BLOCKING_PROFILES: dict[str, tuple[set[str], set[str]]] = {
+	'none': (set(), set()),
+	'tracking': (set(), TRACKING_URL_PATTERNS),
+	'text_only': ({'image', 'media', 'font'}, TRACKING_URL_PATTERNS),
+}
+
+
+def get_endpoint(url: str) -> str:
+	"""Request url without scheme, query and fragment, e.g. www.linkedin.com/realtime/connect"""
+	parsed = urlparse(url)
+	return f'{parsed.netloc}{parsed.path}'
+
+
+class NetworkIdleProfiles:
+	"""
+	Endpoints learned per site to never settle (long polling, streaming, slow background fetches).
+
+	Whenever a wait for network idle times out, the image, font and iframe requests still pending are
+	counted against the domain of the page. After `learn_after` timeouts an endpoint is treated as background
+	traffic on that domain and no longer delays the page load waits. Shared by all pages of a browser session.
+	"""
+
+	def __init__(self, learn_after: int = 2):
+		self.learn_after = learn_after
+		self._timeouts: dict[str, dict[str, int]] = {}
+
+	def is_background(self, domain: str, endpoint: str) -> bool:
+		return self._timeouts.get(domain, {}).get(endpoint, 0) >= self.learn_after
+
+	def record_timeout(self, domain: str, endpoints: set[str]) -> None:
+		counts = self._timeouts.setdefault(domain, {})
+		for endpoint in endpoints:
+			counts[endpoint] = counts.get(endpoint, 0) + 1
+			if counts[endpoint] == self.learn_after:
+				logger.debug(f'📡 Ignoring background requests to {endpoint} on {domain} when waiting for network idle')
+
+
+class NetworkIdleTracker:
+	"""
+	Tracks the in-flight requests of one page for its whole lifetime, so waiting for network idle
+	needs no listener registration per step and no polling: waiters sleep on an asyncio.Event that
+	is set whenever a relevant request starts or finishes.
+	"""
+
+	def __init__(self, profiles: NetworkIdleProfiles):
+		self.profiles = profiles
+		# domain of the page during the last wait, requests to its background endpoints are not activity
+		self.domain = ''
+		self.pending_requests: dict['Request', str] = {}
+		self.last_activity = asyncio.get_event_loop().time()
+		self._changed = asyncio.Event()
+
+	def on_request(self, request: 'Request') -> None:
+		# Filter by resource type, this also excludes streaming, websocket, and other real-time requests
+		if request.resource_type not in RELEVANT_RESOURCE_TYPES:
+			return
+
+		# Filter out by URL patterns
+		url = request.url.lower()
+		if any(pattern in url for pattern in IGNORED_URL_PATTERNS):
+			return
+
+		# Filter out data URLs and blob URLs
+		if url.startswith(('data:', 'blob:')):
+			return
+
+		# Filter out requests with certain headers
+		headers = request.headers
+		if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in ['video', 'audio']:
+			return
+
+		endpoint = get_endpoint(request.url)
+		self.pending_requests[request] = endpoint
+		self._mark_activity(endpoint)
+
+	def on_response(self, response: 'Response') -> None:
+		request = response.request
+		endpoint = self.pending_requests.pop(request, None)
+		if endpoint is None:
+			return
+
+		content_type = response.headers.get('content-type', '').lower()
+		content_length = response.headers.get('content-length')
+		if (
+			# streaming or real-time data
+			any(t in content_type for t in STREAMING_CONTENT_TYPES)
+			# not a content type the page needs to render
+			or not any(ct in content_type for ct in RELEVANT_CONTENT_TYPES)
+			# too large, likely not essential for page load
+			or (content_length and content_length.isdigit() and int(content_length) > 5 * 1024 * 1024)
+		):
+			self._changed.set()
+			return
+
+		self._mark_activity(endpoint)
+
+	def on_request_failed(self, request: 'Request') -> None:
+		if self.pending_requests.pop(request, None) is not None:
+			self._changed.set()
+
+	def _mark_activity(self, endpoint: str) -> None:
+		if not self.profiles.is_background(self.domain, endpoint):
+			self.last_activity = asyncio.get_event_loop().time()
+		self._changed.set()
+
+	def _blocking_requests(self) -> list['Request']:
+		return [
+			request
+			for request, endpoint in self.pending_requests.items()
+			if not self.profiles.is_background(self.domain, endpoint)
+		]
+
+	async def wait_for_idle(self, page_url: str, idle_time: float, timeout: float) -> bool:
+		"""
+		Wait until no relevant request is pending and none started or finished for `idle_time` seconds.
+		Returns False if the network did not calm down within `timeout` seconds.
+		"""
+		self.domain = urlparse(page_url).netloc
+		loop = asyncio.get_event_loop()
+		start_time = loop.time()
+		deadline = start_time + timeout
+
+		while True:
+			now = loop.time()
+			blocking_requests = self._blocking_requests()
+			if not blocking_requests:
+				quiet_time_left = idle_time - (now - self.last_activity)
+				if quiet_time_left <= 0:
+					break
+				wait_time = min(quiet_time_left, deadline - now)
+			else:
+				wait_time = deadline - now
+
+			if wait_time <= 0:
+				logger.debug(
+					f'Network timeout after {timeout}s with {len(blocking_requests)} '
+					f'pending requests: {[r.url for r in blocking_requests]}'
+				)
+				self.profiles.record_timeout(
+					self.domain,
+					{self.pending_requests[r] for r in blocking_requests if r.resource_type in LEARNABLE_RESOURCE_TYPES},
+				)
+				return False
+
+			self._changed.clear()
+			try:
+				await asyncio.wait_for(self._changed.wait(), timeout=wait_time)
+			except TimeoutError:
+				pass
+
+		elapsed = loop.time() - start_time
+		if elapsed > 1:
+			logger.debug(f'💤 Page network traffic calmed down after {elapsed:.2f} seconds')
+		return True
+
+
+class ResourceBlocker:
+	"""
+	Context route handler that aborts requests by resource type and url pattern.
+
+	Url patterns are substrings of the request hostname and path, never of the query string, so first-party
+	requests like /search?keywords=analytics are not caught. Documents (page and iframe navigations) are never
+	blocked, and neither are requests to the allowed domains. Blocked requests are counted per resource type
+	until the next pop_stats().
+	"""
+
+	def __init__(self, resource_types: set[str], url_patterns: set[str], allowed_domains: list[str]):
+		self.resource_types = resource_types
+		self.url_patterns = {pattern.lower() for pattern in url_patterns}
+		self.allowed_domains = compile_domain_patterns(tuple(allowed_domains))
+		self.blocked_requests: dict[str, int] = {}
+
+	def should_block(self, request: 'Request') -> bool:
+		if request.resource_type == 'document':
+			return False
+
+		if request.resource_type not in self.resource_types and not self.matches_url_patterns(request.url):
+			return False
+
+		return not self.allowed_domains.matches(request.url)
+
+	def matches_url_patterns(self, url: str) -> bool:
+		parsed = urlparse(url)
+		host_and_path = f'{parsed.hostname or ""}{parsed.path}'.lower()
+		return any(pattern in host_and_path for pattern in self.url_patterns)
+
+	async def handle_route(self, route: 'Route') -> None:
+		request = route.request
+		if not self.should_block(request):
+			await route.fallback()
+			return
+
+		self.blocked_requests[request.resource_type] = self.blocked_requests.get(request.resource_type, 0) + 1
+		await route.abort('blockedbyclient')
+
+	def pop_stats(self) -> dict[str, int]:
+		"""Blocked requests per resource type since the last call"""
+		blocked_requests, self.blocked_requests = self.blocked_requests, {}
+		return blocked_requests
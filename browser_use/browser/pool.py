@@ -0,0 +1,237 @@
+"""
+Pool of pre-launched browsers handing out warm BrowserSessions, so launching chromium is not part of every task
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from playwright.async_api import Browser as PlaywrightBrowser
+from playwright.async_api import Playwright, async_playwright
+
+from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.session import BrowserSession
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledContext:
+	"""A warm BrowserSession on one of the pool's browsers, and how much it has been used since it was created"""
+
+	browser: PlaywrightBrowser
+	browser_session: BrowserSession
+	steps: int = 0
+	created_at: float = field(default_factory=time.time)
+	# replacing the context failed, the next acquire() retries it
+	broken: bool = False
+
+
+class BrowserSessionPool:
+	"""
+	Keeps `size` browsers running with one ready context each, logged in through browser_profile.storage_state.
+
+	acquire() hands out a BrowserSession on an idle context (waiting if all are leased), release() gives it back.
+	Between leases the tabs are reset but the context is reused, until it was used for `max_steps_per_context`
+	agent steps or its pages use more than `max_context_memory_mb` of JS heap: then it is closed and replaced by
+	a fresh context on the same browser. Contexts that fail the health check on acquire are replaced as well.
+	If a replacement fails (browser crash, launch failure) the slot stays in the pool and the next acquire() retries it.
+
+	Usage:
+		async with BrowserSessionPool(BrowserProfile(storage_state='linkedin_state.json', headless=True), size=3) as pool:
+			browser_session = await pool.acquire()
+			agent = Agent(task=..., llm=..., browser_session=browser_session)
+			history = await agent.run()
+			await pool.release(browser_session, steps=history.number_of_steps())
+	"""
+
+	def __init__(
+		self,
+		browser_profile: BrowserProfile | None = None,
+		size: int = 2,
+		max_steps_per_context: int = 100,
+		max_context_memory_mb: float | None = 1024,
+		playwright: Playwright | None = None,
+	):
+		# the pool launches its own incognito browsers and owns their lifetime, the sessions must never close them
+		self.browser_profile = (browser_profile or BrowserProfile()).model_copy(
+			update={'user_data_dir': None, 'keep_alive': True}
+		)
+		self.size = size
+		self.max_steps_per_context = max_steps_per_context
+		self.max_context_memory_mb = max_context_memory_mb
+		self.playwright = playwright
+
+		self._idle: asyncio.Queue[PooledContext] = asyncio.Queue()
+		self._leased: dict[int, PooledContext] = {}
+		self._browsers: list[PlaywrightBrowser] = []
+
+	async def start(self) -> 'BrowserSessionPool':
+		self.playwright = self.playwright or await async_playwright().start()
+		self.browser_profile.detect_display_configuration()
+
+		start_time = time.time()
+		pooled_contexts = await asyncio.gather(*(self._warm_up() for _ in range(self.size)))
+		for pooled in pooled_contexts:
+			self._idle.put_nowait(pooled)
+		logger.info(f'🏊 Started browser pool with {self.size} warm browsers in {time.time() - start_time:.2f}s')
+		return self
+
+	async def stop(self) -> None:
+		for pooled in [*self._leased.values(), *self._get_idle()]:
+			await self._close_context(pooled)
+		self._leased.clear()
+
+		for browser in self._browsers:
+			try:
+				await browser.close()
+			except Exception as e:
+				logger.debug(f'❌ Error closing pooled browser: {type(e).__name__}: {e}')
+		self._browsers.clear()
+
+		if self.playwright:
+			await self.playwright.stop()
+			self.playwright = None
+
+	async def __aenter__(self) -> 'BrowserSessionPool':
+		return await self.start()
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.stop()
+
+	async def acquire(self) -> BrowserSession:
+		"""
+		Lease a warm BrowserSession with a single blank tab, waits until one is released if all are in use.
+
+		Give it back with release(browser_session, steps=history.number_of_steps()): the pool can't see the agent
+		steps, max_steps_per_context only counts the steps passed to release().
+		"""
+		pooled = await self._idle.get()
+		if pooled.broken or not await self._is_healthy(pooled):
+			logger.warning('🏊 Pooled browser context failed the health check, replacing it')
+			try:
+				pooled = await self._replace(pooled)
+			except Exception:
+				# keep the slot, the next acquire() retries it
+				pooled.broken = True
+				self._idle.put_nowait(pooled)
+				raise
+
+		self._leased[id(pooled.browser_session)] = pooled
+		return pooled.browser_session
+
+	async def release(self, browser_session: BrowserSession, steps: int = 0) -> None:
+		"""
+		Give back a leased BrowserSession, `steps` is the number of agent steps it was used for.
+		Without it the context is only recycled by the memory limit and failed health checks.
+		"""
+		pooled = self._leased.pop(id(browser_session), None)
+		if pooled is None:
+			raise ValueError('BrowserSession was not acquired from this pool or was already released')
+		pooled.steps += steps
+
+		# Agent.close() stops the session, with keep_alive=True that only clears `initialized`, the browser is still up.
+		# Mark it started again, or the next get_current_page() would start() a new browser the pool doesn't track.
+		if browser_session.is_connected():
+			browser_session.initialized = True
+
+		memory_mb = await self._get_memory_mb(pooled)
+		if pooled.steps >= self.max_steps_per_context:
+			logger.debug(f'♻️ Recycling pooled browser context after {pooled.steps} steps')
+			pooled = await self._try_replace(pooled)
+		elif self.max_context_memory_mb is not None and memory_mb > self.max_context_memory_mb:
+			logger.debug(f'♻️ Recycling pooled browser context using {memory_mb:.0f} MB of JS heap')
+			pooled = await self._try_replace(pooled)
+		else:
+			try:
+				await pooled.browser_session.reset()
+			except Exception as e:
+				logger.debug(f'♻️ Recycling pooled browser context that failed to reset: {type(e).__name__}: {e}')
+				pooled = await self._try_replace(pooled)
+
+		self._idle.put_nowait(pooled)
+
+	async def _warm_up(self) -> PooledContext:
+		return await self._new_pooled_context(await self._launch_browser())
+
+	async def _launch_browser(self) -> PlaywrightBrowser:
+		assert self.playwright is not None, 'BrowserSessionPool is not started'
+		browser = await self.playwright.chromium.launch(**self.browser_profile.kwargs_for_launch().model_dump())
+		self._browsers.append(browser)
+		return browser
+
+	async def _new_pooled_context(self, browser: PlaywrightBrowser) -> PooledContext:
+		browser_context = await browser.new_context(**self.browser_profile.kwargs_for_new_context().model_dump())
+		browser_session = BrowserSession(
+			browser_profile=self.browser_profile.model_copy(),
+			playwright=self.playwright,
+			browser=browser,
+			browser_context=browser_context,
+		)
+		await browser_session.start()
+		await browser_session.reset()
+		return PooledContext(browser=browser, browser_session=browser_session)
+
+	async def _replace(self, pooled: PooledContext) -> PooledContext:
+		"""Close the context and open a fresh one on the same browser, relaunching the browser if it is gone"""
+		await self._close_context(pooled)
+
+		browser = pooled.browser
+		if not browser.is_connected():
+			if browser in self._browsers:
+				self._browsers.remove(browser)
+			browser = await self._launch_browser()
+		return await self._new_pooled_context(browser)
+
+	async def _try_replace(self, pooled: PooledContext) -> PooledContext:
+		"""_replace(), or the same slot marked as broken if that fails, so the pool never loses a slot"""
+		try:
+			return await self._replace(pooled)
+		except Exception as e:
+			logger.error(f'❌ Failed to replace pooled browser context, retrying on the next acquire: {type(e).__name__}: {e}')
+			pooled.broken = True
+			return pooled
+
+	async def _close_context(self, pooled: PooledContext) -> None:
+		browser_context = pooled.browser_session.browser_context
+		pooled.browser_session.initialized = False
+		if not browser_context:
+			return
+		try:
+			await browser_context.close()
+		except Exception as e:
+			logger.debug(f'❌ Error closing pooled browser context: {type(e).__name__}: {e}')
+
+	async def _is_healthy(self, pooled: PooledContext) -> bool:
+		# never go through get_current_page() here, on a stopped session it would start() and launch a new browser
+		browser_session = pooled.browser_session
+		if not browser_session.initialized or not browser_session.is_connected():
+			return False
+		page = browser_session.agent_current_page
+		if page is None or page.is_closed():
+			return False
+		try:
+			return await asyncio.wait_for(page.evaluate('1 + 1'), timeout=5) == 2
+		except Exception:
+			return False
+
+	async def _get_memory_mb(self, pooled: PooledContext) -> float:
+		"""JS heap used by the pages of the context (chromium only exposes it per page, through performance.memory)"""
+		browser_context = pooled.browser_session.browser_context
+		if not browser_context:
+			return 0
+
+		total = 0
+		for page in browser_context.pages:
+			try:
+				total += await page.evaluate('() => performance.memory ? performance.memory.usedJSHeapSize : 0')
+			except Exception:
+				pass
+		return total / 1024 / 1024
+
+	def _get_idle(self) -> list[PooledContext]:
+		idle = []
+		while not self._idle.empty():
+			idle.append(self._idle.get_nowait())
+		return idle
@@ -308,6 +308,29 @@ class BrowserChannel(str, Enum):
 	MSEDGE_CANARY = 'msedge-canary'
 
 
+class ScreenshotMode(str, Enum):
+	OFF = 'off'
+	VIEWPORT = 'viewport'
+	FULL_PAGE = 'full_page'
+
+
+class ScreenshotFormat(str, Enum):
+	PNG = 'png'
+	JPEG = 'jpeg'
+	WEBP = 'webp'
+
+
+class ResourceBlocking(str, Enum):
+	NONE = 'none'
+	TRACKING = 'tracking'
+	TEXT_ONLY = 'text_only'
+
+
+class DOMEngine(str, Enum):
+	JS = 'js'
+	CDP_SNAPSHOT = 'cdp_snapshot'
+
+
 # ===== Type definitions with validators =====
 
 UrlStr = Annotated[str, AfterValidator(validate_url)]
@@ -582,6 +605,48 @@ class BrowserProfile(BrowserConnectArgs, BrowserLaunchPersistentContextArgs, Bro
 	include_dynamic_attributes: bool = Field(default=True, description='Include dynamic attributes in selectors.')
 	highlight_elements: bool = Field(default=True, description='Highlight interactive elements on the page.')
 	viewport_expansion: int = Field(default=500, description='Viewport expansion in pixels for LLM context.')
+	incremental_dom_snapshots: bool = Field(
+		default=False,
+		description='Patch the previous DOM snapshot with the subtrees that changed since, instead of re-walking the whole page every step.',
+	)
+	columnar_dom_transport: bool = Field(
+		default=False,
+		description='Transfer the DOM snapshot from the page as a compact columnar JSON string instead of a nested object.',
+	)
+	resource_blocking: ResourceBlocking = Field(
+		default=ResourceBlocking.NONE,
+		description='Abort requests the agent does not need: none, tracking (analytics and ads) or text_only (also images, media and fonts).',
+	)
+	blocked_resource_types: list[str] = Field(
+		default_factory=list, description='Additional resource types to block, e.g. ["stylesheet", "websocket"].'
+	)
+	blocked_url_patterns: list[str] = Field(
+		default_factory=list,
+		description='Additional substrings of request hostname + path to block (the query is ignored), e.g. ["/tracking/", "ads."].',
+	)
+	resource_blocking_allowed_domains: list[str] = Field(
+		default_factory=list,
+		description='Domain patterns whose requests are never blocked, e.g. ["*.licdn.com"]. Same syntax as allowed_domains.',
+	)
+	screenshot_mode: ScreenshotMode = Field(
+		default=ScreenshotMode.VIEWPORT, description='Screenshot taken with every browser state: off, viewport or full page.'
+	)
+	screenshot_format: ScreenshotFormat = Field(
+		default=ScreenshotFormat.PNG, description='Image format of the screenshots (webp is captured through CDP).'
+	)
+	screenshot_quality: int | None = Field(
+		default=None, ge=0, le=100, description='Compression quality of jpeg/webp screenshots, 0-100.'
+	)
+	screenshot_max_dimension: int | None = Field(
+		default=None, gt=0, description='Downscale screenshots so their longest side is at most this many pixels.'
+	)
+	screenshot_use_cdp: bool = Field(
+		default=False, description='Capture screenshots with CDP Page.captureScreenshot directly instead of page.screenshot().'
+	)
+	dom_engine: DOMEngine = Field(
+		default=DOMEngine.JS,
+		description='Extract the DOM with buildDomTree.js, or with a single CDP DOMSnapshot capture (Chromium only, also enters cross-origin iframes).',
+	)
 
 	profile_directory: str = 'Default'  # e.g. 'Profile 1', 'Profile 2', 'Custom Profile', etc.
 
@@ -0,0 +1,43 @@
+import base64
+import hashlib
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Side of the grayscale thumbnail the difference hash is computed on (HASH_SIZE * HASH_SIZE bits)
+HASH_SIZE = 16
+# Differing bits up to which two screenshots count as the same frame (caret blink, spinners, small animations)
+SIMILAR_MAX_DISTANCE = 6
+
+
+def screenshot_hash(screenshot_b64: str) -> str:
+	"""
+	Perceptual (difference) hash of a base64 encoded screenshot, as a hex string.
+
+	Needs Pillow to decode the image. Without it, falls back to a digest of the exact image data
+	prefixed with 'sha1:', which only matches byte-identical screenshots.
+	"""
+	try:
+		from PIL import Image
+	except ImportError:
+		return 'sha1:' + hashlib.sha1(screenshot_b64.encode()).hexdigest()
+
+	image = Image.open(io.BytesIO(base64.b64decode(screenshot_b64)))
+	# one extra column so each pixel can be compared with its right neighbour
+	pixels = list(image.convert('L').resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BILINEAR).getdata())
+
+	bits = 0
+	for row in range(HASH_SIZE):
+		for column in range(HASH_SIZE):
+			left = pixels[row * (HASH_SIZE + 1) + column]
+			right = pixels[row * (HASH_SIZE + 1) + column + 1]
+			bits = (bits << 1) | (left > right)
+	return f'{bits:0{HASH_SIZE * HASH_SIZE // 4}x}'
+
+
+def screenshots_match(hash_a: str, hash_b: str, max_distance: int = SIMILAR_MAX_DISTANCE) -> bool:
+	"""Whether two screenshot_hash() results are effectively the same frame"""
+	if hash_a.startswith('sha1:') or hash_b.startswith('sha1:'):
+		return hash_a == hash_b
+	return (int(hash_a, 16) ^ int(hash_b, 16)).bit_count() <= max_distance
@@ -12,6 +12,7 @@ from functools import wraps
 from pathlib import Path
 from typing import Any, Self
 from urllib.parse import urlparse
+from weakref import WeakKeyDictionary, WeakSet
 
 os.environ['PW_TEST_SCREENSHOT_NO_FONTS_READY'] = '1'  # https://github.com/microsoft/playwright/issues/35972
 
@@ -23,7 +24,8 @@ from playwright.async_api import BrowserContext as PlaywrightBrowserContext
 from playwright.async_api import ElementHandle, FrameLocator, Page, Playwright, async_playwright
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field, InstanceOf, PrivateAttr, model_validator
 
-from browser_use.browser.profile import BrowserProfile
+from browser_use.browser.network import RESOURCE_BLOCKING_PROFILES, NetworkIdleProfiles, NetworkIdleTracker, ResourceBlocker
+from browser_use.browser.profile import BrowserProfile, DOMEngine, ScreenshotFormat, ScreenshotMode
 from browser_use.browser.views import (
 	BrowserError,
 	BrowserStateSummary,
@@ -31,9 +33,9 @@ from browser_use.browser.views import (
 	URLNotAllowedError,
 )
 from browser_use.dom.clickable_element_processor.service import ClickableElementProcessor
-from browser_use.dom.service import DomService
-from browser_use.dom.views import DOMElementNode, SelectorMap
-from browser_use.utils import match_url_with_domain_pattern, merge_dicts, time_execution_async, time_execution_sync
+from browser_use.dom.service import DomService, get_build_dom_tree_init_script
+from browser_use.dom.views import DOMElementNode, DOMSnapshotCache, SelectorMap
+from browser_use.utils import compile_domain_patterns, merge_dicts, time_execution_async, time_execution_sync
 
 # Check if running in Docker
 IN_DOCKER = os.environ.get('IN_DOCKER', 'false').lower()[0] in 'ty1'
@@ -91,9 +93,7 @@ def require_initialization(func):
 				await self.start()  # just start it automatically if not already started
 
 			if not self.agent_current_page or self.agent_current_page.is_closed():
-				self.agent_current_page = (
-					self.browser_context.pages[0] if (self.browser_context and self.browser_context.pages) else None
-				)
+				self.agent_current_page = self.tabs[0] if self.tabs else None
 
 			if not self.agent_current_page or self.agent_current_page.is_closed():
 				await self.create_new_tab()
@@ -213,6 +213,13 @@ class BrowserSession(BaseModel):
 	_cached_browser_state_summary: BrowserStateSummary | None = PrivateAttr(default=None)
 	_cached_clickable_element_hashes: CachedClickableElementHashes | None = PrivateAttr(default=None)
 	_start_lock: asyncio.Lock = PrivateAttr(default_factory=asyncio.Lock)
+	_dom_snapshot_caches: WeakKeyDictionary[Page, DOMSnapshotCache] = PrivateAttr(default_factory=WeakKeyDictionary)
+	_network_trackers: WeakKeyDictionary[Page, NetworkIdleTracker] = PrivateAttr(default_factory=WeakKeyDictionary)
+	_network_idle_profiles: NetworkIdleProfiles = PrivateAttr(default_factory=NetworkIdleProfiles)
+	_resource_blocker: ResourceBlocker | None = PrivateAttr(default=None)
+	_tab_titles: WeakKeyDictionary[Page, str] = PrivateAttr(default_factory=WeakKeyDictionary)
+	# tabs owned by a view from new_tab_session(), None for a session that owns all tabs of its context
+	_tab_scope: WeakSet[Page] | None = PrivateAttr(default=None)
 
 	@model_validator(mode='after')
 	def apply_session_overrides_to_profile(self) -> Self:
@@ -294,6 +301,13 @@ class BrowserSession(BaseModel):
 	async def stop(self) -> None:
 		"""Shuts down the BrowserSession, killing the browser process (only works if keep_alive=False)"""
 
+		if self._tab_scope is not None:
+			# view from new_tab_session(): the browser belongs to the parent session, only close our own tabs
+			if not self.browser_profile.keep_alive:
+				for page in self.tabs:
+					await page.close()
+			return
+
 		self.initialized = False
 
 		if self.browser_profile.keep_alive:
@@ -329,6 +343,23 @@ class BrowserSession(BaseModel):
 		self.browser_profile.keep_alive = False
 		await self.stop()
 
+	async def reset(self) -> None:
+		"""
+		Close all tabs but one, blank it and forget the cached state, so the next task starts from a clean tab.
+		Cookies and storage of the context are kept, see BrowserSessionPool.
+		"""
+		assert self.browser_context, 'BrowserContext is not set up'
+		pages = self.browser_context.pages
+		page = pages[0] if pages else await self.browser_context.new_page()
+		for other_page in pages[1:]:
+			await other_page.close()
+		await page.goto('about:blank')
+
+		self.agent_current_page = page
+		self.human_current_page = page
+		self._cached_browser_state_summary = None
+		self._cached_clickable_element_hashes = None
+
 	async def new_context(self, **kwargs):
 		"""Deprecated: Provides backwards-compatibility with old class method Browser().new_context()."""
 		# TODO: remove this after >=0.3.0
@@ -587,9 +618,39 @@ class BrowserSession(BaseModel):
 		# Expose anti-detection scripts
 		await self.browser_context.add_init_script(init_script)
 
+		# Install buildDomTree.js once per document instead of shipping its source with every DOM snapshot
+		await self.browser_context.add_init_script(get_build_dom_tree_init_script())
+
+		# Track in-flight requests of every page from the start, for the network idle waits
+		for page in self.browser_context.pages:
+			self._get_network_tracker(page)
+			self._watch_tab_title(page)
+		self.browser_context.on('page', self._get_network_tracker)
+		self.browser_context.on('page', self._watch_tab_title)
+
+		await self._setup_resource_blocking()
+
 		# Load cookies from file if specified
 		await self.load_cookies_from_file()
 
+	async def _setup_resource_blocking(self) -> None:
+		"""Abort the requests excluded by the resource blocking settings of the profile, for every page of the context"""
+		profile = self.browser_profile
+		resource_types, url_patterns = RESOURCE_BLOCKING_PROFILES[profile.resource_blocking.value]
+		resource_types = resource_types | set(profile.blocked_resource_types)
+		url_patterns = url_patterns | set(profile.blocked_url_patterns)
+		# routing turns off the browser's http cache, so only install the route when something is actually blocked
+		if not resource_types and not url_patterns:
+			return
+
+		assert self.browser_context is not None, 'BrowserContext is not set up yet'
+		self._resource_blocker = ResourceBlocker(resource_types, url_patterns, profile.resource_blocking_allowed_domains)
+		await self.browser_context.route('**/*', self._resource_blocker.handle_route)
+		logger.debug(
+			f'🚫 Blocking resource types {sorted(resource_types)} and {len(url_patterns)} url patterns '
+			f'(except on {profile.resource_blocking_allowed_domains or "no domains"})'
+		)
+
 	# async def _fork_locked_user_data_dir(self) -> None:
 	# 	"""Fork an in-use user_data_dir by cloning it to a new location to allow a second browser to use it"""
 	# 	# TODO: implement copy-on-write using overlayfs or zfs or something
@@ -650,6 +711,7 @@ class BrowserSession(BaseModel):
 
 		def _BrowserUseonTabVisibilityChange(source: dict[str, str]):
 			"""hook callback fired when init script injected into a page detects a focus event"""
+			# only updates this session, views from new_tab_session() keep their own current pages
 			new_page = source['page']
 
 			# Update human foreground tab state
@@ -905,8 +967,8 @@ class BrowserSession(BaseModel):
 
 		# if both are still None, fallback to using the first open tab we can find
 		if self.agent_current_page is None:
-			if self.browser_context.pages:
-				first_available_tab = self.browser_context.pages[0]
+			if self.tabs:
+				first_available_tab = self.tabs[0]
 				self.agent_current_page = first_available_tab
 				self.human_current_page = first_available_tab
 			else:
@@ -924,15 +986,48 @@ class BrowserSession(BaseModel):
 	def tabs(self) -> list[Page]:
 		if not self.browser_context:
 			return []
+		if self._tab_scope is not None:
+			return [page for page in self.browser_context.pages if page in self._tab_scope]
 		return list(self.browser_context.pages)
 
+	def _adopt_tab(self, page: Page) -> None:
+		"""Add a tab to the tabs of a view from new_tab_session(), along with any popups it opens later"""
+		assert self._tab_scope is not None, 'only tab-scoped views from new_tab_session() have their own tabs'
+		self._tab_scope.add(page)
+		page.on('popup', self._adopt_tab)
+
+	async def new_tab_session(self, url: str | None = None) -> Self:
+		"""
+		Open a new tab and return a view of this session scoped to it, to run another agent on the same browser.
+
+		The view shares the browser, context and network trackers with this session, but has its own current page,
+		tab list (its tab and the popups opened from it) and cached state / selector map, so concurrent agents do
+		not see or switch to each other's tabs. Stopping the view only closes its own tabs.
+
+		Views don't follow human focus: the tab focus binding is registered by this session, so a human switching
+		tabs in the window only updates this session's human_current_page. A view's pages only change through its
+		own actions (switch_to_tab, create_new_tab, popups from its tabs).
+		"""
+		if not self.initialized:
+			await self.start()
+
+		# own profile copy, so kill() on the view (keep_alive=False) can't make the parent kill the shared browser
+		view = self.model_copy(update={'browser_profile': self.browser_profile.model_copy()})
+		view._tab_scope = WeakSet()
+		view._cached_browser_state_summary = None
+		view._cached_clickable_element_hashes = None
+		view.agent_current_page = None
+		view.human_current_page = None
+		await view.create_new_tab(url)
+		return view
+
 	@require_initialization
 	async def new_tab(self, url: str | None = None) -> Page:
 		return await self.create_new_tab(url=url)
 
 	@require_initialization
 	async def switch_tab(self, tab_index: int) -> Page:
-		pages = self.browser_context.pages
+		pages = self.tabs
 		if not pages or tab_index >= len(pages):
 			raise IndexError('Tab index out of range')
 		page = pages[tab_index]
@@ -1048,23 +1143,48 @@ class BrowserSession(BaseModel):
 	@time_execution_async('--get_tabs_info')
 	async def get_tabs_info(self) -> list[TabInfo]:
 		"""Get information about all tabs"""
+		pages = self.tabs
+		titles = await asyncio.gather(*(self._get_tab_title(page) for page in pages))
 
 		tabs_info = []
-		for page_id, page in enumerate(self.browser_context.pages):
-			try:
-				tab_info = TabInfo(page_id=page_id, url=page.url, title=await asyncio.wait_for(page.title(), timeout=1))
-			except TimeoutError:
+		for page_id, (page, title) in enumerate(zip(pages, titles)):
+			if title is None:
 				# page.title() can hang forever on tabs that are crashed/disappeared/about:blank
 				# we dont want to try automating those tabs because they will hang the whole script
 				logger.debug('⚠  Failed to get tab info for tab #%s: %s (ignoring)', page_id, page.url)
-				tab_info = TabInfo(page_id=page_id, url='about:blank', title='ignore this tab and do not use it')
-			tabs_info.append(tab_info)
+				tabs_info.append(TabInfo(page_id=page_id, url='about:blank', title='ignore this tab and do not use it'))
+			else:
+				tabs_info.append(TabInfo(page_id=page_id, url=page.url, title=title))
 
 		return tabs_info
 
+	async def _get_tab_title(self, page: Page) -> str | None:
+		"""
+		Title of a tab, cached until the tab navigates (see _watch_tab_title), except for the agent's own tab whose
+		title can change at any time. A tab that does not answer within 1s gets its last known title, marked as
+		outdated, or None if it never answered.
+		"""
+		title = self._tab_titles.get(page)
+		if title is not None and page is not self.agent_current_page:
+			return title
+
+		try:
+			title = await asyncio.wait_for(page.title(), timeout=1)
+		except Exception:
+			cached_title = self._tab_titles.get(page)
+			return f'{cached_title} (tab not responding, title may be outdated)' if cached_title is not None else None
+
+		self._tab_titles[page] = title
+		return title
+
+	def _watch_tab_title(self, page: Page) -> None:
+		"""Forget the cached title of a tab whenever its main frame navigates or finishes loading"""
+		page.on('framenavigated', lambda frame: frame.parent_frame is None and self._tab_titles.pop(frame.page, None))
+		page.on('load', lambda loaded_page: self._tab_titles.pop(loaded_page, None))
+
 	@require_initialization
 	async def close_tab(self, tab_index: int | None = None) -> None:
-		pages = self.browser_context.pages
+		pages = self.tabs
 		if not pages:
 			return
 
@@ -1261,180 +1381,24 @@ class BrowserSession(BaseModel):
 	# 	"""
 	# 	return list(Path(self.browser_profile.downloads_dir).glob('*'))
 
-	async def _wait_for_stable_network(self):
-		pending_requests = set()
-		last_activity = asyncio.get_event_loop().time()
+	def _get_network_tracker(self, page: Page) -> NetworkIdleTracker:
+		"""Network idle tracker of a page, attached once and kept for the lifetime of the page"""
+		tracker = self._network_trackers.get(page)
+		if tracker is None:
+			tracker = NetworkIdleTracker(self._network_idle_profiles)
+			page.on('request', tracker.on_request)
+			page.on('response', tracker.on_response)
+			page.on('requestfailed', tracker.on_request_failed)
+			self._network_trackers[page] = tracker
+		return tracker
 
+	async def _wait_for_stable_network(self):
 		page = await self.get_current_page()
-
-		# Define relevant resource types and content types
-		RELEVANT_RESOURCE_TYPES = {
-			'document',
-			'stylesheet',
-			'image',
-			'font',
-			'script',
-			'iframe',
-		}
-
-		RELEVANT_CONTENT_TYPES = {
-			'text/html',
-			'text/css',
-			'application/javascript',
-			'image/',
-			'font/',
-			'application/json',
-		}
-
-		# Additional patterns to filter out
-		IGNORED_URL_PATTERNS = {
-			# Analytics and tracking
-			'analytics',
-			'tracking',
-			'telemetry',
-			'beacon',
-			'metrics',
-			# Ad-related
-			'doubleclick',
-			'adsystem',
-			'adserver',
-			'advertising',
-			# Social media widgets
-			'facebook.com/plugins',
-			'platform.twitter',
-			'linkedin.com/embed',
-			# Live chat and support
-			'livechat',
-			'zendesk',
-			'intercom',
-			'crisp.chat',
-			'hotjar',
-			# Push notifications
-			'push-notifications',
-			'onesignal',
-			'pushwoosh',
-			# Background sync/heartbeat
-			'heartbeat',
-			'ping',
-			'alive',
-			# WebRTC and streaming
-			'webrtc',
-			'rtmp://',
-			'wss://',
-			# Common CDNs for dynamic content
-			'cloudfront.net',
-			'fastly.net',
-		}
-
-		async def on_request(request):
-			# Filter by resource type
-			if request.resource_type not in RELEVANT_RESOURCE_TYPES:
-				return
-
-			# Filter out streaming, websocket, and other real-time requests
-			if request.resource_type in {
-				'websocket',
-				'media',
-				'eventsource',
-				'manifest',
-				'other',
-			}:
-				return
-
-			# Filter out by URL patterns
-			url = request.url.lower()
-			if any(pattern in url for pattern in IGNORED_URL_PATTERNS):
-				return
-
-			# Filter out data URLs and blob URLs
-			if url.startswith(('data:', 'blob:')):
-				return
-
-			# Filter out requests with certain headers
-			headers = request.headers
-			if headers.get('purpose') == 'prefetch' or headers.get('sec-fetch-dest') in [
-				'video',
-				'audio',
-			]:
-				return
-
-			nonlocal last_activity
-			pending_requests.add(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request started: {request.url} ({request.resource_type})')
-
-		async def on_response(response):
-			request = response.request
-			if request not in pending_requests:
-				return
-
-			# Filter by content type if available
-			content_type = response.headers.get('content-type', '').lower()
-
-			# Skip if content type indicates streaming or real-time data
-			if any(
-				t in content_type
-				for t in [
-					'streaming',
-					'video',
-					'audio',
-					'webm',
-					'mp4',
-					'event-stream',
-					'websocket',
-					'protobuf',
-				]
-			):
-				pending_requests.remove(request)
-				return
-
-			# Only process relevant content types
-			if not any(ct in content_type for ct in RELEVANT_CONTENT_TYPES):
-				pending_requests.remove(request)
-				return
-
-			# Skip if response is too large (likely not essential for page load)
-			content_length = response.headers.get('content-length')
-			if content_length and int(content_length) > 5 * 1024 * 1024:  # 5MB
-				pending_requests.remove(request)
-				return
-
-			nonlocal last_activity
-			pending_requests.remove(request)
-			last_activity = asyncio.get_event_loop().time()
-			# logger.debug(f'Request resolved: {request.url} ({content_type})')
-
-		# Attach event listeners
-		page.on('request', on_request)
-		page.on('response', on_response)
-
-		now = asyncio.get_event_loop().time()
-		try:
-			# Wait for idle time
-			start_time = asyncio.get_event_loop().time()
-			while True:
-				await asyncio.sleep(0.1)
-				now = asyncio.get_event_loop().time()
-				if (
-					len(pending_requests) == 0
-					and (now - last_activity) >= self.browser_profile.wait_for_network_idle_page_load_time
-				):
-					break
-				if now - start_time > self.browser_profile.maximum_wait_page_load_time:
-					logger.debug(
-						f'Network timeout after {self.browser_profile.maximum_wait_page_load_time}s with {len(pending_requests)} '
-						f'pending requests: {[r.url for r in pending_requests]}'
-					)
-					break
-
-		finally:
-			# Clean up event listeners
-			page.remove_listener('request', on_request)
-			page.remove_listener('response', on_response)
-
-		elapsed = now - start_time
-		if elapsed > 1:
-			logger.debug(f'💤 Page network traffic calmed down after {now - start_time:.2f} seconds')
+		await self._get_network_tracker(page).wait_for_idle(
+			page.url,
+			idle_time=self.browser_profile.wait_for_network_idle_page_load_time,
+			timeout=self.browser_profile.maximum_wait_page_load_time,
+		)
 
 	async def _wait_for_page_and_frames_load(self, timeout_overwrite: float | None = None):
 		"""
@@ -1480,9 +1444,12 @@ class BrowserSession(BaseModel):
 			bytes_used = None
 
 		tab_idx = self.tabs.index(page)
+		blocked_count = sum(self._resource_blocker.blocked_requests.values()) if self._resource_blocker else 0
 		if bytes_used is not None:
 			logger.debug(
-				f'➡️ Page navigation [{tab_idx}]{_log_pretty_url(page.url, 40)} used {bytes_used / 1024:.1f} KB in {elapsed:.2f}s, waiting +{remaining:.2f}s for all frames to finish'
+				f'➡️ Page navigation [{tab_idx}]{_log_pretty_url(page.url, 40)} used {bytes_used / 1024:.1f} KB in {elapsed:.2f}s'
+				+ (f' ({blocked_count} requests blocked)' if blocked_count else '')
+				+ f', waiting +{remaining:.2f}s for all frames to finish'
 			)
 		else:
 			logger.debug(
@@ -1511,21 +1478,16 @@ class BrowserSession(BaseModel):
 		if url == 'about:blank':
 			return True
 
-		for allowed_domain in self.browser_profile.allowed_domains:
-			try:
-				if match_url_with_domain_pattern(url, allowed_domain, log_warnings=True):
-					# If it's a pattern with wildcards, show a warning
-					if '*' in allowed_domain:
-						parsed_url = urlparse(url)
-						domain = parsed_url.hostname.lower() if parsed_url.hostname else ''
-						_log_glob_warning(domain, allowed_domain)
-					return True
-			except AssertionError:
-				# This would only happen if about:blank is passed to match_url_with_domain_pattern,
-				# which shouldn't occur since we check for it above
-				continue
+		allowed_domain = compile_domain_patterns(tuple(self.browser_profile.allowed_domains), log_warnings=True).match(url)
+		if allowed_domain is None:
+			return False
 
-		return False
+		# If it's a pattern with wildcards, show a warning
+		if '*' in allowed_domain:
+			parsed_url = urlparse(url)
+			domain = parsed_url.hostname.lower() if parsed_url.hostname else ''
+			_log_glob_warning(domain, allowed_domain)
+		return True
 
 	async def _check_and_handle_navigation(self, page: Page) -> None:
 		"""Check if current page URL is allowed and handle if not."""
@@ -1601,7 +1563,7 @@ class BrowserSession(BaseModel):
 			self.human_current_page = None
 
 		# Switch to the first available tab if any exist
-		if self.browser_context.pages:
+		if self.tabs:
 			await self.switch_to_tab(0)
 			# switch_to_tab already updates both tab references
 
@@ -1684,7 +1646,9 @@ class BrowserSession(BaseModel):
 		return structure
 
 	@time_execution_sync('--get_state_summary')  # This decorator might need to be updated to handle async
-	async def get_state_summary(self, cache_clickable_elements_hashes: bool) -> BrowserStateSummary:
+	async def get_state_summary(
+		self, cache_clickable_elements_hashes: bool, include_screenshot: bool = True
+	) -> BrowserStateSummary:
 		"""Get a summary of the current browser state
 
 		This method builds a BrowserStateSummary object that captures the current state
@@ -1696,9 +1660,12 @@ class BrowserSession(BaseModel):
 			If True, cache the clickable elements hashes for the current state.
 			This is used to calculate which elements are new to the LLM since the last message,
 			which helps reduce token usage.
+		include_screenshot: bool
+			If False, no screenshot is taken, e.g. when the agent does not use vision.
+			Screenshots are also skipped when the browser profile has screenshot_mode='off'.
 		"""
 		await self._wait_for_page_and_frames_load()
-		updated_state = await self._get_updated_state()
+		updated_state = await self._get_updated_state(include_screenshot=include_screenshot)
 
 		# Find out which elements are new
 		# Do this only if url has not changed
@@ -1728,7 +1695,7 @@ class BrowserSession(BaseModel):
 
 		return self._cached_browser_state_summary
 
-	async def _get_updated_state(self, focus_element: int = -1) -> BrowserStateSummary:
+	async def _get_updated_state(self, focus_element: int = -1, include_screenshot: bool = True) -> BrowserStateSummary:
 		"""Update and return state."""
 
 		page = await self.get_current_page()
@@ -1742,15 +1709,56 @@ class BrowserSession(BaseModel):
 			raise BrowserError('Browser closed: no valid pages available')
 
 		try:
-			await self.remove_highlights()
-			dom_service = DomService(page)
-			content = await dom_service.get_clickable_elements(
-				focus_element=focus_element,
-				viewport_expansion=self.browser_profile.viewport_expansion,
-				highlight_elements=self.browser_profile.highlight_elements,
-			)
+			# NOTE: The parts of the state are independent round trips to the browser and run concurrently,
+			#       except for the highlights: the old ones are removed before the DOM is walked (it draws
+			#       new ones), and the screenshot is taken after the walk so it shows the new ones.
+			timings: dict[str, float] = {}
 
-			tabs_info = await self.get_tabs_info()
+			async def timed(name: str, awaitable):
+				start = time.perf_counter()
+				try:
+					return await awaitable
+				finally:
+					timings[name] = time.perf_counter() - start
+
+			async def capture_dom_and_screenshot():
+				await timed('remove_highlights', self.remove_highlights())
+				dom_service = DomService(
+					page,
+					columnar_transport=self.browser_profile.columnar_dom_transport,
+					engine=self.browser_profile.dom_engine,
+				)
+				snapshot_cache = None
+				if self.browser_profile.incremental_dom_snapshots:
+					snapshot_cache = self._dom_snapshot_caches.setdefault(page, DOMSnapshotCache())
+				content = await timed(
+					'dom',
+					dom_service.get_clickable_elements(
+						focus_element=focus_element,
+						viewport_expansion=self.browser_profile.viewport_expansion,
+						highlight_elements=self.browser_profile.highlight_elements,
+						snapshot_cache=snapshot_cache,
+					),
+				)
+				screenshot_b64 = None
+				screenshot_mode = self.browser_profile.screenshot_mode
+				if include_screenshot and screenshot_mode != ScreenshotMode.OFF:
+					screenshot_b64 = await timed(
+						'screenshot', self.take_screenshot(full_page=screenshot_mode == ScreenshotMode.FULL_PAGE)
+					)
+				return content, screenshot_b64
+
+			start = time.perf_counter()
+			(content, screenshot_b64), tabs_info, (pixels_above, pixels_below), title = await asyncio.gather(
+				capture_dom_and_screenshot(),
+				timed('tabs', self.get_tabs_info()),
+				timed('scroll_info', self.get_scroll_info(page)),
+				timed('title', page.title()),
+			)
+			timings['total'] = time.perf_counter() - start
+			logger.debug(
+				'⏱️ State captured in ' + ', '.join(f'{name}={seconds * 1000:.0f}ms' for name, seconds in timings.items())
+			)
 
 			# Get all cross-origin iframes within the page and open them in new tabs
 			# mark the titles of the new tabs so the LLM knows to check them for additional content
@@ -1773,18 +1781,17 @@ class BrowserSession(BaseModel):
 			# 		)
 			# 	)
 
-			screenshot_b64 = await self.take_screenshot()
-			pixels_above, pixels_below = await self.get_scroll_info(page)
-
 			self.browser_state_summary = BrowserStateSummary(
 				element_tree=content.element_tree,
 				selector_map=content.selector_map,
 				url=page.url,
-				title=await page.title(),
+				title=title,
 				tabs=tabs_info,
 				screenshot=screenshot_b64,
 				pixels_above=pixels_above,
 				pixels_below=pixels_below,
+				capture_timings=timings,
+				blocked_requests=self._resource_blocker.pop_stats() if self._resource_blocker else {},
 			)
 
 			return self.browser_state_summary
@@ -1801,6 +1808,8 @@ class BrowserSession(BaseModel):
 	async def take_screenshot(self, full_page: bool = False) -> str:
 		"""
 		Returns a base64 encoded screenshot of the current page.
+
+		The image format, quality and size follow the screenshot_* options of the browser profile.
 		"""
 		assert self.agent_current_page is not None, 'Agent current page is not set'
 
@@ -1809,6 +1818,18 @@ class BrowserSession(BaseModel):
 			timeout=5000,
 		)  # page has already loaded by this point, this is extra for previous action animations/frame loads to settle
 
+		profile = self.browser_profile
+		# page.screenshot() cannot encode webp or downscale, use CDP for those
+		if profile.screenshot_use_cdp or profile.screenshot_format == ScreenshotFormat.WEBP or profile.screenshot_max_dimension:
+			try:
+				return await self._take_cdp_screenshot(page, full_page)
+			except Exception as e:
+				logger.debug(f'⚠️ CDP screenshot failed, falling back to page.screenshot(): {type(e).__name__}: {e}')
+
+		image_options: dict[str, Any] = {'type': 'png'}
+		if profile.screenshot_format == ScreenshotFormat.JPEG:
+			image_options = {'type': 'jpeg', 'quality': profile.screenshot_quality}
+
 		# 0. Attempt full-page screenshot (sometimes times out for huge pages)
 		try:
 			screenshot = await page.screenshot(
@@ -1817,6 +1838,7 @@ class BrowserSession(BaseModel):
 				timeout=15000,
 				animations='disabled',
 				caret='initial',
+				**image_options,
 			)
 
 			screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
@@ -1855,6 +1877,7 @@ class BrowserSession(BaseModel):
 				clip={'x': 0, 'y': 0, 'width': expanded_width, 'height': expanded_height},
 				# animations='disabled',   # these can cause CSP errors on some pages, leading to a red herring "waiting for fonts to load" error
 				# caret='initial',
+				**image_options,
 			)
 			# TODO: manually take multiple clipped screenshots to capture the full height and stitch them together?
 
@@ -1871,6 +1894,42 @@ class BrowserSession(BaseModel):
 				# await page.set_viewport_size(None)  # unfortunately this is not supported by playwright
 				pass
 
+	async def _take_cdp_screenshot(self, page: Page, full_page: bool) -> str:
+		"""Screenshot with Page.captureScreenshot, which encodes webp and scales the image in the browser (Chromium only)"""
+		profile = self.browser_profile
+		cdp_session = await page.context.new_cdp_session(page)  # type: ignore
+		try:
+			metrics = await cdp_session.send('Page.getLayoutMetrics')
+			css_viewport = metrics['cssVisualViewport']
+			if full_page:
+				clip = {'x': 0, 'y': 0, **{key: metrics['cssContentSize'][key] for key in ('width', 'height')}}
+			else:
+				clip = {
+					'x': css_viewport['pageX'],
+					'y': css_viewport['pageY'],
+					'width': css_viewport['clientWidth'],
+					'height': css_viewport['clientHeight'],
+				}
+
+			# same as scale='css': one image pixel per css pixel, whatever the device pixel ratio
+			device_pixel_ratio = metrics.get('visualViewport', css_viewport)['clientWidth'] / css_viewport['clientWidth']
+			scale = 1 / device_pixel_ratio
+			if profile.screenshot_max_dimension:
+				scale *= min(1, profile.screenshot_max_dimension / max(clip['width'], clip['height']))
+
+			params: dict[str, Any] = {
+				'format': profile.screenshot_format.value,
+				'clip': {**clip, 'scale': scale},
+				'captureBeyondViewport': full_page,
+			}
+			if profile.screenshot_format != ScreenshotFormat.PNG and profile.screenshot_quality is not None:
+				params['quality'] = profile.screenshot_quality
+
+			result = await cdp_session.send('Page.captureScreenshot', params)
+			return result['data']
+		finally:
+			await cdp_session.detach()
+
 	# region - User Actions
 
 	@staticmethod
@@ -2071,6 +2130,12 @@ class BrowserSession(BaseModel):
 	@time_execution_async('--get_locate_element')
 	async def get_locate_element(self, element: DOMElementNode) -> ElementHandle | None:
 		page = await self.get_current_page()
+
+		# Fast path: the element registered by buildDomTree.js under its highlight index
+		element_handle = await self._get_registered_element(page, element)
+		if element_handle:
+			return element_handle
+
 		current_frame = page
 
 		# Start with the target element and collect all parents
@@ -2114,6 +2179,42 @@ class BrowserSession(BaseModel):
 			logger.error(f'❌  Failed to locate element: {str(e)}')
 			return None
 
+	async def _get_registered_element(self, page: Page, element: DOMElementNode) -> ElementHandle | None:
+		"""
+		Resolve a highlighted element through the in-page registry of buildDomTree.js, scrolled into view.
+		Returns None when the registry is missing or stale (navigation, element removed or moved),
+		or for elements inside iframes, so the caller falls back to the CSS selector.
+		"""
+		if element.highlight_index is None:
+			return None
+		# The registry is only rebuilt by buildDomTree.js: with the CDP engine the highlight indexes come from the
+		# snapshot, and a registry left by an earlier buildDomTree.js run (fallback) could map them to other elements
+		if self.browser_profile.dom_engine != DOMEngine.JS:
+			return None
+
+		try:
+			handle = await page.evaluate_handle(
+				"""({ index, xpath }) => {
+					const entry = window.__browserUseElementRegistry?.get(index);
+					if (!entry || entry.parentIframe || entry.xpath !== xpath || !entry.element.isConnected) return null;
+					const element = entry.element;
+					if (element.getClientRects().length > 0) {
+						if (typeof element.scrollIntoViewIfNeeded === 'function') element.scrollIntoViewIfNeeded();
+						else element.scrollIntoView({ block: 'nearest' });
+					}
+					return element;
+				}""",
+				{'index': element.highlight_index, 'xpath': element.xpath},
+			)
+		except Exception as e:
+			logger.debug(f'Element registry lookup failed for index {element.highlight_index}: {type(e).__name__}: {e}')
+			return None
+
+		element_handle = handle.as_element()
+		if element_handle is None:
+			await handle.dispose()
+		return element_handle
+
 	@require_initialization
 	@time_execution_async('--get_locate_element_by_xpath')
 	async def get_locate_element_by_xpath(self, xpath: str) -> ElementHandle | None:
@@ -2256,7 +2357,7 @@ class BrowserSession(BaseModel):
 	async def switch_to_tab(self, page_id: int) -> Page:
 		"""Switch to a specific tab by its page_id (aka tab index exposed to LLM)"""
 		assert self.browser_context is not None, 'Browser context is not set'
-		pages = self.browser_context.pages
+		pages = self.tabs
 
 		if page_id >= len(pages):
 			raise BrowserError(f'No tab found with page_id: {page_id}')
@@ -2289,6 +2390,8 @@ class BrowserSession(BaseModel):
 			raise BrowserError(f'Cannot create new tab with non-allowed URL: {url}')
 
 		new_page = await self.browser_context.new_page()
+		if self._tab_scope is not None:
+			self._adopt_tab(new_page)
 
 		# Update agent tab reference
 		self.agent_current_page = new_page
@@ -2315,7 +2418,7 @@ class BrowserSession(BaseModel):
 		# 	assert self.agent_current_page.url == 'about:blank'
 
 		# if there are any unused about:blank tabs after we open a new tab, close them to clean up unused tabs
-		for page in self.browser_context.pages:
+		for page in self.tabs:
 			if page.url == 'about:blank' and page != self.agent_current_page:
 				await page.close()
 				self.human_current_page = (  # in case we just closed the human's tab, fix the refs
@@ -2432,9 +2535,9 @@ class BrowserSession(BaseModel):
 	@require_initialization
 	async def get_scroll_info(self, page: Page) -> tuple[int, int]:
 		"""Get scroll position information for the current page."""
-		scroll_y = await page.evaluate('window.scrollY')
-		viewport_height = await page.evaluate('window.innerHeight')
-		total_height = await page.evaluate('document.documentElement.scrollHeight')
+		scroll_y, viewport_height, total_height = await page.evaluate(
+			'() => [window.scrollY, window.innerHeight, document.documentElement.scrollHeight]'
+		)
 		pixels_above = scroll_y
 		pixels_below = total_height - (scroll_y + viewport_height)
 		return pixels_above, pixels_below
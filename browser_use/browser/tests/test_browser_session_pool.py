@@ -0,0 +1,170 @@
+import pytest
+
+from browser_use.browser.pool import BrowserSessionPool, PooledContext
+from browser_use.browser.session import BrowserSession
+
+
+class FakePage:
+	def __init__(self, url: str = 'https://example.com/'):
+		self.url = url
+		self.closed = False
+
+	async def goto(self, url: str) -> None:
+		self.url = url
+
+	async def evaluate(self, expression: str):
+		return 2
+
+	def is_closed(self) -> bool:
+		return self.closed
+
+	async def close(self) -> None:
+		self.closed = True
+
+
+class FakeBrowserContext:
+	browser = None
+
+	def __init__(self, pages: list[FakePage]):
+		self.pages = pages
+		self.closed = False
+
+	async def new_page(self) -> FakePage:
+		page = FakePage('about:blank')
+		self.pages.append(page)
+		return page
+
+	async def close(self) -> None:
+		self.closed = True
+
+
+class FakeBrowser:
+	def is_connected(self) -> bool:
+		return True
+
+
+class FakePool(BrowserSessionPool):
+	"""BrowserSessionPool on fake browsers, replacing a context fails while `fail_replace` is set"""
+
+	def __init__(self, **kwargs):
+		super().__init__(**kwargs)
+		self.fail_replace = False
+		self.memory_mb = 0.0
+		self.launches = 0
+
+	async def start(self) -> 'FakePool':
+		for _ in range(self.size):
+			self._idle.put_nowait(await self._new_pooled_context(await self._launch_browser()))
+		return self
+
+	async def _launch_browser(self) -> FakeBrowser:
+		self.launches += 1
+		return FakeBrowser()
+
+	async def _new_pooled_context(self, browser) -> PooledContext:
+		if self.fail_replace:
+			raise RuntimeError('browser crashed')
+		# what BrowserSession.start() leaves behind on a passed in browser and context
+		browser_session = BrowserSession(browser_profile=self.browser_profile.model_copy())
+		browser_session.browser = browser
+		browser_session.browser_context = FakeBrowserContext([FakePage()])
+		browser_session.initialized = True
+		await browser_session.reset()
+		return PooledContext(browser=browser, browser_session=browser_session)
+
+	async def _get_memory_mb(self, pooled: PooledContext) -> float:
+		return self.memory_mb
+
+
+async def test_reset_keeps_one_blank_tab():
+	browser_session = BrowserSession()
+	pages = [FakePage('https://example.com/a'), FakePage('https://example.com/b')]
+	browser_session.browser_context = FakeBrowserContext(pages)
+
+	await browser_session.reset()
+
+	assert pages[0].url == 'about:blank' and not pages[0].closed
+	assert pages[1].closed
+	assert browser_session.agent_current_page is pages[0]
+	assert browser_session.human_current_page is pages[0]
+
+
+async def test_contexts_are_reused_until_recycled():
+	pool = await FakePool(size=1, max_steps_per_context=10, max_context_memory_mb=100).start()
+
+	browser_session = await pool.acquire()
+	await pool.release(browser_session, steps=5)
+	assert await pool.acquire() is browser_session
+
+	# the step limit recycles the context
+	await pool.release(browser_session, steps=5)
+	recycled = await pool.acquire()
+	assert recycled is not browser_session
+	assert browser_session.browser_context.closed
+
+	# so does the memory limit
+	pool.memory_mb = 200
+	await pool.release(recycled)
+	assert await pool.acquire() is not recycled
+
+
+async def test_failed_replacement_keeps_the_slot():
+	pool = await FakePool(size=1, max_steps_per_context=1).start()
+	browser_session = await pool.acquire()
+
+	pool.fail_replace = True
+	await pool.release(browser_session, steps=1)
+	assert pool._idle.qsize() == 1
+
+	# acquire() retries the broken slot, and puts it back if that fails again
+	with pytest.raises(RuntimeError):
+		await pool.acquire()
+	assert pool._idle.qsize() == 1
+
+	pool.fail_replace = False
+	replaced = await pool.acquire()
+	assert replaced is not browser_session
+
+
+async def test_release_of_unknown_session_raises():
+	pool = await FakePool(size=1).start()
+	with pytest.raises(ValueError):
+		await pool.release(BrowserSession())
+
+
+async def test_stopped_sessions_are_reused(monkeypatch):
+	pool = await FakePool(size=1).start()
+
+	async def start(self):
+		raise AssertionError('the pool must not start() a pooled session, that launches a browser it does not track')
+
+	monkeypatch.setattr(BrowserSession, 'start', start)
+
+	for _ in range(3):
+		browser_session = await pool.acquire()
+		browser, browser_context = browser_session.browser, browser_session.browser_context
+
+		# Agent.close() stops the session, keep_alive=True leaves the browser running
+		await browser_session.stop()
+		assert not browser_session.initialized
+		await pool.release(browser_session, steps=1)
+
+		assert await pool.acquire() is browser_session
+		assert browser_session.browser is browser
+		assert browser_session.browser_context is browser_context
+		assert not browser_context.closed
+		await pool.release(browser_session)
+
+	assert pool.launches == 1
+
+
+async def test_unhealthy_contexts_are_replaced():
+	pool = await FakePool(size=1).start()
+	browser_session = await pool.acquire()
+	await pool.release(browser_session)
+
+	browser_session.agent_current_page.closed = True
+	replaced = await pool.acquire()
+	assert replaced is not browser_session
+	assert browser_session.browser_context.closed
+	assert replaced.browser is browser_session.browser
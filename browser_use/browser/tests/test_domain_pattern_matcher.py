@@ -0,0 +1,66 @@
+import random
+
+from browser_use.utils import DomainPatternMatcher, match_url_with_domain_pattern
+
+SCHEMES = ['https', 'http', 'chrome-extension', 'ftp', 'HTTPS']
+HOSTS = [
+	'example.com',
+	'www.example.com',
+	'a.b.example.com',
+	'ab.example.com',
+	'example.org',
+	'badexample.com',
+	'example.com.evil.org',
+	'google.com',
+	'docs.google.com',
+]
+PATTERNS = [
+	'example.com',
+	'*.example.com',
+	'http://example.com',
+	'http*://example.com',
+	'http*://*.example.com',
+	'chrome-extension://*',
+	'*',
+	'https://*',
+	'*.google.com:443',
+	'EXAMPLE.org',
+	'*example.com',
+	'*.*.example.com',
+	'example.*',
+	'w?w.example.com',
+	'*.exam?le.com',
+	'a*.example.com',
+	'*.b.example.com',
+	'[ab].b.example.com',
+	'',
+]
+
+
+def random_url(rng: random.Random) -> str:
+	url = f'{rng.choice(SCHEMES)}://{rng.choice(HOSTS)}'
+	if rng.random() < 0.3:
+		url += f':{rng.choice([80, 443, 8080])}'
+	return url + rng.choice(['', '/', '/jobs/view/1?refId=x', '/@evil.com/'])
+
+
+def test_matcher_agrees_with_match_url_with_domain_pattern():
+	rng = random.Random(1234)
+	urls = [random_url(rng) for _ in range(300)] + ['about:blank', 'data:text/html,hi', 'not a url', 'https://', 'https://[::1']
+
+	for _ in range(200):
+		patterns = rng.sample(PATTERNS, rng.randint(1, 4))
+		matcher = DomainPatternMatcher(patterns)
+		for url in urls:
+			expected = any(match_url_with_domain_pattern(url, pattern) for pattern in patterns)
+			assert matcher.matches(url) == expected, (url, patterns)
+			if expected:
+				assert match_url_with_domain_pattern(url, matcher.match(url))
+
+
+def test_matcher_caches_decisions():
+	matcher = DomainPatternMatcher(['*.example.com'])
+	assert matcher.matches('https://jobs.example.com/a')
+	assert matcher.matches('https://jobs.example.com/a')
+	assert not matcher.matches('https://example.com.evil.org/')
+	assert matcher.match.cache_info().hits == 1
@@ -0,0 +1,55 @@
+import pytest
+
+from browser_use.browser.profile import BrowserProfile, DOMEngine
+from browser_use.browser.session import BrowserSession
+from browser_use.dom.views import DOMElementNode
+
+
+class FakeHandle:
+	def __init__(self, element):
+		self.element = element
+
+	def as_element(self):
+		return self.element
+
+
+class FakePage:
+	def __init__(self, element):
+		self.element = element
+		self.lookups: list[dict] = []
+
+	async def evaluate_handle(self, expression: str, arg: dict) -> FakeHandle:
+		self.lookups.append(arg)
+		return FakeHandle(self.element)
+
+
+def button() -> DOMElementNode:
+	return DOMElementNode(
+		tag_name='button',
+		xpath='html/body/ul/li[1]/button',
+		attributes={},
+		children=[],
+		is_visible=True,
+		parent=None,
+		highlight_index=3,
+	)
+
+
+async def test_registry_resolves_highlight_indexes_of_the_js_engine():
+	browser_session = BrowserSession(browser_profile=BrowserProfile(dom_engine=DOMEngine.JS))
+	page = FakePage(element='handle')
+
+	assert await browser_session._get_registered_element(page, button()) == 'handle'
+	assert page.lookups == [{'index': 3, 'xpath': 'html/body/ul/li[1]/button'}]
+
+
+@pytest.mark.parametrize('highlight_index', [3, None])
+async def test_registry_is_skipped_for_cdp_snapshots(highlight_index):
+	# a registry left by a buildDomTree.js fallback must not resolve indexes of a CDP snapshot
+	browser_session = BrowserSession(browser_profile=BrowserProfile(dom_engine=DOMEngine.CDP_SNAPSHOT))
+	page = FakePage(element='stale handle')
+	element = button()
+	element.highlight_index = highlight_index
+
+	assert await browser_session._get_registered_element(page, element) is None
+	assert page.lookups == []
@@ -0,0 +1,43 @@
+from dataclasses import dataclass, field
+
+from browser_use.browser.network import NetworkIdleProfiles, NetworkIdleTracker
+
+
+@dataclass(eq=False)
+class FakeRequest:
+	url: str
+	resource_type: str
+	headers: dict = field(default_factory=dict)
+
+
+def request(url: str, resource_type: str) -> FakeRequest:
+	return FakeRequest(url=url, resource_type=resource_type)
+
+
+async def test_only_images_fonts_and_iframes_are_learned_as_background():
+	profiles = NetworkIdleProfiles(learn_after=2)
+	tracker = NetworkIdleTracker(profiles)
+	for url, resource_type in [
+		('https://example.com/jobs', 'document'),
+		('https://example.com/app.js', 'script'),
+		('https://example.com/slow.png', 'image'),
+	]:
+		tracker.on_request(request(url, resource_type))
+
+	assert not await tracker.wait_for_idle('https://example.com/jobs', idle_time=0.01, timeout=0.01)
+	assert not await tracker.wait_for_idle('https://example.com/jobs', idle_time=0.01, timeout=0.01)
+
+	assert profiles.is_background('example.com', 'example.com/slow.png')
+	assert not profiles.is_background('example.com', 'example.com/jobs')
+	assert not profiles.is_background('example.com', 'example.com/app.js')
+	# the pending document still delays the wait
+	assert not await tracker.wait_for_idle('https://example.com/jobs', idle_time=0.01, timeout=0.01)
+
+
+async def test_learned_endpoints_do_not_delay_the_wait():
+	profiles = NetworkIdleProfiles(learn_after=1)
+	tracker = NetworkIdleTracker(profiles)
+	tracker.on_request(request('https://example.com/pixel.gif', 'image'))
+
+	assert not await tracker.wait_for_idle('https://example.com/', idle_time=0.01, timeout=0.01)
+	assert await tracker.wait_for_idle('https://example.com/', idle_time=0.01, timeout=0.5)
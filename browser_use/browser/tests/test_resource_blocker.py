@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from browser_use.browser.network import RESOURCE_BLOCKING_PROFILES, ResourceBlocker
+
+
+def request(url: str, resource_type: str = 'xhr') -> SimpleNamespace:
+	return SimpleNamespace(url=url, resource_type=resource_type)
+
+
+def blocker(profile: str, allowed_domains: list[str] | None = None) -> ResourceBlocker:
+	resource_types, url_patterns = RESOURCE_BLOCKING_PROFILES[profile]
+	return ResourceBlocker(resource_types, url_patterns, allowed_domains or [])
+
+
+def test_tracking_patterns_match_hostname_and_path_only():
+	tracking = blocker('tracking')
+
+	assert tracking.should_block(request('https://www.google-analytics.com/g/collect?v=2'))
+	assert tracking.should_block(request('https://px.ads.linkedin.com/adserver/collect', 'image'))
+	assert tracking.should_block(request('https://www.linkedin.com/li/tracking/visitor'))
+
+	# first-party requests mentioning tracking words in the query are not blocked
+	assert not tracking.should_block(request('https://www.linkedin.com/voyager/api/search?keywords=analytics'))
+	assert not tracking.should_block(request('https://www.linkedin.com/jobs/view/1?trackingId=abc', 'fetch'))
+	assert not tracking.should_block(request('https://example.com/page#beacon'))
+
+
+def test_documents_and_allowed_domains_are_never_blocked():
+	tracking = blocker('tracking', allowed_domains=['*.analytics.example.com'])
+
+	assert not tracking.should_block(request('https://www.google-analytics.com/', 'document'))
+	assert not tracking.should_block(request('https://cdn.analytics.example.com/tracking.js', 'script'))
+
+
+def test_text_only_blocks_resource_types():
+	text_only = blocker('text_only')
+
+	assert text_only.should_block(request('https://media.licdn.com/photo.jpg', 'image'))
+	assert text_only.should_block(request('https://static.licdn.com/font.woff2', 'font'))
+	assert not text_only.should_block(request('https://static.licdn.com/app.js', 'script'))
+	assert not blocker('none').should_block(request('https://www.google-analytics.com/collect', 'image'))
@@ -0,0 +1,55 @@
+import base64
+import io
+import sys
+
+import pytest
+
+from browser_use.browser.screenshots import HASH_SIZE, SIMILAR_MAX_DISTANCE, screenshot_hash, screenshots_match
+
+
+def png(draw) -> str:
+	Image = pytest.importorskip('PIL.Image')
+	ImageDraw = pytest.importorskip('PIL.ImageDraw')
+	image = Image.new('RGB', (320, 240), 'white')
+	draw(ImageDraw.Draw(image))
+	buffer = io.BytesIO()
+	image.save(buffer, format='PNG')
+	return base64.b64encode(buffer.getvalue()).decode()
+
+
+def test_hashes_within_the_threshold_match():
+	hash_a = '0' * (HASH_SIZE * HASH_SIZE // 4)
+	hash_b = f'{(1 << SIMILAR_MAX_DISTANCE) - 1:0{HASH_SIZE * HASH_SIZE // 4}x}'
+	hash_c = f'{(1 << (SIMILAR_MAX_DISTANCE + 1)) - 1:0{HASH_SIZE * HASH_SIZE // 4}x}'
+
+	assert screenshots_match(hash_a, hash_a)
+	assert screenshots_match(hash_a, hash_b)
+	assert not screenshots_match(hash_a, hash_c)
+	assert screenshots_match(hash_a, hash_c, max_distance=SIMILAR_MAX_DISTANCE + 1)
+
+
+def test_exact_digest_fallback_without_pillow(monkeypatch):
+	monkeypatch.setitem(sys.modules, 'PIL', None)
+	hash_a = screenshot_hash(base64.b64encode(b'screenshot a').decode())
+
+	assert hash_a.startswith('sha1:')
+	assert screenshot_hash(base64.b64encode(b'screenshot a').decode()) == hash_a
+	assert not screenshots_match(hash_a, screenshot_hash(base64.b64encode(b'screenshot b').decode()))
+	# a digest never matches a perceptual hash
+	assert not screenshots_match(hash_a, '0' * (HASH_SIZE * HASH_SIZE // 4))
+
+
+def test_perceptual_hash_ignores_small_changes():
+	page = png(lambda d: (d.rectangle((20, 20, 300, 60), fill='navy'), d.rectangle((20, 100, 150, 220), fill='gray')))
+	caret = png(
+		lambda d: (
+			d.rectangle((20, 20, 300, 60), fill='navy'),
+			d.rectangle((20, 100, 150, 220), fill='gray'),
+			d.line((200, 120, 200, 132), fill='black'),
+		)
+	)
+	other_page = png(lambda d: (d.rectangle((20, 20, 120, 220), fill='navy'), d.rectangle((160, 140, 300, 220), fill='gray')))
+
+	assert len(screenshot_hash(page)) == HASH_SIZE * HASH_SIZE // 4
+	assert screenshots_match(screenshot_hash(page), screenshot_hash(caret))
+	assert not screenshots_match(screenshot_hash(page), screenshot_hash(other_page))
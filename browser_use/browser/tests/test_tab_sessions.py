@@ -0,0 +1,142 @@
+import pytest
+
+from browser_use.browser.session import BrowserSession
+from browser_use.browser.views import BrowserError
+
+
+class FakePage:
+	def __init__(self, context: 'FakeBrowserContext', url: str = 'about:blank'):
+		self.context = context
+		self.url = url
+		self.closed = False
+		self.handlers: dict[str, list] = {}
+
+	def on(self, event: str, handler) -> None:
+		self.handlers.setdefault(event, []).append(handler)
+
+	def is_closed(self) -> bool:
+		return self.closed
+
+	async def goto(self, url: str, **kwargs) -> None:
+		self.url = url
+
+	async def wait_for_load_state(self, *args, **kwargs) -> None:
+		pass
+
+	async def bring_to_front(self) -> None:
+		pass
+
+	async def set_viewport_size(self, viewport) -> None:
+		pass
+
+	async def close(self) -> None:
+		self.closed = True
+		self.context.pages.remove(self)
+
+	def open_popup(self, url: str) -> 'FakePage':
+		"""Open a page from this one, like window.open() or a target=_blank link"""
+		popup = FakePage(self.context, url)
+		self.context.pages.append(popup)
+		for handler in self.handlers.get('popup', []):
+			handler(popup)
+		return popup
+
+
+class FakeBrowserContext:
+	def __init__(self):
+		self.pages: list[FakePage] = []
+
+	async def new_page(self) -> FakePage:
+		page = FakePage(self)
+		self.pages.append(page)
+		return page
+
+
+@pytest.fixture
+def browser_session(monkeypatch):
+	async def _wait_for_page_and_frames_load(self, timeout_overwrite=None):
+		pass
+
+	monkeypatch.setattr(BrowserSession, '_wait_for_page_and_frames_load', _wait_for_page_and_frames_load)
+
+	browser_context = FakeBrowserContext()
+	page = FakePage(browser_context, 'https://parent.com/')
+	browser_context.pages.append(page)
+
+	browser_session = BrowserSession()
+	browser_session.browser_context = browser_context
+	browser_session.agent_current_page = page
+	browser_session.human_current_page = page
+	browser_session.initialized = True
+	return browser_session
+
+
+async def test_views_only_see_their_own_tabs(browser_session):
+	view_a = await browser_session.new_tab_session('https://a.com/')
+	view_b = await browser_session.new_tab_session('https://b.com/')
+
+	assert [page.url for page in view_a.tabs] == ['https://a.com/']
+	assert [page.url for page in view_b.tabs] == ['https://b.com/']
+	assert view_a.agent_current_page is view_a.tabs[0]
+	assert view_b.agent_current_page is view_b.tabs[0]
+
+	# the parent session still sees every tab in the browser
+	assert [page.url for page in browser_session.tabs] == ['https://parent.com/', 'https://a.com/', 'https://b.com/']
+	assert browser_session.agent_current_page.url == 'https://parent.com/'
+
+
+async def test_views_cannot_switch_to_each_others_tabs(browser_session):
+	view_a = await browser_session.new_tab_session('https://a.com/')
+	view_b = await browser_session.new_tab_session('https://b.com/')
+
+	# tab 1 exists in the browser, but not in either view
+	with pytest.raises(BrowserError):
+		await view_a.switch_to_tab(1)
+	with pytest.raises(BrowserError):
+		await view_b.switch_to_tab(1)
+
+	assert view_a.agent_current_page.url == 'https://a.com/'
+	assert view_b.agent_current_page.url == 'https://b.com/'
+
+
+async def test_popups_are_adopted_into_the_openers_view(browser_session):
+	view_a = await browser_session.new_tab_session('https://a.com/')
+	view_b = await browser_session.new_tab_session('https://b.com/')
+
+	popup = view_a.agent_current_page.open_popup('https://a.com/popup')
+	assert view_a.tabs == [view_a.agent_current_page, popup]
+	assert [page.url for page in view_b.tabs] == ['https://b.com/']
+
+	# popups opened from an adopted popup belong to the same view
+	nested = popup.open_popup('https://a.com/nested')
+	assert view_a.tabs[-1] is nested
+	assert nested not in view_b.tabs
+
+	assert await view_a.switch_to_tab(1) is popup
+	assert view_b.agent_current_page.url == 'https://b.com/'
+
+
+async def test_stopping_a_view_only_closes_its_own_tabs(browser_session):
+	view_a = await browser_session.new_tab_session('https://a.com/')
+	view_b = await browser_session.new_tab_session('https://b.com/')
+	view_a.agent_current_page.open_popup('https://a.com/popup')
+
+	await view_a.stop()
+
+	assert view_a.tabs == []
+	assert [page.url for page in view_b.tabs] == ['https://b.com/']
+	assert [page.url for page in browser_session.tabs] == ['https://parent.com/', 'https://b.com/']
+	assert browser_session.initialized
+
+
+async def test_killing_a_view_leaves_the_parent_alive(browser_session):
+	browser_session.browser_profile.keep_alive = True
+	view_a = await browser_session.new_tab_session('https://a.com/')
+	view_b = await browser_session.new_tab_session('https://b.com/')
+
+	await view_a.kill()
+
+	assert view_a.tabs == []
+	assert browser_session.browser_profile.keep_alive is True
+	assert view_b.browser_profile.keep_alive is True
+	assert [page.url for page in browser_session.tabs] == ['https://parent.com/', 'https://b.com/']
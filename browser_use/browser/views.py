@@ -32,6 +32,10 @@ class BrowserStateSummary(DOMState):
 	pixels_above: int = 0
 	pixels_below: int = 0
 	browser_errors: list[str] = field(default_factory=list)
+	# seconds spent on each part of the state capture, see BrowserSession._get_updated_state()
+	capture_timings: dict[str, float] = field(default_factory=dict, repr=False)
+	# requests aborted by the resource blocking profile since the previous state, per resource type
+	blocked_requests: dict[str, int] = field(default_factory=dict, repr=False)
 
 
 @dataclass
@@ -43,11 +47,14 @@ class BrowserStateHistory:
 	tabs: list[TabInfo]
 	interacted_element: list[DOMHistoryElement | None] | list[None]
 	screenshot: str | None = None
+	# index of the history item holding the screenshot, when the screen was unchanged since then
+	screenshot_ref: int | None = None
 
 	def to_dict(self) -> dict[str, Any]:
 		data = {}
 		data['tabs'] = [tab.model_dump() for tab in self.tabs]
 		data['screenshot'] = self.screenshot
+		data['screenshot_ref'] = self.screenshot_ref
 		data['interacted_element'] = [el.to_dict() if el else None for el in self.interacted_element]
 		data['url'] = self.url
 		data['title'] = self.title
@@ -23,7 +23,7 @@ from browser_use.telemetry.views import (
 	ControllerRegisteredFunctionsTelemetryEvent,
 	RegisteredFunction,
 )
-from browser_use.utils import match_url_with_domain_pattern, time_execution_async
+from browser_use.utils import compile_domain_patterns, time_execution_async
 
 Context = TypeVar('Context')
 
@@ -37,6 +37,8 @@ class Registry(Generic[Context]):
 		self.registry = ActionRegistry()
 		self.telemetry = ProductTelemetry()
 		self.exclude_actions = exclude_actions if exclude_actions is not None else []
+		# action models per set of action names, the applicable actions only change with the domain of the page
+		self._action_models: dict[frozenset[str], type[ActionModel]] = {}
 
 	def _get_special_param_types(self) -> dict[str, type]:
 		"""Get the expected types for special parameters from SpecialActionParameters"""
@@ -286,6 +288,8 @@ class Registry(Generic[Context]):
 				page_filter=page_filter,
 			)
 			self.registry.actions[func.__name__] = action
+			self._action_models.clear()
+			self.registry._prompt_descriptions.clear()
 
 			# Return the normalized function so it can be called with kwargs
 			return normalized_func
@@ -395,7 +399,7 @@ class Registry(Generic[Context]):
 				# Only include secrets for domains that match the current URL
 				if current_url and current_url != 'about:blank':
 					# it's a real url, check it using our custom allowed_domains scheme://*.example.com glob matching
-					if match_url_with_domain_pattern(current_url, domain_or_key):
+					if compile_domain_patterns((domain_or_key,)).matches(current_url):
 						applicable_secrets.update(content)
 			else:
 				# Old format: {key: value}, expose to all domains (only allowed for legacy reasons)
@@ -463,6 +467,10 @@ class Registry(Generic[Context]):
 			if domain_is_allowed and page_is_allowed:
 				available_actions[name] = action
 
+		key = frozenset(available_actions)
+		if key in self._action_models:
+			return self._action_models[key]
+
 		fields = {
 			name: (
 				Optional[action.param_model],
@@ -480,7 +488,8 @@ class Registry(Generic[Context]):
 			)
 		)
 
-		return create_model('ActionModel', __base__=ActionModel, **fields)  # type:ignore
+		self._action_models[key] = create_model('ActionModel', __base__=ActionModel, **fields)  # type:ignore
+		return self._action_models[key]
 
 	def get_prompt_description(self, page=None) -> str:
 		"""Get a description of all actions for the prompt
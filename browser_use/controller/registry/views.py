@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from playwright.async_api import Page
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 
 from browser_use.browser import BrowserSession
 
@@ -76,6 +76,8 @@ class ActionRegistry(BaseModel):
 	"""Model representing the action registry"""
 
 	actions: dict[str, RegisteredAction] = {}
+	# prompt descriptions per set of action names, cleared when an action is registered, see Registry.action()
+	_prompt_descriptions: dict[frozenset[str], str] = PrivateAttr(default_factory=dict)
 
 	@staticmethod
 	def _match_domains(domains: list[str] | None, url: str) -> bool:
@@ -93,13 +95,10 @@ class ActionRegistry(BaseModel):
 		if domains is None or not url:
 			return True
 
-		# Use the centralized URL matching logic from utils
-		from browser_use.utils import match_url_with_domain_pattern
+		# Use the centralized URL matching logic from utils, compiled once per list of patterns
+		from browser_use.utils import compile_domain_patterns
 
-		for domain_pattern in domains:
-			if match_url_with_domain_pattern(url, domain_pattern):
-				return True
-		return False
+		return compile_domain_patterns(tuple(domains)).matches(url)
 
 	@staticmethod
 	def _match_page_filter(page_filter: Callable[[Page], bool] | None, page: Page) -> bool:
@@ -121,10 +120,8 @@ class ActionRegistry(BaseModel):
 		"""
 		if page is None:
 			# For system prompt (no page provided), include only actions with no filters
-			return '\n'.join(
-				action.prompt_description()
-				for action in self.actions.values()
-				if action.page_filter is None and action.domains is None
+			return self._describe_actions(
+				[action for action in self.actions.values() if action.page_filter is None and action.domains is None]
 			)
 
 		# only include filtered actions for the current page
@@ -140,7 +137,14 @@ class ActionRegistry(BaseModel):
 			if domain_is_allowed and page_is_allowed:
 				filtered_actions.append(action)
 
-		return '\n'.join(action.prompt_description() for action in filtered_actions)
+		return self._describe_actions(filtered_actions)
+
+	def _describe_actions(self, actions: list[RegisteredAction]) -> str:
+		"""Prompt description of a set of actions, each set is only described once (this builds the json schemas)"""
+		key = frozenset(action.name for action in actions)
+		if key not in self._prompt_descriptions:
+			self._prompt_descriptions[key] = '\n'.join(action.prompt_description() for action in actions)
+		return self._prompt_descriptions[key]
 
 
 class SpecialActionParameters(BaseModel):
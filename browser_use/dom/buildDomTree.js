@@ -4,9 +4,12 @@
     focusHighlightIndex: -1,
     viewportExpansion: 0,
     debugMode: false,
+    incremental: false,
+    trackerId: null,
+    columnar: false,
   }
 ) => {
-  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode } = args;
+  const { doHighlightElements, focusHighlightIndex, viewportExpansion, debugMode, incremental, trackerId, columnar } = args;
   let highlightIndex = 0; // Reset highlight index
 
   // Add timing stack to handle recursion
@@ -214,6 +217,20 @@
 
   const HIGHLIGHT_CONTAINER_ID = "playwright-highlight-container";
 
+  /**
+   * Persistent mutation tracker used for incremental snapshots.
+   * It survives between calls (stored on window) and records which elements
+   * changed since the last snapshot, so only those subtrees need to be walked again.
+   */
+  const TRACKER = incremental ? getMutationTracker() : null;
+
+  /**
+   * Highlighted elements of the latest snapshot by highlight index, stored on window so the
+   * browser session can resolve an index to its element in a single call instead of rebuilding
+   * a CSS selector. Entries keep the xpath so stale lookups can be detected.
+   */
+  const ELEMENT_REGISTRY = window.__browserUseElementRegistry ??= new Map();
+
   // Add a WeakMap cache for XPath strings
   const xpathCache = new WeakMap();
 
@@ -227,6 +244,129 @@
     { rootMargin: `${viewportExpansion}px` }
   );
 
+  function getMutationTracker() {
+    const existing = window.__browserUseDomTracker;
+    if (existing) return existing;
+
+    // Above this many dirty subtrees a full rebuild is cheaper than patching
+    const MAX_DIRTY_ELEMENTS = 200;
+
+    const tracker = {
+      id: null,
+      invalidated: true, // nothing to diff against until the first full snapshot
+      dirty: new Set(),
+      keys: new WeakMap(), // element -> key of the node emitted for it in the last snapshot
+      nextKey: 1,
+      highlighted: new Map(), // highlight index -> { element, parentIframe }
+      nextHighlightIndex: 0,
+      observedRoots: new WeakSet(),
+    };
+
+    function isHighlightOverlay(node) {
+      return node.nodeType === Node.ELEMENT_NODE &&
+        (node.id === HIGHLIGHT_CONTAINER_ID || !!node.closest?.(`#${HIGHLIGHT_CONTAINER_ID}`));
+    }
+
+    function markDirty(target) {
+      if (tracker.invalidated) return;
+      if (target instanceof ShadowRoot) target = target.host;
+      if (target.nodeType !== Node.ELEMENT_NODE) target = target.parentElement;
+      if (!target || isHighlightOverlay(target)) return;
+      if (target === target.ownerDocument.documentElement) {
+        tracker.invalidated = true;
+        return;
+      }
+      if (target.closest('head')) return; // <head> changes never reach the tree
+      tracker.dirty.add(target);
+      if (tracker.dirty.size > MAX_DIRTY_ELEMENTS) tracker.invalidated = true;
+    }
+
+    tracker.handleRecords = (records) => {
+      for (const record of records) {
+        if (record.type === 'attributes' && record.attributeName === 'browser-user-highlight-id') continue;
+        if (record.type === 'childList') {
+          const changed = [...record.addedNodes, ...record.removedNodes];
+          if (changed.length && changed.every(isHighlightOverlay)) continue;
+        }
+        markDirty(record.target);
+      }
+    };
+
+    tracker.observer = new MutationObserver(tracker.handleRecords);
+
+    tracker.observe = (root) => {
+      if (!root || tracker.observedRoots.has(root)) return;
+      tracker.observer.observe(root, { subtree: true, childList: true, attributes: true, characterData: true });
+      tracker.observedRoots.add(root);
+    };
+
+    // Scrolling the document or resizing changes viewport flags everywhere, scrolling a
+    // container only changes what is visible inside of it
+    window.addEventListener('scroll', (event) => {
+      const target = event.target;
+      if (!target || target === document || target === document.documentElement || target === document.body) {
+        tracker.invalidated = true;
+      } else {
+        markDirty(target);
+      }
+    }, { capture: true, passive: true });
+    window.addEventListener('resize', () => { tracker.invalidated = true; }, { passive: true });
+
+    tracker.observe(document);
+    window.__browserUseDomTracker = tracker;
+    return tracker;
+  }
+
+  function getTrackedParent(node) {
+    const parent = node.parentNode;
+    if (!parent) return null;
+    if (parent instanceof ShadowRoot) return parent.host;
+    if (parent.nodeType === Node.DOCUMENT_NODE) {
+      try {
+        return parent.defaultView?.frameElement || null;
+      } catch (e) {
+        return null;
+      }
+    }
+    return parent;
+  }
+
+  /**
+   * Lifts every dirty element to the closest ancestor that was emitted in the last
+   * snapshot and drops roots nested inside other roots.
+   * Returns null when the changes cannot be mapped onto the previous snapshot.
+   */
+  function collectDirtyRoots() {
+    const roots = new Set();
+    for (const element of TRACKER.dirty) {
+      if (!element.isConnected) continue; // removal is recorded on the (still connected) parent
+      let current = element;
+      while (current && !TRACKER.keys.has(current)) current = getTrackedParent(current);
+      if (!current || current === document.body) return null;
+      roots.add(current);
+    }
+    return [...roots].filter(root => {
+      for (let parent = getTrackedParent(root); parent; parent = getTrackedParent(parent)) {
+        if (roots.has(parent)) return false;
+      }
+      return true;
+    });
+  }
+
+  function isInsideTrackedRoot(element, root) {
+    for (let current = element; current; current = getTrackedParent(current)) {
+      if (current === root) return true;
+    }
+    return false;
+  }
+
+  function hasHighlightedAncestor(element, highlightedElements) {
+    for (let parent = element.parentNode; parent && parent.nodeType === Node.ELEMENT_NODE; parent = parent.parentNode) {
+      if (highlightedElements.has(parent)) return true;
+    }
+    return false;
+  }
+
   /**
    * Highlights an element in the DOM and returns the index of the next element.
    */
@@ -1189,7 +1329,11 @@
       // When viewportExpansion is -1, all interactive elements should get a highlight index
       // regardless of viewport status
       if (nodeData.isInViewport || viewportExpansion === -1) {
+        // on screen, without the expansion (used to rank elements when the prompt has to be cut)
+        nodeData.isInVisibleViewport = viewportExpansion === 0 ? nodeData.isInViewport : isInExpandedViewport(node, 0);
         nodeData.highlightIndex = highlightIndex++;
+        if (TRACKER) TRACKER.highlighted.set(nodeData.highlightIndex, { element: node, parentIframe });
+        ELEMENT_REGISTRY.set(nodeData.highlightIndex, { element: node, parentIframe, xpath: nodeData.xpath });
 
         if (doHighlightElements) {
           if (focusHighlightIndex >= 0) {
@@ -1209,6 +1353,15 @@
     return false; // Did not highlight
   }
 
+  /**
+   * Remembers which element a node data object was built from, so later mutations can be mapped back onto it.
+   */
+  function trackNode(node, nodeData) {
+    if (!TRACKER) return;
+    nodeData.trackerKey = TRACKER.nextKey++;
+    TRACKER.keys.set(node, nodeData.trackerKey);
+  }
+
   /**
    * Creates a node data object for a given node and its descendants.
    */
@@ -1242,6 +1395,7 @@
         if (domElement) nodeData.children.push(domElement);
       }
 
+      trackNode(node, nodeData);
       const id = `${ID.current++}`;
       DOM_HASH_MAP[id] = nodeData;
       if (debugMode) PERF_METRICS.nodeMetrics.processedNodes++;
@@ -1349,6 +1503,7 @@
         try {
           const iframeDoc = node.contentDocument || node.contentWindow?.document;
           if (iframeDoc) {
+            if (TRACKER) TRACKER.observe(iframeDoc);
             for (const child of iframeDoc.childNodes) {
               const domElement = buildDomTree(child, node, false);
               if (domElement) nodeData.children.push(domElement);
@@ -1376,6 +1531,7 @@
         // Handle shadow DOM
         if (node.shadowRoot) {
           nodeData.shadowRoot = true;
+          if (TRACKER) TRACKER.observe(node.shadowRoot);
           for (const child of node.shadowRoot.childNodes) {
             const domElement = buildDomTree(child, parentIframe, nodeWasHighlighted);
             if (domElement) nodeData.children.push(domElement);
@@ -1397,6 +1553,7 @@
       return null;
     }
 
+    trackNode(node, nodeData);
     const id = `${ID.current++}`;
     DOM_HASH_MAP[id] = nodeData;
     if (debugMode) PERF_METRICS.nodeMetrics.processedNodes++;
@@ -1413,7 +1570,152 @@
   isTextNodeVisible = measureTime(isTextNodeVisible);
   getEffectiveScroll = measureTime(getEffectiveScroll);
 
-  const rootId = buildDomTree(document.body);
+  // Bit flags of the columnar format, keep in sync with browser_use/dom/service.py
+  const FLAG_VISIBLE = 1;
+  const FLAG_TOP_ELEMENT = 2;
+  const FLAG_INTERACTIVE = 4;
+  const FLAG_IN_VIEWPORT = 8;
+  const FLAG_SHADOW_ROOT = 16;
+  const FLAG_IN_VISIBLE_VIEWPORT = 32;
+
+  /**
+   * Encodes the result as a single JSON string in a columnar layout.
+   *
+   * Node ids are the array positions, every column holds one entry per node and
+   * all strings (tag names, attribute keys/values, xpaths and texts) are interned
+   * into a single table. Children are not listed, they are recovered from the
+   * parent column: ids are assigned in post-order so siblings keep document order.
+   */
+  function encodeColumnar(result) {
+    const strings = [];
+    const stringIds = new Map();
+    function intern(value) {
+      let stringId = stringIds.get(value);
+      if (stringId === undefined) {
+        stringId = strings.length;
+        strings.push(value);
+        stringIds.set(value, stringId);
+      }
+      return stringId;
+    }
+
+    const count = ID.current;
+    const tag = new Array(count);
+    const parent = new Array(count).fill(-1);
+    const flags = new Array(count);
+    const highlight = new Array(count);
+    const content = new Array(count);
+    const attrOffsets = new Array(count + 1);
+    const attrs = [];
+    const trackerKey = TRACKER ? new Array(count).fill(-1) : null;
+
+    for (let id = 0; id < count; id++) {
+      const nodeData = DOM_HASH_MAP[id];
+      attrOffsets[id] = attrs.length;
+
+      if (nodeData.type === "TEXT_NODE") {
+        tag[id] = -1;
+        flags[id] = nodeData.isVisible ? FLAG_VISIBLE : 0;
+        highlight[id] = -1;
+        content[id] = intern(nodeData.text);
+        continue;
+      }
+
+      tag[id] = intern(nodeData.tagName);
+      flags[id] =
+        (nodeData.isVisible ? FLAG_VISIBLE : 0) |
+        (nodeData.isTopElement ? FLAG_TOP_ELEMENT : 0) |
+        (nodeData.isInteractive ? FLAG_INTERACTIVE : 0) |
+        (nodeData.isInViewport ? FLAG_IN_VIEWPORT : 0) |
+        (nodeData.shadowRoot ? FLAG_SHADOW_ROOT : 0) |
+        (nodeData.isInVisibleViewport ? FLAG_IN_VISIBLE_VIEWPORT : 0);
+      highlight[id] = nodeData.highlightIndex ?? -1;
+      content[id] = intern(nodeData.xpath);
+      for (const name in nodeData.attributes) {
+        attrs.push(intern(name), intern(nodeData.attributes[name]));
+      }
+      for (const childId of nodeData.children) {
+        parent[Number(childId)] = id;
+      }
+      if (trackerKey && nodeData.trackerKey !== undefined) trackerKey[id] = nodeData.trackerKey;
+    }
+    attrOffsets[count] = attrs.length;
+
+    const nodes = { tag, parent, flags, highlight, content, attrOffsets, attrs };
+    if (trackerKey) nodes.trackerKey = trackerKey;
+
+    const encoded = { ...result, format: 'columnar', nodes, strings };
+    delete encoded.map;
+    return JSON.stringify(encoded);
+  }
+
+  /**
+   * Re-walks only the subtrees that changed since the last snapshot.
+   * Returns null when a full rebuild is required instead.
+   */
+  function buildIncrementalPatches() {
+    if (!TRACKER || TRACKER.invalidated || TRACKER.id === null || TRACKER.id !== trackerId) return null;
+
+    TRACKER.handleRecords(TRACKER.observer.takeRecords());
+    if (TRACKER.invalidated) return null;
+
+    const roots = collectDirtyRoots();
+    if (roots === null) return null;
+
+    // Forget highlights that belong to subtrees about to be rebuilt
+    for (const [index, entry] of TRACKER.highlighted) {
+      if (!entry.element.isConnected || roots.some(root => isInsideTrackedRoot(entry.element, root))) {
+        TRACKER.highlighted.delete(index);
+      }
+    }
+    for (const index of [...ELEMENT_REGISTRY.keys()]) {
+      if (!TRACKER.highlighted.has(index)) ELEMENT_REGISTRY.delete(index);
+    }
+    const highlightedElements = new Set([...TRACKER.highlighted.values()].map(entry => entry.element));
+    const previousHighlights = [...TRACKER.highlighted];
+
+    highlightIndex = TRACKER.nextHighlightIndex;
+    const patches = roots.map(root => {
+      let parentIframe = null;
+      try {
+        parentIframe = root.ownerDocument.defaultView?.frameElement || null;
+      } catch (e) {
+        parentIframe = null;
+      }
+      const key = TRACKER.keys.get(root);
+      TRACKER.keys.delete(root);
+      return { key, rootId: buildDomTree(root, parentIframe, hasHighlightedAncestor(root, highlightedElements)) };
+    });
+
+    // The highlight container was removed before this call, redraw the labels of unchanged elements
+    if (doHighlightElements) {
+      for (const [index, entry] of previousHighlights) {
+        if (focusHighlightIndex >= 0 && focusHighlightIndex !== index) continue;
+        highlightElement(entry.element, index, entry.parentIframe);
+      }
+    }
+
+    return patches;
+  }
+
+  const patches = buildIncrementalPatches();
+  let rootId = null;
+  if (patches === null && TRACKER) {
+    // Full rebuild, start tracking from a clean slate
+    TRACKER.observer.takeRecords();
+    TRACKER.keys = new WeakMap();
+    TRACKER.highlighted.clear();
+    TRACKER.id = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+  }
+  if (patches === null) {
+    ELEMENT_REGISTRY.clear();
+    rootId = buildDomTree(document.body);
+  }
+  if (TRACKER) {
+    TRACKER.dirty.clear();
+    TRACKER.invalidated = false;
+    TRACKER.nextHighlightIndex = highlightIndex;
+  }
 
   // Clear the cache before starting
   DOM_CACHE.clearCache();
@@ -1468,7 +1770,14 @@
     }
   }
 
-  return debugMode ?
+  const result = debugMode ?
     { rootId, map: DOM_HASH_MAP, perfMetrics: PERF_METRICS } :
     { rootId, map: DOM_HASH_MAP };
+
+  if (TRACKER) {
+    result.trackerId = TRACKER.id;
+    if (patches !== null) result.patches = patches;
+  }
+
+  return columnar ? encodeColumnar(result) : result;
 };
@@ -0,0 +1,675 @@
+import logging
+import re
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from browser_use.dom.views import EMPTY_ATTRIBUTES, DOMBaseNode, DOMElementNode, DOMTextNode, SelectorMap
+from browser_use.utils import time_execution_async
+
+if TYPE_CHECKING:
+	from playwright.async_api import CDPSession, Frame, Page
+
+logger = logging.getLogger(__name__)
+
+# Order of the computed styles requested from DOMSnapshot.captureSnapshot
+COMPUTED_STYLES = ['display', 'visibility', 'opacity', 'cursor', 'position', 'pointer-events']
+STYLE_DISPLAY, STYLE_VISIBILITY, STYLE_OPACITY, STYLE_CURSOR, STYLE_POSITION, STYLE_POINTER_EVENTS = range(len(COMPUTED_STYLES))
+
+ELEMENT_NODE = 1
+TEXT_NODE = 3
+DOCUMENT_FRAGMENT_NODE = 11
+
+# Side of the grid cells used to hit-test the viewport by paint order
+HIT_TEST_CELL_SIZE = 100
+
+# The rules below mirror buildDomTree.js (isElementAccepted, isInteractiveElement,
+# isInteractiveCandidate, isElementDistinctInteraction), keep them in sync.
+DENIED_TAGS = {'svg', 'script', 'style', 'link', 'meta', 'noscript', 'template'}
+INTERACTIVE_CURSORS = {
+	'pointer', 'move', 'text', 'grab', 'grabbing', 'cell', 'copy', 'alias', 'all-scroll', 'col-resize', 'context-menu',
+	'crosshair', 'e-resize', 'ew-resize', 'help', 'n-resize', 'ne-resize', 'nesw-resize', 'ns-resize', 'nw-resize',
+	'nwse-resize', 'row-resize', 's-resize', 'se-resize', 'sw-resize', 'vertical-text', 'w-resize', 'zoom-in', 'zoom-out',
+}  # fmt: skip
+NON_INTERACTIVE_CURSORS = {'not-allowed', 'no-drop', 'wait', 'progress', 'initial', 'inherit'}
+INTERACTIVE_TAGS = {
+	'a', 'button', 'input', 'select', 'textarea', 'details', 'summary', 'label', 'option', 'optgroup', 'fieldset', 'legend',
+}  # fmt: skip
+INTERACTIVE_ROLES = {
+	'button', 'menuitemradio', 'menuitemcheckbox', 'radio', 'checkbox', 'tab', 'switch', 'slider', 'spinbutton', 'combobox',
+	'searchbox', 'textbox', 'option', 'scrollbar',
+}  # fmt: skip
+MOUSE_EVENT_ATTRIBUTES = ('onclick', 'onmousedown', 'onmouseup', 'ondblclick')
+CANDIDATE_TAGS = {'a', 'button', 'input', 'select', 'textarea', 'details', 'summary', 'label'}
+CANDIDATE_ATTRIBUTES = ('onclick', 'role', 'tabindex', 'data-action')
+DISTINCT_INTERACTIVE_TAGS = {'a', 'button', 'input', 'select', 'textarea', 'summary', 'details', 'label', 'option'}
+DISTINCT_INTERACTIVE_ROLES = {
+	'button', 'link', 'menuitem', 'menuitemradio', 'menuitemcheckbox', 'radio', 'checkbox', 'tab', 'switch', 'slider',
+	'spinbutton', 'combobox', 'searchbox', 'textbox', 'listbox', 'option', 'scrollbar',
+}  # fmt: skip
+DISTINCT_EVENT_ATTRIBUTES = (
+	'onclick', 'onmousedown', 'onmouseup', 'onkeydown', 'onkeyup', 'onsubmit', 'onchange', 'oninput', 'onfocus', 'onblur',
+)  # fmt: skip
+TEST_ID_ATTRIBUTES = ('data-testid', 'data-cy', 'data-test')
+INTERACTIVE_CLASS_PATTERN = re.compile(r'\b(btn|clickable|menu|item|entry|link)\b', re.IGNORECASE)
+KNOWN_CONTAINER_CLASSES = {'menu', 'dropdown', 'list', 'toolbar'}
+
+HIGHLIGHT_COLORS = [
+	'#FF0000', '#00FF00', '#0000FF', '#FFA500', '#800080', '#008080', '#FF69B4', '#4B0082', '#FF4500', '#2E8B57', '#DC143C',
+	'#4682B4',
+]  # fmt: skip
+
+# Draws the highlight boxes at positions computed from the snapshot, in the same container
+# as buildDomTree.js so BrowserSession.remove_highlights() cleans them up.
+DRAW_HIGHLIGHTS_JS = """(highlights) => {
+	const container = document.createElement('div');
+	container.id = 'playwright-highlight-container';
+	Object.assign(container.style, {
+		position: 'fixed', pointerEvents: 'none', top: '0', left: '0', width: '100%', height: '100%',
+		zIndex: '2147483640', backgroundColor: 'transparent',
+	});
+	for (const { index, x, y, width, height, color } of highlights) {
+		const overlay = document.createElement('div');
+		Object.assign(overlay.style, {
+			position: 'fixed', border: `2px solid ${color}`, backgroundColor: `${color}1A`, pointerEvents: 'none',
+			boxSizing: 'border-box', top: `${y}px`, left: `${x}px`, width: `${width}px`, height: `${height}px`,
+		});
+		const label = document.createElement('div');
+		label.className = 'playwright-highlight-label';
+		Object.assign(label.style, {
+			position: 'fixed', background: color, color: 'white', padding: '1px 4px', borderRadius: '4px',
+			fontSize: `${Math.min(12, Math.max(8, height / 2))}px`, top: `${y + 2}px`, left: `${x + 2}px`,
+		});
+		label.textContent = index;
+		container.appendChild(overlay);
+		container.appendChild(label);
+	}
+	document.body.appendChild(container);
+}"""
+
+
+class SnapshotDocument:
+	"""One document of a DOMSnapshot.captureSnapshot result, with the lookups the tree builder needs."""
+
+	def __init__(self, document: dict, strings: list[str]):
+		nodes = document['nodes']
+		layout = document['layout']
+
+		self.strings = strings
+		self.frame_id: str | None = document.get('frameId')
+		self.scroll_x: float = document.get('scrollOffsetX', 0)
+		self.scroll_y: float = document.get('scrollOffsetY', 0)
+
+		self.parent: list[int] = nodes['parentIndex']
+		self.node_type: list[int] = nodes['nodeType']
+		self.node_name: list[int] = nodes['nodeName']
+		self.node_value: list[int] = nodes['nodeValue']
+		self.backend_node_id: list[int] = nodes['backendNodeId']
+		self.raw_attributes: list[list[int]] = nodes['attributes']
+		self.shadow_roots = set(nodes.get('shadowRootType', {}).get('index', []))
+		self.pseudo_elements = set(nodes.get('pseudoType', {}).get('index', []))
+		# nodes with click listeners or that navigate when clicked, CDP knows what the JS walker has to guess
+		self.clickable = set(nodes.get('isClickable', {}).get('index', []))
+		content_documents = nodes.get('contentDocumentIndex', {})
+		self.content_documents: dict[int, int] = dict(zip(content_documents.get('index', []), content_documents.get('value', [])))
+		# iframe node -> document captured through the CDP session of an out-of-process (cross-origin) frame
+		self.remote_documents: dict[int, SnapshotDocument] = {}
+		# all documents of the same snapshot, contentDocumentIndex points into it
+		self.snapshot_documents: list[SnapshotDocument] = [self]
+
+		self.children: list[list[int]] = [[] for _ in self.parent]
+		for index, parent_index in enumerate(self.parent):
+			if parent_index >= 0:
+				self.children[parent_index].append(index)
+
+		self.layout_index: dict[int, int] = {}
+		for layout_index, node_index in enumerate(layout['nodeIndex']):
+			self.layout_index.setdefault(node_index, layout_index)
+		self.bounds: list[list[float]] = layout['bounds']
+		self.styles: list[list[int]] = layout['styles']
+		self.paint_orders: list[int] | None = layout.get('paintOrders')
+		self.offset_rects: list[list[float]] | None = layout.get('offsetRects')
+
+		# offset from this document's coordinates to the top-level viewport, set while walking the tree
+		self.origin_x: float = -self.scroll_x
+		self.origin_y: float = -self.scroll_y
+
+		self._xpaths: dict[int, str] = {}
+		self._positions: dict[int, int] = {}
+
+	def tag_name(self, index: int) -> str:
+		return self.strings[self.node_name[index]].lower()
+
+	def attributes(self, index: int) -> Mapping[str, str]:
+		raw_attributes = self.raw_attributes[index]
+		if not raw_attributes:
+			return EMPTY_ATTRIBUTES
+		return {self.strings[raw_attributes[i]]: self.strings[raw_attributes[i + 1]] for i in range(0, len(raw_attributes), 2)}
+
+	def style(self, index: int, style: int) -> str:
+		layout_index = self.layout_index.get(index)
+		if layout_index is None:
+			return ''
+		return self.strings[self.styles[layout_index][style]]
+
+	def rect(self, index: int) -> list[float] | None:
+		"""Bounding box [x, y, width, height] in top-level viewport coordinates."""
+		layout_index = self.layout_index.get(index)
+		if layout_index is None:
+			return None
+		x, y, width, height = self.bounds[layout_index]
+		return [x + self.origin_x, y + self.origin_y, width, height]
+
+	def has_size(self, index: int) -> bool:
+		"""offsetWidth > 0 || offsetHeight > 0"""
+		layout_index = self.layout_index.get(index)
+		if layout_index is None:
+			return False
+		rect = self.offset_rects[layout_index] if self.offset_rects else self.bounds[layout_index]
+		return len(rect) == 4 and (rect[2] > 0 or rect[3] > 0)
+
+	def is_visible(self, index: int) -> bool:
+		layout_index = self.layout_index.get(index)
+		if layout_index is None:
+			return False
+		rect = self.offset_rects[layout_index] if self.offset_rects else self.bounds[layout_index]
+		return (
+			len(rect) == 4
+			and rect[2] > 0
+			and rect[3] > 0
+			and self.style(index, STYLE_VISIBILITY) != 'hidden'
+			and self.style(index, STYLE_DISPLAY) != 'none'
+		)
+
+	def element_parent(self, index: int) -> int:
+		"""Parent element, crossing shadow roots to their host, -1 at the document."""
+		parent_index = self.parent[index]
+		while parent_index >= 0 and self.node_type[parent_index] != ELEMENT_NODE:
+			if self.node_type[parent_index] != DOCUMENT_FRAGMENT_NODE:
+				return -1
+			parent_index = self.parent[parent_index]
+		return parent_index
+
+	def xpath(self, index: int) -> str:
+		"""Same as getXPathTree() in buildDomTree.js: relative to the closest shadow root or document."""
+		xpath = self._xpaths.get(index)
+		if xpath is not None:
+			return xpath
+
+		parent_index = self.parent[index]
+		if parent_index >= 0 and self.node_type[parent_index] == DOCUMENT_FRAGMENT_NODE:
+			xpath = ''  # getXPathTree stops before elements directly inside a shadow root
+		else:
+			position = self._position(index)
+			segment = f'{self.tag_name(index)}[{position}]' if position > 0 else self.tag_name(index)
+			if parent_index >= 0 and self.node_type[parent_index] == ELEMENT_NODE:
+				parent_xpath = self.xpath(parent_index)
+				xpath = f'{parent_xpath}/{segment}' if parent_xpath else segment
+			else:
+				xpath = segment
+
+		self._xpaths[index] = xpath
+		return xpath
+
+	def _position(self, index: int) -> int:
+		position = self._positions.get(index)
+		if position is not None:
+			return position
+
+		parent_index = self.parent[index]
+		if parent_index < 0 or self.node_type[parent_index] != ELEMENT_NODE:
+			return 0
+
+		# compute the positions of all siblings at once
+		siblings_by_tag: dict[str, list[int]] = {}
+		for sibling in self.children[parent_index]:
+			if self.node_type[sibling] == ELEMENT_NODE and sibling not in self.pseudo_elements:
+				siblings_by_tag.setdefault(self.tag_name(sibling), []).append(sibling)
+		for siblings in siblings_by_tag.values():
+			for sibling_position, sibling in enumerate(siblings, 1):
+				self._positions[sibling] = sibling_position if len(siblings) > 1 else 0
+
+		return self._positions.get(index, 0)
+
+
+class CDPSnapshotService:
+	"""
+	Builds the DOM tree and selector map from CDP DOMSnapshot.captureSnapshot instead of buildDomTree.js.
+
+	One snapshot returns layout rects, computed styles and paint order of every frame of the
+	page process, so no per-element calls into the page are needed. Out-of-process (cross-origin)
+	iframes, which the JS walker cannot enter, are captured through their own CDP session.
+	"""
+
+	def __init__(self, page: 'Page'):
+		self.page = page
+
+	@time_execution_async('--build_dom_tree_from_cdp_snapshot')
+	async def build_dom_tree(
+		self,
+		highlight_elements: bool,
+		focus_element: int,
+		viewport_expansion: int,
+	) -> tuple[DOMElementNode, SelectorMap]:
+		cdp_session = await self.page.context.new_cdp_session(self.page)
+		frame_sessions: list['CDPSession'] = []
+		try:
+			layout_metrics = await cdp_session.send('Page.getLayoutMetrics')
+			documents = await self._capture_snapshot(cdp_session)
+			await self._capture_cross_origin_frames(self.page.main_frame, cdp_session, documents, frame_sessions)
+		finally:
+			for session in [*frame_sessions, cdp_session]:
+				try:
+					await session.detach()
+				except Exception:
+					pass
+
+		viewport = layout_metrics.get('cssLayoutViewport', {})
+		builder = _TreeBuilder(
+			main_document=documents[0],
+			viewport_width=viewport.get('clientWidth', 0),
+			viewport_height=viewport.get('clientHeight', 0),
+			viewport_expansion=viewport_expansion,
+		)
+		element_tree = builder.build()
+
+		if highlight_elements and builder.highlights:
+			highlights = builder.highlights
+			if focus_element >= 0:
+				highlights = [highlight for highlight in highlights if highlight['index'] == focus_element]
+			try:
+				await self.page.evaluate(DRAW_HIGHLIGHTS_JS, highlights)
+			except Exception as e:
+				logger.debug(f'⚠️ Failed to draw highlights from the DOM snapshot: {type(e).__name__}: {e}')
+
+		return element_tree, builder.selector_map
+
+	async def _capture_snapshot(self, cdp_session: 'CDPSession') -> list[SnapshotDocument]:
+		snapshot = await cdp_session.send(
+			'DOMSnapshot.captureSnapshot',
+			{'computedStyles': COMPUTED_STYLES, 'includePaintOrder': True, 'includeDOMRects': True},
+		)
+		documents = [SnapshotDocument(document, snapshot['strings']) for document in snapshot['documents']]
+		for document in documents:
+			document.snapshot_documents = documents
+		return documents
+
+	async def _capture_cross_origin_frames(
+		self,
+		frame: 'Frame',
+		frame_cdp_session: 'CDPSession',
+		frame_documents: list[SnapshotDocument],
+		frame_sessions: list['CDPSession'],
+	) -> None:
+		"""Capture the out-of-process child frames of a frame and link them to their <iframe> element."""
+		for child_frame in frame.child_frames:
+			if not self._may_be_out_of_process(frame, child_frame):
+				await self._capture_cross_origin_frames(child_frame, frame_cdp_session, frame_documents, frame_sessions)
+				continue
+
+			try:
+				# only out-of-process frames get their own session, in-process frames raise here
+				child_session = await self.page.context.new_cdp_session(child_frame)
+			except Exception:
+				await self._capture_cross_origin_frames(child_frame, frame_cdp_session, frame_documents, frame_sessions)
+				continue
+			frame_sessions.append(child_session)
+
+			try:
+				frame_element = await child_frame.frame_element()
+				if not await frame_element.is_visible():
+					continue  # invisible cross-origin iframes are ads and trackers
+
+				child_documents = await self._capture_snapshot(child_session)
+				owner = await frame_cdp_session.send('DOM.getFrameOwner', {'frameId': child_documents[0].frame_id})
+			except Exception as e:
+				logger.debug(f'⚠️ Failed to capture cross-origin iframe {child_frame.url}: {type(e).__name__}: {e}')
+				continue
+
+			for document in frame_documents:
+				if owner['backendNodeId'] in document.backend_node_id:
+					document.remote_documents[document.backend_node_id.index(owner['backendNodeId'])] = child_documents[0]
+					break
+
+			await self._capture_cross_origin_frames(child_frame, child_session, child_documents, frame_sessions)
+
+	@staticmethod
+	def _may_be_out_of_process(frame: 'Frame', child_frame: 'Frame') -> bool:
+		child_url = urlparse(child_frame.url)
+		return bool(child_url.netloc) and child_url.netloc != urlparse(frame.url).netloc
+
+
+class _TreeBuilder:
+	"""Walks the snapshot documents in document order, applying the same rules as buildDomTree.js."""
+
+	def __init__(self, main_document: SnapshotDocument, viewport_width: float, viewport_height: float, viewport_expansion: int):
+		self.main_document = main_document
+		self.viewport_width = viewport_width
+		self.viewport_height = viewport_height
+		self.viewport_expansion = viewport_expansion
+
+		self.selector_map: SelectorMap = {}
+		self.highlights: list[dict] = []
+		self._hit_test_grid: dict[tuple[int, int], list[tuple[int, int, list[float]]]] | None = None
+
+	def build(self) -> DOMElementNode:
+		document = self.main_document
+		body_index = next(
+			(
+				index
+				for index, node_type in enumerate(document.node_type)
+				if node_type == ELEMENT_NODE and document.tag_name(index) == 'body'
+			),
+			None,
+		)
+
+		body = DOMElementNode(tag_name='body', xpath='/body', attributes={}, children=[], is_visible=False, parent=None)
+		if body_index is None:
+			return body
+
+		for child_index in document.children[body_index]:
+			self._append_child(body, self._visit(document, child_index, False))
+		return body
+
+	@staticmethod
+	def _append_child(parent: DOMElementNode, child: DOMBaseNode | None) -> None:
+		if child is not None:
+			child.parent = parent
+			parent.children.append(child)
+
+	def _visit(self, document: SnapshotDocument, index: int, is_parent_highlighted: bool) -> DOMBaseNode | None:
+		node_type = document.node_type[index]
+		if node_type == TEXT_NODE:
+			return self._text_node(document, index)
+		if node_type != ELEMENT_NODE or index in document.pseudo_elements:
+			return None
+
+		tag_name = document.tag_name(index)
+		if tag_name in DENIED_TAGS:
+			return None
+
+		# Early viewport check, only drop elements without size that are clearly outside the viewport
+		rect = document.rect(index)
+		if (
+			self.viewport_expansion != -1
+			and rect is not None
+			and document.style(index, STYLE_POSITION) not in ('fixed', 'sticky')
+			and not document.has_size(index)
+			and not self._is_in_expanded_viewport(rect)
+		):
+			return None
+
+		attributes = document.attributes(index)
+		is_candidate = (
+			tag_name in CANDIDATE_TAGS
+			or tag_name in ('iframe', 'body')
+			or any(attribute in attributes for attribute in CANDIDATE_ATTRIBUTES)
+			or attributes.get('contenteditable') == 'true'
+		)
+		node = DOMElementNode(
+			tag_name=tag_name,
+			xpath=document.xpath(index),
+			attributes=attributes if is_candidate else EMPTY_ATTRIBUTES,
+			children=[],
+			is_visible=document.is_visible(index),
+			parent=None,
+		)
+
+		was_highlighted = False
+		if node.is_visible:
+			node.is_top_element = self._is_top_element(document, index)
+			if node.is_top_element:
+				node.is_interactive = self._is_interactive(document, index, tag_name, attributes)
+				was_highlighted = self._handle_highlighting(node, document, index, attributes, is_parent_highlighted)
+
+		if tag_name == 'iframe':
+			child_document = self._iframe_document(document, index)
+			if child_document is not None:
+				if rect is not None:
+					child_document.origin_x = rect[0] - child_document.scroll_x
+					child_document.origin_y = rect[1] - child_document.scroll_y
+				for child_index in child_document.children[0]:
+					self._append_child(node, self._visit(child_document, child_index, False))
+		elif attributes.get('contenteditable') == 'true' or attributes.get('id') == 'tinymce':
+			for child_index in document.children[index]:
+				self._append_child(node, self._visit(document, child_index, was_highlighted))
+		else:
+			for child_index in document.children[index]:
+				if child_index in document.shadow_roots:
+					node.shadow_root = True
+					for shadow_child_index in document.children[child_index]:
+						self._append_child(node, self._visit(document, shadow_child_index, was_highlighted))
+			for child_index in document.children[index]:
+				if child_index not in document.shadow_roots:
+					self._append_child(node, self._visit(document, child_index, was_highlighted or is_parent_highlighted))
+
+		# Skip empty anchor tags
+		if tag_name == 'a' and not node.children and not attributes.get('href'):
+			if node.highlight_index is not None:
+				self.selector_map.pop(node.highlight_index, None)
+				self.highlights = [highlight for highlight in self.highlights if highlight['index'] != node.highlight_index]
+			return None
+
+		return node
+
+	def _iframe_document(self, document: SnapshotDocument, index: int) -> SnapshotDocument | None:
+		if index in document.remote_documents:
+			return document.remote_documents[index]
+		# same-process iframes are part of the main snapshot
+		if index in document.content_documents:
+			return document.snapshot_documents[document.content_documents[index]]
+		return None
+
+	def _text_node(self, document: SnapshotDocument, index: int) -> DOMTextNode | None:
+		text = document.strings[document.node_value[index]].strip() if document.node_value[index] >= 0 else ''
+		if not text:
+			return None
+
+		parent_index = document.parent[index]
+		if parent_index < 0 or document.node_type[parent_index] != ELEMENT_NODE or document.tag_name(parent_index) == 'script':
+			return None
+
+		is_visible = (
+			document.style(parent_index, STYLE_VISIBILITY) != 'hidden'
+			and document.style(parent_index, STYLE_OPACITY) != '0'
+			and parent_index in document.layout_index
+		)
+		if is_visible and self.viewport_expansion != -1:
+			rect = document.rect(index)
+			is_visible = rect is not None and rect[2] > 0 and rect[3] > 0 and self._is_in_expanded_viewport(rect)
+
+		return DOMTextNode(text=text, is_visible=is_visible, parent=None)
+
+	def _is_in_expanded_viewport(self, rect: list[float], viewport_expansion: int | None = None) -> bool:
+		if viewport_expansion is None:
+			viewport_expansion = self.viewport_expansion
+		if viewport_expansion == -1:
+			return True
+		x, y, width, height = rect
+		return not (
+			y + height < -viewport_expansion
+			or y > self.viewport_height + viewport_expansion
+			or x + width < -viewport_expansion
+			or x > self.viewport_width + viewport_expansion
+		)
+
+	def _is_top_element(self, document: SnapshotDocument, index: int) -> bool:
+		if self.viewport_expansion == -1:
+			return True
+
+		rect = document.rect(index)
+		if rect is None or rect[2] <= 0 or rect[3] <= 0 or not self._is_in_expanded_viewport(rect):
+			return False
+
+		# elements inside iframes are considered top by default
+		if document is not self.main_document:
+			return True
+
+		# same as document.elementFromPoint() at the center, using the paint order of the snapshot
+		center_x = rect[0] + rect[2] / 2
+		center_y = rect[1] + rect[3] / 2
+		if not (0 <= center_x < self.viewport_width and 0 <= center_y < self.viewport_height):
+			return False
+
+		top_index = self._hit_test(center_x, center_y)
+		while top_index >= 0:
+			if top_index == index:
+				return True
+			top_index = (
+				document.element_parent(top_index)
+				if document.node_type[top_index] == ELEMENT_NODE
+				else document.parent[top_index]
+			)
+		return False
+
+	def _hit_test(self, x: float, y: float) -> int:
+		"""Node painted on top at a viewport position in the main document, -1 if none."""
+		if self._hit_test_grid is None:
+			self._hit_test_grid = self._build_hit_test_grid()
+
+		for _, node_index, (left, top, width, height) in self._hit_test_grid.get(
+			(int(x // HIT_TEST_CELL_SIZE), int(y // HIT_TEST_CELL_SIZE)), []
+		):
+			if left <= x < left + width and top <= y < top + height:
+				return node_index
+		return -1
+
+	def _build_hit_test_grid(self) -> dict[tuple[int, int], list[tuple[int, int, list[float]]]]:
+		document = self.main_document
+		grid: dict[tuple[int, int], list[tuple[int, int, list[float]]]] = {}
+		if document.paint_orders is None:
+			return grid
+
+		for node_index, layout_index in document.layout_index.items():
+			rect = document.rect(node_index)
+			if rect is None or rect[2] <= 0 or rect[3] <= 0 or document.style(node_index, STYLE_POINTER_EVENTS) == 'none':
+				continue
+
+			left, top = max(rect[0], 0), max(rect[1], 0)
+			right, bottom = min(rect[0] + rect[2], self.viewport_width), min(rect[1] + rect[3], self.viewport_height)
+			if left >= right or top >= bottom:
+				continue
+
+			entry = (document.paint_orders[layout_index], node_index, rect)
+			for cell_x in range(int(left // HIT_TEST_CELL_SIZE), int((right - 1) // HIT_TEST_CELL_SIZE) + 1):
+				for cell_y in range(int(top // HIT_TEST_CELL_SIZE), int((bottom - 1) // HIT_TEST_CELL_SIZE) + 1):
+					grid.setdefault((cell_x, cell_y), []).append(entry)
+
+		for entries in grid.values():
+			entries.sort(key=lambda entry: entry[0], reverse=True)
+		return grid
+
+	def _is_interactive(self, document: SnapshotDocument, index: int, tag_name: str, attributes: Mapping[str, str]) -> bool:
+		cursor = document.style(index, STYLE_CURSOR)
+		if tag_name != 'html' and cursor in INTERACTIVE_CURSORS:
+			return True
+
+		if tag_name in INTERACTIVE_TAGS:
+			return cursor not in NON_INTERACTIVE_CURSORS and not any(
+				attribute in attributes for attribute in ('disabled', 'readonly', 'inert')
+			)
+
+		if attributes.get('contenteditable') == 'true':
+			return True
+
+		classes = attributes.get('class', '').split()
+		if (
+			'button' in classes
+			or 'dropdown-toggle' in classes
+			or attributes.get('data-index')
+			or attributes.get('data-toggle') == 'dropdown'
+			or attributes.get('aria-haspopup') == 'true'
+		):
+			return True
+
+		if attributes.get('role') in INTERACTIVE_ROLES or attributes.get('aria-role') in INTERACTIVE_ROLES:
+			return True
+
+		return index in document.clickable or any(attribute in attributes for attribute in MOUSE_EVENT_ATTRIBUTES)
+
+	def _is_distinct_interaction(
+		self, document: SnapshotDocument, index: int, tag_name: str, attributes: Mapping[str, str]
+	) -> bool:
+		if tag_name == 'iframe' or tag_name in DISTINCT_INTERACTIVE_TAGS:
+			return True
+		if attributes.get('role') in DISTINCT_INTERACTIVE_ROLES or attributes.get('contenteditable') == 'true':
+			return True
+		if any(attribute in attributes for attribute in TEST_ID_ATTRIBUTES + DISTINCT_EVENT_ATTRIBUTES):
+			return True
+		if index in document.clickable:
+			return True
+		return self._is_heuristically_interactive(document, index, tag_name, attributes)
+
+	def _is_heuristically_interactive(
+		self, document: SnapshotDocument, index: int, tag_name: str, attributes: Mapping[str, str]
+	) -> bool:
+		if not document.is_visible(index):
+			return False
+
+		has_interactive_attributes = any(attribute in attributes for attribute in ('role', 'tabindex', 'onclick'))
+		has_interactive_class = bool(INTERACTIVE_CLASS_PATTERN.search(attributes.get('class', '')))
+		if not (
+			self._is_interactive(document, index, tag_name, attributes) or has_interactive_attributes or has_interactive_class
+		):
+			return False
+
+		has_visible_children = any(
+			document.node_type[child] == ELEMENT_NODE and document.is_visible(child) for child in document.children[index]
+		)
+		parent_index = document.parent[index]
+		is_parent_body = (
+			parent_index >= 0 and document.node_type[parent_index] == ELEMENT_NODE and document.tag_name(parent_index) == 'body'
+		)
+		return has_visible_children and self._is_in_known_container(document, index) and not is_parent_body
+
+	@staticmethod
+	def _is_in_known_container(document: SnapshotDocument, index: int) -> bool:
+		"""element.closest('button,a,[role="button"],.menu,.dropdown,.list,.toolbar')"""
+		current = index
+		while current >= 0 and document.node_type[current] == ELEMENT_NODE:
+			attributes = document.attributes(current)
+			if (
+				document.tag_name(current) in ('button', 'a')
+				or attributes.get('role') == 'button'
+				or KNOWN_CONTAINER_CLASSES.intersection(attributes.get('class', '').split())
+			):
+				return True
+			current = document.parent[current]
+		return False
+
+	def _handle_highlighting(
+		self,
+		node: DOMElementNode,
+		document: SnapshotDocument,
+		index: int,
+		attributes: Mapping[str, str],
+		is_parent_highlighted: bool,
+	) -> bool:
+		if not node.is_interactive:
+			return False
+		if is_parent_highlighted and not self._is_distinct_interaction(document, index, node.tag_name, attributes):
+			return False
+
+		rect = document.rect(index)
+		node.is_in_viewport = rect is not None and rect[2] > 0 and rect[3] > 0 and self._is_in_expanded_viewport(rect)
+		if not node.is_in_viewport and self.viewport_expansion != -1:
+			return False
+		node.is_in_visible_viewport = rect is not None and rect[2] > 0 and rect[3] > 0 and self._is_in_expanded_viewport(rect, 0)
+
+		node.highlight_index = len(self.selector_map)
+		while node.highlight_index in self.selector_map:
+			node.highlight_index += 1
+		self.selector_map[node.highlight_index] = node
+
+		if rect is not None:
+			self.highlights.append(
+				{
+					'index': node.highlight_index,
+					'x': rect[0],
+					'y': rect[1],
+					'width': rect[2],
+					'height': rect[3],
+					'color': HIGHLIGHT_COLORS[node.highlight_index % len(HIGHLIGHT_COLORS)],
+				}
+			)
+		return True
@@ -1,7 +1,11 @@
-import hashlib
-
 from browser_use.dom.history_tree_processor.view import DOMHistoryElement, HashedDomElement
-from browser_use.dom.views import DOMElementNode
+from browser_use.dom.views import DOMBaseNode, DOMElementNode
+
+# NOTE: The element hashes are only ever compared within the running process (history elements
+#       are stored with their raw branch path, attributes and xpath and hashed again on replay),
+#       so we use Python's fast built-in hash instead of a cryptographic digest.
+#       Do not persist them, they change between interpreter runs.
+_BRANCH_PATH_SEED = hash('browser_use.branch_path')
 
 
 class HistoryTreeProcessor:
@@ -22,7 +26,7 @@ class HistoryTreeProcessor:
 			dom_element.xpath,
 			dom_element.highlight_index,
 			parent_branch_path,
-			dom_element.attributes,
+			dict(dom_element.attributes),
 			dom_element.shadow_root,
 			css_selector=css_selector,
 			page_coordinates=dom_element.page_coordinates,
@@ -32,11 +36,12 @@ class HistoryTreeProcessor:
 
 	@staticmethod
 	def find_history_element_in_tree(dom_history_element: DOMHistoryElement, tree: DOMElementNode) -> DOMElementNode | None:
+		"""Single lookup, use a HistoryElementIndex to look up several elements in the same tree."""
 		hashed_dom_history_element = HistoryTreeProcessor._hash_dom_history_element(dom_history_element)
 
 		def process_node(node: DOMElementNode):
 			if node.highlight_index is not None:
-				hashed_node = HistoryTreeProcessor._hash_dom_element(node)
+				hashed_node = node.hash
 				if hashed_node == hashed_dom_history_element:
 					return node
 			for child in node.children:
@@ -73,6 +78,36 @@ class HistoryTreeProcessor:
 
 		return HashedDomElement(branch_path_hash, attributes_hash, xpath_hash)
 
+	@staticmethod
+	def precompute_hashes(dom_element: DOMElementNode) -> None:
+		"""
+		Store the hash of every highlighted element in the subtree on the node (see `DOMElementNode.hash`).
+
+		The branch path hash is extended top-down while walking the tree instead of walking
+		up to the root for every element. Works on any subtree, e.g. one that was just
+		patched into an existing tree.
+		"""
+		branch_path_state = _BRANCH_PATH_SEED
+		for tag_name in HistoryTreeProcessor._get_parent_branch_path(dom_element):
+			branch_path_state = HistoryTreeProcessor._extend_branch_path_state(branch_path_state, tag_name)
+
+		stack: list[tuple[DOMBaseNode, int]] = [(dom_element, branch_path_state)]
+		while stack:
+			node, branch_path_state = stack.pop()
+			if not isinstance(node, DOMElementNode):
+				continue
+
+			if node.highlight_index is not None:
+				node._hash = HashedDomElement(
+					HistoryTreeProcessor._format_hash(branch_path_state),
+					HistoryTreeProcessor._attributes_hash(node.attributes),
+					HistoryTreeProcessor._xpath_hash(node.xpath),
+				)
+
+			for child in node.children:
+				if isinstance(child, DOMElementNode):
+					stack.append((child, HistoryTreeProcessor._extend_branch_path_state(branch_path_state, child.tag_name)))
+
 	@staticmethod
 	def _get_parent_branch_path(dom_element: DOMElementNode) -> list[str]:
 		parents: list[DOMElementNode] = []
@@ -87,20 +122,97 @@ class HistoryTreeProcessor:
 
 	@staticmethod
 	def _parent_branch_path_hash(parent_branch_path: list[str]) -> str:
-		parent_branch_path_string = '/'.join(parent_branch_path)
-		return hashlib.sha256(parent_branch_path_string.encode()).hexdigest()
+		branch_path_state = _BRANCH_PATH_SEED
+		for tag_name in parent_branch_path:
+			branch_path_state = HistoryTreeProcessor._extend_branch_path_state(branch_path_state, tag_name)
+		return HistoryTreeProcessor._format_hash(branch_path_state)
+
+	@staticmethod
+	def _extend_branch_path_state(branch_path_state: int, tag_name: str) -> int:
+		return hash((branch_path_state, tag_name))
 
 	@staticmethod
 	def _attributes_hash(attributes: dict[str, str]) -> str:
-		attributes_string = ''.join(f'{key}={value}' for key, value in attributes.items())
-		return hashlib.sha256(attributes_string.encode()).hexdigest()
+		return HistoryTreeProcessor._format_hash(hash(tuple(attributes.items())))
 
 	@staticmethod
 	def _xpath_hash(xpath: str) -> str:
-		return hashlib.sha256(xpath.encode()).hexdigest()
+		return HistoryTreeProcessor._format_hash(hash(xpath))
 
 	@staticmethod
 	def _text_hash(dom_element: DOMElementNode) -> str:
 		""" """
 		text_string = dom_element.get_all_text_till_next_clickable_element()
-		return hashlib.sha256(text_string.encode()).hexdigest()
+		return HistoryTreeProcessor._format_hash(hash(text_string))
+
+	@staticmethod
+	def _format_hash(value: int) -> str:
+		return f'{value & 0xFFFFFFFFFFFFFFFF:016x}'
+
+
+class HistoryElementIndex:
+	"""
+	Hash index over the highlighted elements of one DOM snapshot, build it once per snapshot.
+
+	Finds history elements without hashing the whole tree for every lookup. When there is no
+	exact match it can fall back to partial hash matches, e.g. an element that moved between
+	its siblings (same branch path and attributes, different xpath) or whose attributes changed.
+	"""
+
+	def __init__(self, tree: DOMElementNode):
+		self._exact: dict[tuple[str, str, str], DOMElementNode] = {}
+		self._by_branch_path: dict[str, list[DOMElementNode]] = {}
+		self._by_attributes: dict[str, list[DOMElementNode]] = {}
+
+		# pre-order like find_history_element_in_tree, so duplicates resolve to the same element
+		stack: list[DOMBaseNode] = [tree]
+		while stack:
+			node = stack.pop()
+			if not isinstance(node, DOMElementNode):
+				continue
+
+			if node.highlight_index is not None:
+				hashed_node = node.hash
+				self._exact.setdefault(
+					(hashed_node.branch_path_hash, hashed_node.attributes_hash, hashed_node.xpath_hash),
+					node,
+				)
+				self._by_branch_path.setdefault(hashed_node.branch_path_hash, []).append(node)
+				self._by_attributes.setdefault(hashed_node.attributes_hash, []).append(node)
+
+			stack.extend(reversed(node.children))
+
+	def find(self, dom_history_element: DOMHistoryElement, fuzzy: bool = False) -> DOMElementNode | None:
+		hashed_history_element = HistoryTreeProcessor._hash_dom_history_element(dom_history_element)
+
+		exact_match = self._exact.get(
+			(hashed_history_element.branch_path_hash, hashed_history_element.attributes_hash, hashed_history_element.xpath_hash)
+		)
+		if exact_match is not None or not fuzzy:
+			return exact_match
+
+		return self._find_partial_match(hashed_history_element)
+
+	def _find_partial_match(self, hashed_history_element: HashedDomElement) -> DOMElementNode | None:
+		# rank by which parts of the hash match: attributes > branch path > xpath
+		scores: dict[int, tuple[int, DOMElementNode]] = {}
+		candidates = self._by_branch_path.get(hashed_history_element.branch_path_hash, []) + self._by_attributes.get(
+			hashed_history_element.attributes_hash, []
+		)
+		for node in candidates:
+			hashed_node = node.hash
+			score = (
+				4 * (hashed_node.attributes_hash == hashed_history_element.attributes_hash)
+				+ 2 * (hashed_node.branch_path_hash == hashed_history_element.branch_path_hash)
+				+ (hashed_node.xpath_hash == hashed_history_element.xpath_hash)
+			)
+			scores[id(node)] = (score, node)
+
+		if not scores:
+			return None
+
+		ranked = sorted(scores.values(), key=lambda scored: scored[0], reverse=True)
+		if len(ranked) > 1 and ranked[0][0] == ranked[1][0]:
+			# several elements match equally well, don't guess
+			return None
+		return ranked[0][1]
@@ -1,23 +1,57 @@
+import json
 import logging
 from dataclasses import dataclass
+from functools import cache
 from importlib import resources
+from sys import intern
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
 if TYPE_CHECKING:
 	from playwright.async_api import Page
 
+from browser_use.dom.cdp_snapshot.service import CDPSnapshotService
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
 from browser_use.dom.views import (
+	EMPTY_ATTRIBUTES,
 	DOMBaseNode,
 	DOMElementNode,
+	DOMSnapshotCache,
 	DOMState,
 	DOMTextNode,
 	SelectorMap,
 )
-from browser_use.utils import time_execution_async
+from browser_use.utils import time_execution_async, time_execution_sync
 
 logger = logging.getLogger(__name__)
 
+# buildDomTree.js is installed once per document under this global, see get_build_dom_tree_init_script()
+BUILD_DOM_TREE_GLOBAL = '__browserUseBuildDomTree'
+BUILD_DOM_TREE_CALL_JS = (
+	f"""(args) => typeof window.{BUILD_DOM_TREE_GLOBAL} === 'function' ? window.{BUILD_DOM_TREE_GLOBAL}(args) : null"""
+)
+
+
+@cache
+def get_build_dom_tree_js() -> str:
+	"""Source of buildDomTree.js, read from the package resources once per process."""
+	return resources.files('browser_use.dom').joinpath('buildDomTree.js').read_text()
+
+
+@cache
+def get_build_dom_tree_init_script() -> str:
+	"""Init script that installs buildDomTree.js as a global in every top-level document of a context."""
+	return f'if (window === window.top) {{ window.{BUILD_DOM_TREE_GLOBAL} = {get_build_dom_tree_js()}; }}'
+
+
+# Node flags of the columnar transport format, keep in sync with buildDomTree.js
+FLAG_VISIBLE = 1
+FLAG_TOP_ELEMENT = 2
+FLAG_INTERACTIVE = 4
+FLAG_IN_VIEWPORT = 8
+FLAG_SHADOW_ROOT = 16
+FLAG_IN_VISIBLE_VIEWPORT = 32
+
 
 @dataclass
 class ViewportInfo:
@@ -26,11 +60,15 @@ class ViewportInfo:
 
 
 class DomService:
-	def __init__(self, page: 'Page'):
+	def __init__(self, page: 'Page', columnar_transport: bool = False, engine: str = 'js'):
 		self.page = page
 		self.xpath_cache = {}
+		# ask buildDomTree.js for the compact columnar JSON string instead of the nested node map
+		self.columnar_transport = columnar_transport
+		# 'js' runs buildDomTree.js in the page, 'cdp_snapshot' builds the tree from DOMSnapshot.captureSnapshot
+		self.engine = engine
 
-		self.js_code = resources.files('browser_use.dom').joinpath('buildDomTree.js').read_text()
+		self.js_code = get_build_dom_tree_js()
 
 	# region - Clickable elements
 	@time_execution_async('--get_clickable_elements')
@@ -39,8 +77,16 @@ class DomService:
 		highlight_elements: bool = True,
 		focus_element: int = -1,
 		viewport_expansion: int = 0,
+		snapshot_cache: DOMSnapshotCache | None = None,
 	) -> DOMState:
-		element_tree, selector_map = await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion)
+		"""
+		Passing a `snapshot_cache` enables incremental snapshots: the previous tree stored in the
+		cache is patched with the subtrees that changed since, falling back to a full rebuild
+		whenever the in-page tracker is missing or was invalidated (navigation, scrolling, resizing).
+		"""
+		element_tree, selector_map = await self._build_dom_tree(
+			highlight_elements, focus_element, viewport_expansion, snapshot_cache
+		)
 		return DOMState(element_tree=element_tree, selector_map=selector_map)
 
 	@time_execution_async('--get_cross_origin_iframes')
@@ -67,11 +113,11 @@ class DomService:
 		highlight_elements: bool,
 		focus_element: int,
 		viewport_expansion: int,
+		snapshot_cache: DOMSnapshotCache | None = None,
 	) -> tuple[DOMElementNode, SelectorMap]:
-		if await self.page.evaluate('1+1') != 2:
-			raise ValueError('The page cannot evaluate javascript code properly')
-
 		if self.page.url == 'about:blank':
+			if snapshot_cache is not None:
+				snapshot_cache.reset()
 			# short-circuit if the page is a new empty tab for speed, no need to inject buildDomTree.js
 			return (
 				DOMElementNode(
@@ -85,6 +131,17 @@ class DomService:
 				{},
 			)
 
+		if self.engine == 'cdp_snapshot':
+			try:
+				element_tree, selector_map = await CDPSnapshotService(self.page).build_dom_tree(
+					highlight_elements, focus_element, viewport_expansion
+				)
+				HistoryTreeProcessor.precompute_hashes(element_tree)
+				return element_tree, selector_map
+			except Exception as e:
+				# DOMSnapshot is only available on Chromium, fall back to buildDomTree.js
+				logger.warning(f'⚠️ CDP DOM snapshot failed, falling back to buildDomTree.js: {type(e).__name__}: {e}')
+
 		# NOTE: We execute JS code in the browser to extract important DOM information.
 		#       The returned hash map contains information about the DOM tree and the
 		#       relationship between the DOM elements.
@@ -94,14 +151,29 @@ class DomService:
 			'focusHighlightIndex': focus_element,
 			'viewportExpansion': viewport_expansion,
 			'debugMode': debug_mode,
+			'incremental': snapshot_cache is not None,
+			'trackerId': None,
+			'columnar': self.columnar_transport,
 		}
+		if snapshot_cache is not None and snapshot_cache.viewport_expansion == viewport_expansion:
+			args['trackerId'] = snapshot_cache.tracker_id
 
 		try:
-			eval_page: dict = await self.page.evaluate(self.js_code, args)
+			# buildDomTree.js is normally installed by an init script (see BrowserSession.setup_new_browser_context),
+			# so each snapshot is just a small function call with the args
+			eval_page: dict = await self.page.evaluate(BUILD_DOM_TREE_CALL_JS, args)
+			if eval_page is None:
+				# pages that were loaded before the init script was registered need it installed once
+				await self.page.evaluate(f'() => {{ window.{BUILD_DOM_TREE_GLOBAL} = {self.js_code}; }}')
+				eval_page = await self.page.evaluate(BUILD_DOM_TREE_CALL_JS, args)
 		except Exception as e:
 			logger.error('Error evaluating JavaScript: %s', e)
 			raise
 
+		if isinstance(eval_page, str):
+			# columnar transport, a single JSON string is much cheaper to serialize than a nested object
+			eval_page = json.loads(eval_page)
+
 		# Only log performance metrics in debug mode
 		if debug_mode and 'perfMetrics' in eval_page:
 			perf = eval_page['perfMetrics']
@@ -116,6 +188,8 @@ class DomService:
 				for node_data in eval_page['map'].values():
 					if isinstance(node_data, dict) and node_data.get('isInteractive'):
 						interactive_count += 1
+			elif 'nodes' in eval_page:
+				interactive_count = sum(1 for flags in eval_page['nodes']['flags'] if flags & FLAG_INTERACTIVE)
 
 			# Create concise summary
 			url_short = self.page.url[:50] + '...' if len(self.page.url) > 50 else self.page.url
@@ -127,17 +201,126 @@ class DomService:
 				# processed_nodes,
 			)
 
-		return await self._construct_dom_tree(eval_page)
+		if snapshot_cache is None:
+			return await self._construct_dom_tree(eval_page)
+
+		if 'patches' in eval_page:
+			try:
+				return self._apply_dom_patches(eval_page, snapshot_cache)
+			except LookupError as e:
+				logger.debug(f'🔄 Incremental DOM snapshot could not be applied ({e}), rebuilding the full tree')
+				snapshot_cache.reset()
+				return await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion, snapshot_cache)
+
+		snapshot_cache.reset()
+		element_tree, selector_map = await self._construct_dom_tree(eval_page, snapshot_cache.nodes_by_key)
+		snapshot_cache.tracker_id = eval_page.get('trackerId')
+		snapshot_cache.viewport_expansion = viewport_expansion
+		snapshot_cache.element_tree = element_tree
+		snapshot_cache.selector_map = selector_map
+		return element_tree, dict(selector_map)
 
 	@time_execution_async('--construct_dom_tree')
 	async def _construct_dom_tree(
 		self,
 		eval_page: dict,
+		nodes_by_key: dict[int, DOMElementNode] | None = None,
 	) -> tuple[DOMElementNode, SelectorMap]:
-		js_node_map = eval_page['map']
 		js_root_id = eval_page['rootId']
 
 		selector_map = {}
+		node_map = self._link_nodes(eval_page, selector_map, nodes_by_key)
+
+		html_to_dict = node_map[str(js_root_id)]
+
+		del node_map
+		del js_root_id
+
+		if html_to_dict is None or not isinstance(html_to_dict, DOMElementNode):
+			raise ValueError('Failed to parse HTML to dictionary')
+
+		HistoryTreeProcessor.precompute_hashes(html_to_dict)
+
+		return html_to_dict, selector_map
+
+	def _link_nodes(
+		self,
+		eval_page: dict,
+		selector_map: SelectorMap,
+		nodes_by_key: dict[int, DOMElementNode] | None = None,
+	) -> dict[str, DOMBaseNode]:
+		if eval_page.get('format') == 'columnar':
+			return self._link_node_columns(eval_page['nodes'], eval_page['strings'], selector_map, nodes_by_key)
+		return self._link_node_map(eval_page['map'], selector_map, nodes_by_key)
+
+	def _link_node_columns(
+		self,
+		columns: dict[str, list[int]],
+		strings: list[str],
+		selector_map: SelectorMap,
+		nodes_by_key: dict[int, DOMElementNode] | None = None,
+	) -> dict[str, DOMBaseNode]:
+		"""Build the nodes from the columnar format produced by `encodeColumnar` in buildDomTree.js."""
+		flags = columns['flags']
+		highlights = columns['highlight']
+		contents = columns['content']
+		attr_offsets = columns['attrOffsets']
+		attrs = columns['attrs']
+		tracker_keys = columns.get('trackerKey') if nodes_by_key is not None else None
+
+		nodes: list[DOMBaseNode] = []
+		for id, tag in enumerate(columns['tag']):
+			node_flags = flags[id]
+
+			if tag < 0:
+				nodes.append(DOMTextNode(text=strings[contents[id]], is_visible=bool(node_flags & FLAG_VISIBLE), parent=None))
+				continue
+
+			# strings are shared through the string table already, no interning needed
+			attributes = EMPTY_ATTRIBUTES
+			if attr_offsets[id] != attr_offsets[id + 1]:
+				attributes = {strings[attrs[i]]: strings[attrs[i + 1]] for i in range(attr_offsets[id], attr_offsets[id + 1], 2)}
+
+			highlight_index = highlights[id] if highlights[id] >= 0 else None
+			element_node = DOMElementNode(
+				tag_name=strings[tag],
+				xpath=strings[contents[id]],
+				attributes=attributes,
+				children=[],
+				is_visible=bool(node_flags & FLAG_VISIBLE),
+				is_interactive=bool(node_flags & FLAG_INTERACTIVE),
+				is_top_element=bool(node_flags & FLAG_TOP_ELEMENT),
+				is_in_viewport=bool(node_flags & FLAG_IN_VIEWPORT),
+				is_in_visible_viewport=bool(node_flags & FLAG_IN_VISIBLE_VIEWPORT),
+				highlight_index=highlight_index,
+				shadow_root=bool(node_flags & FLAG_SHADOW_ROOT),
+				parent=None,
+			)
+			nodes.append(element_node)
+
+			if highlight_index is not None:
+				selector_map[highlight_index] = element_node
+
+			if tracker_keys is not None and tracker_keys[id] >= 0:
+				nodes_by_key[tracker_keys[id]] = element_node
+
+		# ids are assigned in post-order, so iterating in id order appends siblings in document order
+		for id, parent_id in enumerate(columns['parent']):
+			if parent_id >= 0:
+				child_node = nodes[id]
+				parent_node = nodes[parent_id]
+				assert isinstance(parent_node, DOMElementNode)
+				child_node.parent = parent_node
+				parent_node.children.append(child_node)
+
+		return {str(id): node for id, node in enumerate(nodes)}
+
+	def _link_node_map(
+		self,
+		js_node_map: dict,
+		selector_map: SelectorMap,
+		nodes_by_key: dict[int, DOMElementNode] | None = None,
+	) -> dict[str, DOMBaseNode]:
 		node_map = {}
 
 		for id, node_data in js_node_map.items():
@@ -150,6 +333,9 @@ class DomService:
 			if isinstance(node, DOMElementNode) and node.highlight_index is not None:
 				selector_map[node.highlight_index] = node
 
+			if nodes_by_key is not None and isinstance(node, DOMElementNode) and 'trackerKey' in node_data:
+				nodes_by_key[node_data['trackerKey']] = node
+
 			# NOTE: We know that we are building the tree bottom up
 			#       and all children are already processed.
 			if isinstance(node, DOMElementNode):
@@ -162,16 +348,79 @@ class DomService:
 					child_node.parent = node
 					node.children.append(child_node)
 
-		html_to_dict = node_map[str(js_root_id)]
-
-		del node_map
-		del js_node_map
-		del js_root_id
-
-		if html_to_dict is None or not isinstance(html_to_dict, DOMElementNode):
-			raise ValueError('Failed to parse HTML to dictionary')
+		return node_map
 
-		return html_to_dict, selector_map
+	@time_execution_sync('--apply_dom_patches')
+	def _apply_dom_patches(
+		self,
+		eval_page: dict,
+		snapshot_cache: DOMSnapshotCache,
+	) -> tuple[DOMElementNode, SelectorMap]:
+		"""
+		Splice the subtrees rebuilt by buildDomTree.js into the cached tree.
+
+		NOTE: The cached tree is patched in place, unchanged nodes are shared with the previous snapshot.
+		Raises LookupError if a patch does not match the cached tree, the caller then rebuilds from scratch.
+		"""
+		element_tree = snapshot_cache.element_tree
+		if element_tree is None or eval_page.get('trackerId') != snapshot_cache.tracker_id:
+			raise LookupError('no cached tree for this tracker')
+
+		selector_map = snapshot_cache.selector_map
+		new_selector_map: SelectorMap = {}
+		new_nodes_by_key: dict[int, DOMElementNode] = {}
+		node_map = self._link_nodes(eval_page, new_selector_map, new_nodes_by_key)
+
+		# Resolve every target before mutating anything so a failed lookup leaves the cache untouched
+		targets = []
+		for patch in eval_page['patches']:
+			old_node = snapshot_cache.nodes_by_key.get(patch['key'])
+			if old_node is None or old_node.parent is None:
+				raise LookupError(f'unknown tracker key {patch["key"]}')
+
+			# Nodes that were patched out earlier stay in nodes_by_key, make sure this one is still attached
+			ancestor = old_node
+			while ancestor.parent is not None:
+				ancestor = ancestor.parent
+			if ancestor is not element_tree:
+				raise LookupError(f'tracker key {patch["key"]} is no longer part of the tree')
+
+			new_node = node_map.get(str(patch['rootId'])) if patch['rootId'] is not None else None
+			targets.append((old_node, new_node))
+
+		for old_node, new_node in targets:
+			parent = old_node.parent
+			assert parent is not None
+			position = next(i for i, child in enumerate(parent.children) if child is old_node)
+
+			# Drop the highlight indexes of the replaced subtree
+			stack: list[DOMBaseNode] = [old_node]
+			while stack:
+				node = stack.pop()
+				if isinstance(node, DOMElementNode):
+					if node.highlight_index is not None and selector_map.get(node.highlight_index) is node:
+						del selector_map[node.highlight_index]
+					stack.extend(node.children)
+
+			old_node.parent = None
+			if new_node is None:
+				del parent.children[position]
+			else:
+				new_node.parent = parent
+				parent.children[position] = new_node
+				if isinstance(new_node, DOMElementNode):
+					HistoryTreeProcessor.precompute_hashes(new_node)
+
+		# is_new is recomputed by the browser session for the new snapshot, don't carry it over
+		for node in selector_map.values():
+			node.is_new = None
+
+		selector_map.update(new_selector_map)
+		snapshot_cache.nodes_by_key.update(new_nodes_by_key)
+
+		logger.debug('🧩 Patched %d changed subtree(s) into the cached DOM tree (%d nodes rebuilt)', len(targets), len(node_map))
+
+		return element_tree, dict(selector_map)
 
 	def _parse_node(
 		self,
@@ -199,15 +448,23 @@ class DomService:
 				height=node_data['viewport']['height'],
 			)
 
+		# Tag names and attribute keys repeat across thousands of nodes, intern them so they are stored once
+		attributes = node_data.get('attributes')
+		if attributes:
+			attributes = {intern(key): value for key, value in attributes.items()}
+		else:
+			attributes = EMPTY_ATTRIBUTES
+
 		element_node = DOMElementNode(
-			tag_name=node_data['tagName'],
+			tag_name=intern(node_data['tagName']),
 			xpath=node_data['xpath'],
-			attributes=node_data.get('attributes', {}),
+			attributes=attributes,
 			children=[],
 			is_visible=node_data.get('isVisible', False),
 			is_interactive=node_data.get('isInteractive', False),
 			is_top_element=node_data.get('isTopElement', False),
 			is_in_viewport=node_data.get('isInViewport', False),
+			is_in_visible_viewport=node_data.get('isInVisibleViewport', False),
 			highlight_index=node_data.get('highlightIndex'),
 			shadow_root=node_data.get('shadowRoot', False),
 			parent=None,
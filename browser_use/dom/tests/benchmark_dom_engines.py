@@ -0,0 +1,100 @@
+"""
+Benchmark of the two DOM extraction engines
+
+- js: buildDomTree.js walks the DOM in the page and calls getBoundingClientRect / getComputedStyle / elementFromPoint per element
+- cdp_snapshot: one DOMSnapshot.captureSnapshot call, the tree is built in Python from the flattened layout tree
+
+The page is a synthetic job search results list with a cross-origin iframe (served from another
+site through page.route, so Chromium puts it in its own process). The JS engine cannot enter
+the iframe, the CDP engine captures it through the frame's own CDP session.
+
+Run with: python browser_use/dom/tests/benchmark_dom_engines.py [url] [--cards 1000] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from playwright.async_api import Route, async_playwright
+
+from browser_use.dom.service import DomService
+
+MAIN_URL = 'http://jobs.test/search'
+FRAME_URL = 'http://widgets.test/apply'
+
+
+def job_search_page(card_count: int) -> str:
+	cards = []
+	for i in range(card_count):
+		cards.append(
+			f'<li class="result-card" data-id="{i}"><div class="card-body"><div class="title-wrapper">'
+			f'<a href="/jobs/view/{i}" class="job-title" aria-label="Job {i}">Senior Engineer {i}</a></div>'
+			f'<span class="company">Company {i % 50}</span><span class="location">City {i % 20}</span>'
+			f'<button type="button" class="save-btn" aria-label="Save job {i}">Save</button></div></li>'
+		)
+	return (
+		'<html><body><header><input type="search" placeholder="Search jobs"><button>Search</button></header>'
+		f'<iframe src="{FRAME_URL}" width="600" height="200"></iframe>'
+		f'<ul class="results">{"".join(cards)}</ul></body></html>'
+	)
+
+
+def apply_widget_page() -> str:
+	return (
+		'<html><body><form><label>Email <input type="email" name="email"></label>'
+		'<select name="seniority"><option>Junior</option><option>Senior</option></select>'
+		'<button type="submit">Easy apply</button></form></body></html>'
+	)
+
+
+async def measure(dom_service: DomService, runs: int) -> dict:
+	times = []
+	selector_map = {}
+	for _ in range(runs):
+		start = time.perf_counter()
+		_, selector_map = await dom_service._build_dom_tree(False, -1, 500)
+		times.append(time.perf_counter() - start)
+
+	return {
+		'build_ms': statistics.median(times) * 1000,
+		'elements': len(selector_map),
+		'tags': sorted({node.tag_name for node in selector_map.values()}),
+	}
+
+
+async def main(url: str | None, card_count: int, runs: int):
+	async with async_playwright() as p:
+		browser = await p.chromium.launch(headless=True)
+		page = await browser.new_page()
+		if url:
+			await page.goto(url, wait_until='load')
+		else:
+
+			async def serve(route: Route):
+				body = apply_widget_page() if route.request.url.startswith(FRAME_URL) else job_search_page(card_count)
+				await route.fulfill(status=200, content_type='text/html', body=body)
+
+			await page.route('**/*', serve)
+			await page.goto(MAIN_URL, wait_until='load')
+
+		results = {
+			'js': await measure(DomService(page, engine='js'), runs),
+			'cdp_snapshot': await measure(DomService(page, engine='cdp_snapshot'), runs),
+		}
+
+		print(f'{"engine":<14} {"build ms":>9} {"elements":>9}')
+		for name, result in results.items():
+			print(f'{name:<14} {result["build_ms"]:>9.1f} {result["elements"]:>9}')
+		print(f'only found by cdp_snapshot: {sorted(set(results["cdp_snapshot"]["tags"]) - set(results["js"]["tags"]))}')
+
+		await browser.close()
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser()
+	parser.add_argument('url', nargs='?', default=None)
+	parser.add_argument('--cards', type=int, default=1_000)
+	parser.add_argument('--runs', type=int, default=5)
+	cli_args = parser.parse_args()
+	asyncio.run(main(cli_args.url, cli_args.cards, cli_args.runs))
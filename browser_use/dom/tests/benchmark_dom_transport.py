@@ -0,0 +1,99 @@
+"""
+Benchmark of the two buildDomTree.js transport formats
+
+- Nested node map (default): one object per node, serialized by Playwright
+- Columnar: parallel arrays + interned string table, returned as a single JSON string
+
+For each format it measures the page.evaluate() round trip, the payload size and the
+Python-side tree construction, and checks that both formats produce the same tree.
+
+Run with: python browser_use/dom/tests/benchmark_dom_transport.py [url] [--nodes 10000] [--runs 5]
+Without a url a synthetic page with roughly --nodes elements is generated.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from playwright.async_api import async_playwright
+
+from browser_use.dom.service import DomService
+
+
+def synthetic_page(node_count: int) -> str:
+	# LinkedIn-like result cards: a few wrappers, a link, a button and some text per card
+	cards = []
+	for i in range(node_count // 8):
+		cards.append(
+			f'<li class="result-card" data-id="{i}"><div class="card-body"><div class="title-wrapper">'
+			f'<a href="/jobs/view/{i}" class="job-title" aria-label="Job {i}">Senior Engineer {i}</a></div>'
+			f'<span class="company">Company {i % 50}</span><span class="location">City {i % 20}</span>'
+			f'<button type="button" class="save-btn" aria-label="Save job {i}">Save</button></div></li>'
+		)
+	return f'<html><body><ul class="results">{"".join(cards)}</ul></body></html>'
+
+
+async def measure(dom_service: DomService, args: dict, runs: int) -> dict:
+	evaluate_times, construct_times, payload_sizes = [], [], []
+	tree = None
+	for _ in range(runs):
+		start = time.perf_counter()
+		eval_page = await dom_service.page.evaluate(dom_service.js_code, args)
+		evaluate_times.append(time.perf_counter() - start)
+
+		start = time.perf_counter()
+		if isinstance(eval_page, str):
+			payload_sizes.append(len(eval_page.encode()))
+			eval_page = json.loads(eval_page)
+		else:
+			payload_sizes.append(len(json.dumps(eval_page, separators=(',', ':')).encode()))
+		tree, _ = await dom_service._construct_dom_tree(eval_page)
+		construct_times.append(time.perf_counter() - start)
+
+	return {
+		'evaluate_ms': statistics.median(evaluate_times) * 1000,
+		'construct_ms': statistics.median(construct_times) * 1000,
+		'payload_kb': statistics.median(payload_sizes) / 1024,
+		'tree': tree,
+	}
+
+
+async def main(url: str | None, node_count: int, runs: int):
+	async with async_playwright() as p:
+		browser = await p.chromium.launch(headless=True)
+		page = await browser.new_page()
+		if url:
+			await page.goto(url, wait_until='load')
+		else:
+			await page.set_content(synthetic_page(node_count))
+
+		dom_service = DomService(page)
+		args = {
+			'doHighlightElements': False,
+			'focusHighlightIndex': -1,
+			'viewportExpansion': -1,
+			'debugMode': False,
+		}
+		results = {
+			'map': await measure(dom_service, {**args, 'columnar': False}, runs),
+			'columnar': await measure(dom_service, {**args, 'columnar': True}, runs),
+		}
+
+		same_tree = results['map']['tree'].__json__() == results['columnar']['tree'].__json__()
+		print(f'{"format":<10} {"evaluate ms":>12} {"construct ms":>13} {"payload KB":>11}')
+		for name, result in results.items():
+			print(f'{name:<10} {result["evaluate_ms"]:>12.1f} {result["construct_ms"]:>13.1f} {result["payload_kb"]:>11.1f}')
+		print(f'identical trees: {same_tree}')
+
+		await browser.close()
+
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser()
+	parser.add_argument('url', nargs='?', default=None)
+	parser.add_argument('--nodes', type=int, default=10_000)
+	parser.add_argument('--runs', type=int, default=5)
+	cli_args = parser.parse_args()
+	asyncio.run(main(cli_args.url, cli_args.nodes, cli_args.runs))
@@ -0,0 +1,133 @@
+"""
+Regression tests for DOMElementNode.clickable_elements_to_string
+
+The fixtures are buildDomTree.js results of a job search results page. The expected
+prompt text was captured from the serializer before it was rewritten as a single pass,
+the output has to stay byte-identical.
+
+To refresh the expected files after an intentional format change:
+	python browser_use/dom/tests/test_clickable_elements_to_string.py
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from browser_use.agent.views import AgentSettings
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode, _fit_lines_to_budget
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+INCLUDE_ATTRIBUTES = {
+	'default': AgentSettings().include_attributes,
+	'none': None,
+	'all': ['href', 'class', 'title', 'type', 'name', 'role', 'tabindex', 'aria-label', 'placeholder', 'value', 'aria-expanded'],
+}
+
+
+def load_tree(fixture: str) -> DOMElementNode:
+	eval_page = json.loads((FIXTURES_DIR / f'{fixture}.json').read_text())
+	element_tree, selector_map = asyncio.run(DomService(page=None)._construct_dom_tree(eval_page))  # type: ignore[arg-type]
+	# is_new is injected by the browser session, mark every third element as new
+	for highlight_index, node in selector_map.items():
+		node.is_new = highlight_index % 3 == 0
+	return element_tree
+
+
+def expected_path(fixture: str, attributes: str) -> Path:
+	return FIXTURES_DIR / f'{fixture}.{attributes}.txt'
+
+
+@pytest.mark.parametrize('attributes', INCLUDE_ATTRIBUTES)
+def test_clickable_elements_to_string_matches_fixture(attributes: str):
+	element_tree = load_tree('linkedin_job_search')
+
+	output = element_tree.clickable_elements_to_string(include_attributes=INCLUDE_ATTRIBUTES[attributes])
+
+	assert output == expected_path('linkedin_job_search', attributes).read_text()
+
+
+def test_clickable_elements_to_string_on_subtree():
+	element_tree = load_tree('linkedin_job_search')
+	results_list = element_tree.children[1].children[0]
+	save_button = results_list.children[0].children[0].children[1]
+	assert save_button.highlight_index is not None
+
+	# no highlighted ancestors above the list, so its lines are a block of the full output
+	full_output = element_tree.clickable_elements_to_string(include_attributes=INCLUDE_ATTRIBUTES['default'])
+	assert results_list.clickable_elements_to_string(include_attributes=INCLUDE_ATTRIBUTES['default']) in full_output
+
+	# text below a highlighted element is part of its line, even when serializing a subtree below it
+	assert save_button.children[1].clickable_elements_to_string() == ''
+
+
+def test_clickable_elements_to_string_token_budget():
+	element_tree = load_tree('linkedin_job_search')
+	full_output = element_tree.clickable_elements_to_string(include_attributes=INCLUDE_ATTRIBUTES['default'])
+
+	# output that fits the budget is unchanged
+	assert (
+		element_tree.clickable_elements_to_string(include_attributes=INCLUDE_ATTRIBUTES['default'], max_tokens=10_000)
+		== full_output
+	)
+
+	output = element_tree.clickable_elements_to_string(include_attributes=INCLUDE_ATTRIBUTES['default'], max_tokens=500)
+	lines = output.split('\n')
+	assert len(output) <= 500 * 3
+	assert lines[-1].startswith('... ') and 'omitted to fit the token budget' in lines[-1]
+
+	# kept lines stay in document order
+	full_lines = full_output.split('\n')
+	assert [full_lines.index(line) for line in lines[:-1]] == sorted(full_lines.index(line) for line in lines[:-1])
+
+	# new elements are kept first, other lines only fill the space that is left
+	omitted_new_lines = [line for line in full_lines if line not in lines and line.lstrip('\t').startswith('*[')]
+	other_kept_lines = [line for line in lines[:-1] if not line.lstrip('\t').startswith('*[')]
+	assert omitted_new_lines and other_kept_lines
+	assert max(map(len, other_kept_lines)) < min(map(len, omitted_new_lines))
+
+
+def test_clickable_elements_to_string_token_budget_prefers_elements_on_screen():
+	element_tree = load_tree('linkedin_job_search')
+	full_output = element_tree.clickable_elements_to_string(include_attributes=INCLUDE_ATTRIBUTES['default'])
+	lines, line_nodes = element_tree.clickable_element_lines(INCLUDE_ATTRIBUTES['default'])
+	elements = [node for node in line_nodes if isinstance(node, DOMElementNode)]
+	# the last elements are on screen (not just inside the expanded viewport), they outrank new elements
+	on_screen = elements[-5:]
+	for node in on_screen:
+		node.is_in_visible_viewport = True
+
+	output = element_tree.clickable_elements_to_string(include_attributes=INCLUDE_ATTRIBUTES['default'], max_tokens=300)
+
+	kept_lines = output.split('\n')[:-1]
+	assert all(lines[line_nodes.index(node)] in kept_lines for node in on_screen)
+	assert len(kept_lines) < len(full_output.split('\n'))
+
+
+def test_token_budget_summary_counts_what_was_omitted():
+	element_tree = load_tree('linkedin_job_search')
+	lines, line_nodes = element_tree.clickable_element_lines(INCLUDE_ATTRIBUTES['default'])
+	text_lines = [line for line, node in zip(lines, line_nodes) if not isinstance(node, DOMElementNode)]
+	assert text_lines
+
+	# room for every element line but not all text lines: only text is reported as omitted
+	element_characters = sum(len(line) + 1 for line, node in zip(lines, line_nodes) if isinstance(node, DOMElementNode))
+	summary = _fit_lines_to_budget(lines, line_nodes, element_characters + 200).split('\n')[-1]
+	assert 'interactive elements' not in summary
+	assert (
+		summary == f'... {len(text_lines)} text lines omitted to fit the token budget - scroll or extract content to see more ...'
+	)
+
+	summary = _fit_lines_to_budget(lines, line_nodes, 400).split('\n')[-1]
+	assert summary.startswith('... ') and ' interactive elements (' in summary and ' text lines omitted' in summary
+
+
+if __name__ == '__main__':
+	for attributes, include_attributes in INCLUDE_ATTRIBUTES.items():
+		tree = load_tree('linkedin_job_search')
+		expected_path('linkedin_job_search', attributes).write_text(
+			tree.clickable_elements_to_string(include_attributes=include_attributes)
+		)
@@ -0,0 +1,207 @@
+"""
+Tests for DomService._apply_dom_patches: patch payloads as produced by the buildDomTree.js mutation tracker
+are applied to a cached tree, which must then match a fresh build of the changed page.
+"""
+
+import asyncio
+import itertools
+
+import pytest
+
+from browser_use.dom.history_tree_processor.service import HistoryTreeProcessor
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMBaseNode, DOMElementNode, DOMSnapshotCache, DOMTextNode
+
+
+def el(tag: str, xpath: str, *children, key: int | None = None, highlight: int | None = None, **attributes) -> dict:
+	node = {'tagName': tag, 'xpath': xpath, 'attributes': attributes, 'children': list(children), 'isVisible': True}
+	if key is not None:
+		node['trackerKey'] = key
+	if highlight is not None:
+		node.update(highlightIndex=highlight, isInteractive=True, isTopElement=True, isInViewport=True)
+	return node
+
+
+def text(value: str) -> dict:
+	return {'type': 'TEXT_NODE', 'text': value, 'isVisible': True}
+
+
+def add_to_map(spec: dict, js_map: dict, ids) -> str:
+	"""Adds a nested node spec to a buildDomTree.js style map, children first like the real script"""
+	node = dict(spec)
+	if 'children' in node:
+		node['children'] = [add_to_map(child, js_map, ids) for child in node['children']]
+	node_id = str(next(ids))
+	js_map[node_id] = node
+	return node_id
+
+
+def full_payload(body: dict, tracker_id: str = 'tracker-1') -> dict:
+	js_map = {}
+	root_id = add_to_map(body, js_map, itertools.count())
+	return {'rootId': root_id, 'map': js_map, 'trackerId': tracker_id}
+
+
+def patch_payload(patches: list[tuple[int, dict | None]], tracker_id: str = 'tracker-1') -> dict:
+	js_map, ids = {}, itertools.count(1000)
+	return {
+		'rootId': None,
+		'map': js_map,
+		'trackerId': tracker_id,
+		'patches': [{'key': key, 'rootId': add_to_map(spec, js_map, ids) if spec else None} for key, spec in patches],
+	}
+
+
+def job(index: int, title: str, key: int, highlight: int, **attributes) -> dict:
+	xpath = f'html/body/ul/li[{index}]'
+	return el('li', xpath, el('a', f'{xpath}/a', text(title), key=key + 1, highlight=highlight, **attributes), key=key)
+
+
+def page(jobs: list[dict], button: dict) -> dict:
+	return el('body', 'html/body', el('ul', 'html/body/ul', *jobs, key=2), button, key=1)
+
+
+SEARCH_BUTTON = el('button', 'html/body/button', text('Search'), key=9, highlight=2, type='submit')
+BASE_PAGE = page([job(1, 'Job A', 3, 0, href='/a'), job(2, 'Job B', 5, 1, href='/b')], SEARCH_BUTTON)
+
+
+def build(eval_page: dict, snapshot_cache: DOMSnapshotCache | None = None):
+	service = DomService(page=None)  # type: ignore[arg-type]
+	if snapshot_cache is None:
+		return asyncio.run(service._construct_dom_tree(eval_page))
+	element_tree, selector_map = asyncio.run(service._construct_dom_tree(eval_page, snapshot_cache.nodes_by_key))
+	snapshot_cache.tracker_id = eval_page['trackerId']
+	snapshot_cache.element_tree = element_tree
+	snapshot_cache.selector_map = selector_map
+	return element_tree, selector_map
+
+
+def shape(node: DOMBaseNode):
+	"""Structure of a tree without highlight index values, the patched tree numbers new elements after the old ones"""
+	if isinstance(node, DOMTextNode):
+		return ('text', node.text, node.is_visible)
+	assert isinstance(node, DOMElementNode)
+	for child in node.children:
+		assert child.parent is node
+	children = [shape(child) for child in node.children]
+	return (node.tag_name, node.xpath, dict(node.attributes), node.highlight_index is not None, children)
+
+
+def highlighted(node: DOMBaseNode) -> list[DOMElementNode]:
+	if not isinstance(node, DOMElementNode):
+		return []
+	nodes = [node] if node.highlight_index is not None else []
+	return nodes + [n for child in node.children for n in highlighted(child)]
+
+
+def assert_matches_fresh_build(patched, fresh_page: dict):
+	element_tree, selector_map = patched
+	fresh_tree, _ = build(full_payload(fresh_page))
+
+	assert shape(element_tree) == shape(fresh_tree)
+	# the selector map holds exactly the highlighted elements of the patched tree
+	nodes = highlighted(element_tree)
+	assert selector_map == {node.highlight_index: node for node in nodes}
+	assert [node.hash for node in nodes] == [node.hash for node in highlighted(fresh_tree)]
+	assert_precomputed_hashes(nodes)
+
+
+def assert_precomputed_hashes(nodes: list[DOMElementNode]):
+	"""precompute_hashes() walks top-down, history lookups hash bottom-up: both must agree"""
+	for node in nodes:
+		assert node._hash is not None, f'hash of {node.xpath} was not precomputed'
+		assert node.hash == HistoryTreeProcessor._hash_dom_element(node)
+
+
+def patch(patches: list[tuple[int, dict | None]]):
+	snapshot_cache = DOMSnapshotCache()
+	build(full_payload(BASE_PAGE), snapshot_cache)
+	service = DomService(page=None)  # type: ignore[arg-type]
+	return service._apply_dom_patches(patch_payload(patches), snapshot_cache), snapshot_cache
+
+
+def test_added_elements():
+	new_list = el('ul', 'html/body/ul', job(1, 'Job A', 10, 3, href='/a'), job(2, 'Job B', 12, 4, href='/b'), key=14)
+	new_list['children'].append(job(3, 'Job C', 15, 5, href='/c'))
+
+	patched, _ = patch([(2, new_list)])
+
+	assert_matches_fresh_build(
+		patched,
+		page(
+			[job(1, 'Job A', 3, 0, href='/a'), job(2, 'Job B', 5, 1, href='/b'), job(3, 'Job C', 7, 2, href='/c')], SEARCH_BUTTON
+		),
+	)
+	# unchanged elements keep their index, the replaced ones are gone
+	assert patched[1][2].tag_name == 'button'
+	assert set(patched[1]) == {2, 3, 4, 5}
+
+
+def test_removed_element():
+	patched, _ = patch([(5, None)])
+
+	assert_matches_fresh_build(patched, page([job(1, 'Job A', 3, 0, href='/a')], SEARCH_BUTTON))
+	assert set(patched[1]) == {0, 2}
+
+
+def test_attribute_change():
+	button = el('button', 'html/body/button', text('Search'), key=20, highlight=3, type='button')
+
+	patched, _ = patch([(9, button)])
+
+	assert_matches_fresh_build(patched, page([job(1, 'Job A', 3, 0, href='/a'), job(2, 'Job B', 5, 1, href='/b')], button))
+	assert patched[1][3].attributes == {'type': 'button'}
+
+
+def test_text_change_and_several_patches():
+	patched, _ = patch([(4, el('a', 'html/body/ul/li[1]/a', text('Job A (applied)'), key=20, highlight=3, href='/a')), (6, None)])
+
+	fresh_page = page([job(1, 'Job A (applied)', 3, 0, href='/a'), el('li', 'html/body/ul/li[2]', key=5)], SEARCH_BUTTON)
+	assert_matches_fresh_build(patched, fresh_page)
+
+
+def test_invalid_patches_leave_the_cache_untouched():
+	snapshot_cache = DOMSnapshotCache()
+	element_tree, _ = build(full_payload(BASE_PAGE), snapshot_cache)
+	before = shape(element_tree)
+	service = DomService(page=None)  # type: ignore[arg-type]
+
+	for payload in [
+		# unknown tracker key, after a valid patch that must not be applied either
+		patch_payload([(9, None), (999, None)]),
+		# snapshot of another tracker (page reloaded)
+		patch_payload([(9, None)], tracker_id='tracker-2'),
+	]:
+		with pytest.raises(LookupError):
+			service._apply_dom_patches(payload, snapshot_cache)
+		assert shape(snapshot_cache.element_tree) == before
+		assert set(snapshot_cache.selector_map) == {0, 1, 2}
+
+	# a key patched out earlier is no longer part of the tree
+	service._apply_dom_patches(patch_payload([(3, None)]), snapshot_cache)
+	with pytest.raises(LookupError):
+		service._apply_dom_patches(patch_payload([(4, None)]), snapshot_cache)
+
+
+class FakePage:
+	url = 'https://example.com/jobs'
+
+	def __init__(self, payloads: list[dict]):
+		self.payloads = payloads
+
+	async def evaluate(self, script: str, args: dict | None = None):
+		return self.payloads.pop(0)
+
+
+def test_falls_back_to_a_full_rebuild():
+	changed_page = page([job(1, 'Job A', 3, 0, href='/a')], SEARCH_BUTTON)
+	fake_page = FakePage([full_payload(BASE_PAGE), patch_payload([(999, None)]), full_payload(changed_page, 'tracker-2')])
+	service = DomService(page=fake_page)  # type: ignore[arg-type]
+	snapshot_cache = DOMSnapshotCache()
+
+	asyncio.run(service._build_dom_tree(False, -1, 0, snapshot_cache))
+	patched = asyncio.run(service._build_dom_tree(False, -1, 0, snapshot_cache))
+
+	assert not fake_page.payloads
+	assert_matches_fresh_build(patched, changed_page)
+	assert snapshot_cache.tracker_id == 'tracker-2'
@@ -0,0 +1,86 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from browser_use.dom.history_tree_processor.service import HistoryElementIndex, HistoryTreeProcessor
+from browser_use.dom.service import DomService
+from browser_use.dom.views import EMPTY_ATTRIBUTES
+
+
+def load_state():
+	eval_page = json.loads((Path(__file__).parent / 'fixtures' / 'linkedin_job_search.json').read_text())
+	return asyncio.run(DomService(page=None)._construct_dom_tree(eval_page))  # type: ignore[arg-type]
+
+
+def test_index_matches_tree_lookup():
+	element_tree, selector_map = load_state()
+	index = HistoryElementIndex(element_tree)
+
+	for node in selector_map.values():
+		history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(node)
+		assert index.find(history_element) is HistoryTreeProcessor.find_history_element_in_tree(history_element, element_tree)
+		assert index.find(history_element) is node
+
+
+def test_index_fuzzy_fallbacks():
+	element_tree, selector_map = load_state()
+	index = HistoryElementIndex(element_tree)
+	save_button = selector_map[8]
+
+	# moved between its siblings: same branch path and attributes, different xpath
+	history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(save_button)
+	history_element.xpath = 'body/main/ul/li[42]/div/button'
+	assert index.find(history_element) is None
+	assert index.find(history_element, fuzzy=True) is save_button
+
+	# attributes changed in place
+	history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(save_button)
+	history_element.attributes = {**save_button.attributes, 'aria-expanded': 'true'}
+	assert index.find(history_element, fuzzy=True) is save_button
+
+	# only the branch path matches, and many elements share it: ambiguous
+	history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(save_button)
+	history_element.attributes = {'aria-label': 'something else'}
+	history_element.xpath = 'somewhere/else'
+	assert index.find(history_element, fuzzy=True) is None
+
+
+def test_empty_attributes_are_read_only():
+	element_tree, selector_map = load_state()
+	bare_elements = [node for node in selector_map.values() if node.attributes is EMPTY_ATTRIBUTES]
+	assert bare_elements, 'the fixture should have interactive elements without attributes'
+
+	with pytest.raises(TypeError):
+		bare_elements[0].attributes['class'] = 'x'  # type: ignore[index]
+	assert EMPTY_ATTRIBUTES == {}
+
+	# history elements get their own copy, edits don't reach the shared mapping
+	history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(bare_elements[0])
+	history_element.attributes['class'] = 'x'
+	assert EMPTY_ATTRIBUTES == {}
+
+	assert json.dumps(element_tree.__json__())
+
+
+def test_precomputed_hashes_match_history_hashes():
+	element_tree, selector_map = load_state()
+	assert selector_map
+
+	# precompute_hashes() extends the branch path hash top-down, it must agree with the bottom-up hash functions
+	for node in selector_map.values():
+		assert node._hash is not None, f'hash of {node.xpath} was not precomputed'
+		assert node.hash == HistoryTreeProcessor._hash_dom_element(node)
+		history_element = HistoryTreeProcessor.convert_dom_element_to_history_element(node)
+		assert node.hash == HistoryTreeProcessor._hash_dom_history_element(history_element)
+
+	# also for a subtree hashed on its own, as after a DOM patch
+	subtree = selector_map[8].parent
+	for node in selector_map.values():
+		node._hash = None
+	HistoryTreeProcessor.precompute_hashes(subtree)
+	for node in selector_map.values():
+		if node._hash is not None:
+			assert node.hash == HistoryTreeProcessor._hash_dom_element(node)
+	assert selector_map[8]._hash is not None
@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from functools import cached_property
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
 from typing import TYPE_CHECKING, Optional
 
 from browser_use.dom.history_tree_processor.view import CoordinateSet, HashedDomElement, ViewportInfo
@@ -9,8 +10,13 @@ from browser_use.utils import time_execution_sync
 if TYPE_CHECKING:
 	from .views import DOMElementNode
 
+# Shared by every element without attributes (most of them), read-only so a write can't leak into every other element
+EMPTY_ATTRIBUTES: Mapping[str, str] = MappingProxyType({})
 
-@dataclass(frozen=False)
+
+# NOTE: Nodes use __slots__, a single page can produce tens of thousands of them and
+#       we keep several trees alive (current state, cached state, history).
+@dataclass(frozen=False, slots=True)
 class DOMBaseNode:
 	is_visible: bool
 	# Use None as default and set parent later to avoid circular reference issues
@@ -20,7 +26,7 @@ class DOMBaseNode:
 		raise NotImplementedError('DOMBaseNode is an abstract class')
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMTextNode(DOMBaseNode):
 	text: str
 	type: str = 'TEXT_NODE'
@@ -52,7 +58,7 @@ class DOMTextNode(DOMBaseNode):
 		}
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class DOMElementNode(DOMBaseNode):
 	"""
 	xpath: the xpath of the element from the last root node (shadow root or iframe OR document if no shadow root or iframe).
@@ -61,11 +67,13 @@ class DOMElementNode(DOMBaseNode):
 
 	tag_name: str
 	xpath: str
-	attributes: dict[str, str]
+	attributes: Mapping[str, str]
 	children: list[DOMBaseNode]
 	is_interactive: bool = False
 	is_top_element: bool = False
 	is_in_viewport: bool = False
+	# inside the viewport itself, is_in_viewport uses the viewport expanded by viewport_expansion
+	is_in_visible_viewport: bool = False
 	shadow_root: bool = False
 	highlight_index: int | None = None
 	viewport_coordinates: CoordinateSet | None = None
@@ -79,15 +87,19 @@ class DOMElementNode(DOMBaseNode):
 	"""
 	is_new: bool | None = None
 
+	# lazily computed by the `hash` property (cached_property needs a __dict__)
+	_hash: HashedDomElement | None = field(default=None, init=False, repr=False, compare=False)
+
 	def __json__(self) -> dict:
 		return {
 			'tag_name': self.tag_name,
 			'xpath': self.xpath,
-			'attributes': self.attributes,
+			'attributes': dict(self.attributes),
 			'is_visible': self.is_visible,
 			'is_interactive': self.is_interactive,
 			'is_top_element': self.is_top_element,
 			'is_in_viewport': self.is_in_viewport,
+			'is_in_visible_viewport': self.is_in_visible_viewport,
 			'shadow_root': self.shadow_root,
 			'highlight_index': self.highlight_index,
 			'viewport_coordinates': self.viewport_coordinates,
@@ -121,13 +133,15 @@ class DOMElementNode(DOMBaseNode):
 
 		return tag_str
 
-	@cached_property
+	@property
 	def hash(self) -> HashedDomElement:
-		from browser_use.dom.history_tree_processor.service import (
-			HistoryTreeProcessor,
-		)
+		if self._hash is None:
+			from browser_use.dom.history_tree_processor.service import (
+				HistoryTreeProcessor,
+			)
 
-		return HistoryTreeProcessor._hash_dom_element(self)
+			self._hash = HistoryTreeProcessor._hash_dom_element(self)
+		return self._hash
 
 	def get_all_text_till_next_clickable_element(self, max_depth: int = -1) -> str:
 		text_parts = []
@@ -150,88 +164,175 @@ class DOMElementNode(DOMBaseNode):
 		return '\n'.join(text_parts).strip()
 
 	@time_execution_sync('--clickable_elements_to_string')
-	def clickable_elements_to_string(self, include_attributes: list[str] | None = None) -> str:
-		"""Convert the processed DOM content to HTML."""
+	def clickable_elements_to_string(
+		self,
+		include_attributes: list[str] | None = None,
+		max_tokens: int | None = None,
+		characters_per_token: int = 3,
+	) -> str:
+		"""
+		Convert the processed DOM content to HTML.
+
+		With `max_tokens`, lines that do not fit the (estimated) token budget are left out,
+		keeping the most useful ones (see _line_priority) in document order, followed by a
+		summary of what was omitted.
+		"""
+		formatted_text, line_nodes = self.clickable_element_lines(include_attributes)
+
+		if max_tokens is None:
+			return '\n'.join(formatted_text)
+		return _fit_lines_to_budget(formatted_text, line_nodes, max_tokens * characters_per_token)
+
+	def clickable_element_lines(self, include_attributes: list[str] | None = None) -> tuple[list[str], list[DOMBaseNode]]:
+		"""Lines of clickable_elements_to_string(), with the node each line was produced from"""
 		formatted_text = []
-
-		def process_node(node: DOMBaseNode, depth: int) -> None:
-			next_depth = int(depth)
-			depth_str = depth * '\t'
-
+		# node each line was produced from, the highlighted element or the text node
+		line_nodes: list[DOMBaseNode] = []
+
+		# NOTE: Single pass over the tree. The text of a highlighted element (what
+		#       get_all_text_till_next_clickable_element returns) is collected while its
+		#       children are processed, so its line is reserved first and filled in afterwards.
+		#       Whether a text node sits below a highlighted element is carried down the
+		#       recursion instead of walking up to the root for every text node.
+		def process_node(node: DOMBaseNode, depth: int, text_parts: list[str] | None, inside_highlight: bool) -> None:
 			if isinstance(node, DOMElementNode):
+				if node.highlight_index is None:
+					# Process children regardless
+					for child in node.children:
+						process_node(child, depth, text_parts, inside_highlight)
+					return
+
 				# Add element with highlight_index
-				if node.highlight_index is not None:
-					next_depth += 1
-
-					text = node.get_all_text_till_next_clickable_element()
-					attributes_html_str = ''
-					if include_attributes:
-						attributes_to_include = {
-							key: str(value) for key, value in node.attributes.items() if key in include_attributes
-						}
-
-						# Easy LLM optimizations
-						# if tag == role attribute, don't include it
-						if node.tag_name == attributes_to_include.get('role'):
-							del attributes_to_include['role']
-
-						# if aria-label == text of the node, don't include it
-						if (
-							attributes_to_include.get('aria-label')
-							and attributes_to_include.get('aria-label', '').strip() == text.strip()
-						):
-							del attributes_to_include['aria-label']
-
-						# if placeholder == text of the node, don't include it
-						if (
-							attributes_to_include.get('placeholder')
-							and attributes_to_include.get('placeholder', '').strip() == text.strip()
-						):
-							del attributes_to_include['placeholder']
-
-						if attributes_to_include:
-							# Format as key1='value1' key2='value2'
-							attributes_html_str = ' '.join(f"{key}='{value}'" for key, value in attributes_to_include.items())
-
-					# Build the line
-					if node.is_new:
-						highlight_indicator = f'*[{node.highlight_index}]*'
-					else:
-						highlight_indicator = f'[{node.highlight_index}]'
-
-					line = f'{depth_str}{highlight_indicator}<{node.tag_name}'
-
-					if attributes_html_str:
-						line += f' {attributes_html_str}'
-
-					if text:
-						# Add space before >text only if there were NO attributes added before
-						if not attributes_html_str:
-							line += ' '
-						line += f'>{text}'
-					# Add space before /> only if neither attributes NOR text were added
-					elif not attributes_html_str:
-						line += ' '
-
-					line += ' />'  # 1 token
-					formatted_text.append(line)
-
-				# Process children regardless
+				line_index = len(formatted_text)
+				formatted_text.append('')
+				line_nodes.append(node)
+
+				own_text_parts: list[str] = []
 				for child in node.children:
-					process_node(child, next_depth)
+					process_node(child, depth + 1, own_text_parts, True)
+
+				formatted_text[line_index] = node._highlighted_element_line(
+					depth, '\n'.join(own_text_parts).strip(), include_attributes
+				)
 
 			elif isinstance(node, DOMTextNode):
+				if text_parts is not None:
+					text_parts.append(node.text)
+
 				# Add text only if it doesn't have a highlighted parent
-				if (
-					not node.has_parent_with_highlight_index()
-					and node.parent
-					and node.parent.is_visible
-					and node.parent.is_top_element
-				):  # and node.is_parent_top_element()
+				if not inside_highlight and node.parent and node.parent.is_visible and node.parent.is_top_element:
+					depth_str = depth * '\t'
 					formatted_text.append(f'{depth_str}{node.text}')
-
-		process_node(self, 0)
-		return '\n'.join(formatted_text)
+					line_nodes.append(node)
+
+		# text below a highlighted ancestor of this subtree is never listed on its own either
+		inside_highlight = False
+		ancestor = self.parent
+		while ancestor is not None and not inside_highlight:
+			inside_highlight = ancestor.highlight_index is not None
+			ancestor = ancestor.parent
+
+		process_node(self, 0, None, inside_highlight)
+		return formatted_text, line_nodes
+
+	def _highlighted_element_line(self, depth: int, text: str, include_attributes: list[str] | None) -> str:
+		attributes_html_str = ''
+		if include_attributes:
+			attributes_to_include = {key: str(value) for key, value in self.attributes.items() if key in include_attributes}
+
+			# Easy LLM optimizations
+			# if tag == role attribute, don't include it
+			if self.tag_name == attributes_to_include.get('role'):
+				del attributes_to_include['role']
+
+			# if aria-label == text of the node, don't include it
+			if attributes_to_include.get('aria-label') and attributes_to_include.get('aria-label', '').strip() == text.strip():
+				del attributes_to_include['aria-label']
+
+			# if placeholder == text of the node, don't include it
+			if attributes_to_include.get('placeholder') and attributes_to_include.get('placeholder', '').strip() == text.strip():
+				del attributes_to_include['placeholder']
+
+			if attributes_to_include:
+				# Format as key1='value1' key2='value2'
+				attributes_html_str = ' '.join(f"{key}='{value}'" for key, value in attributes_to_include.items())
+
+		# Build the line
+		if self.is_new:
+			highlight_indicator = f'*[{self.highlight_index}]*'
+		else:
+			highlight_indicator = f'[{self.highlight_index}]'
+
+		depth_str = depth * '\t'
+		line = f'{depth_str}{highlight_indicator}<{self.tag_name}'
+
+		if attributes_html_str:
+			line += f' {attributes_html_str}'
+
+		if text:
+			# Add space before >text only if there were NO attributes added before
+			if not attributes_html_str:
+				line += ' '
+			line += f'>{text}'
+		# Add space before /> only if neither attributes NOR text were added
+		elif not attributes_html_str:
+			line += ' '
+
+		line += ' />'  # 1 token
+		return line
+
+
+# Tags that fill in or submit forms, preferred over plain links when the prompt has to be cut
+FORM_CONTROL_TAGS = {'button', 'input', 'select', 'textarea', 'option', 'summary', 'label'}
+FORM_CONTROL_ROLES = {'button', 'checkbox', 'radio', 'combobox', 'textbox', 'searchbox', 'switch', 'slider', 'option', 'tab'}
+
+
+def _line_priority(node: DOMBaseNode) -> int:
+	"""Higher is kept first: elements on screen, then new elements, then form controls over links and text."""
+	if not isinstance(node, DOMElementNode):
+		return 0
+	priority = 1
+	if node.is_in_visible_viewport:
+		priority += 8
+	if node.is_new:
+		priority += 4
+	if node.tag_name in FORM_CONTROL_TAGS or node.attributes.get('role') in FORM_CONTROL_ROLES:
+		priority += 2
+	return priority
+
+
+def _fit_lines_to_budget(lines: list[str], line_nodes: list[DOMBaseNode], max_characters: int) -> str:
+	if sum(len(line) + 1 for line in lines) <= max_characters:
+		return '\n'.join(lines)
+
+	# room for the summary line of what was left out
+	remaining = max_characters - 200
+	kept = [False] * len(lines)
+	for line_index in sorted(range(len(lines)), key=lambda i: -_line_priority(line_nodes[i])):
+		line_length = len(lines[line_index]) + 1
+		if line_length <= remaining:
+			kept[line_index] = True
+			remaining -= line_length
+
+	omitted_tags: dict[str, int] = {}
+	omitted_text_lines = 0
+	for line_index, node in enumerate(line_nodes):
+		if kept[line_index]:
+			continue
+		if isinstance(node, DOMElementNode):
+			omitted_tags[node.tag_name] = omitted_tags.get(node.tag_name, 0) + 1
+		else:
+			omitted_text_lines += 1
+
+	omitted = []
+	if omitted_tags:
+		tags = ', '.join(f'{count} <{tag}>' for tag, count in sorted(omitted_tags.items(), key=lambda item: -item[1]))
+		omitted.append(f'{sum(omitted_tags.values())} interactive elements ({tags})')
+	if omitted_text_lines:
+		omitted.append(f'{omitted_text_lines} text lines')
+	summary = f'... {" and ".join(omitted)} omitted to fit the token budget - scroll or extract content to see more ...'
+
+	return '\n'.join([line for line, keep in zip(lines, kept) if keep] + [summary])
 
 
 SelectorMap = dict[int, DOMElementNode]
@@ -241,3 +342,27 @@ SelectorMap = dict[int, DOMElementNode]
 class DOMState:
 	element_tree: DOMElementNode
 	selector_map: SelectorMap
+
+
+@dataclass
+class DOMSnapshotCache:
+	"""
+	Python side of the in-page mutation tracker (see `buildDomTree.js`).
+
+	Holds the last snapshot of a page so that the next one can be patched with the
+	subtrees that changed instead of being rebuilt from scratch.
+	"""
+
+	tracker_id: str | None = None
+	viewport_expansion: int | None = None
+	element_tree: DOMElementNode | None = None
+	selector_map: SelectorMap = field(default_factory=dict)
+	# tracker key -> node built for it, may contain nodes that were since patched out of the tree
+	nodes_by_key: dict[int, DOMElementNode] = field(default_factory=dict)
+
+	def reset(self) -> None:
+		self.tracker_id = None
+		self.viewport_expansion = None
+		self.element_tree = None
+		self.selector_map = {}
+		self.nodes_by_key = {}
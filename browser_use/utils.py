@@ -2,11 +2,12 @@ import asyncio
 import logging
 import os
 import platform
+import re
 import signal
 import time
-from collections.abc import Callable, Coroutine
-from fnmatch import fnmatch
-from functools import wraps
+from collections.abc import Callable, Coroutine, Iterable
+from fnmatch import fnmatch, translate
+from functools import lru_cache, wraps
 from sys import stderr
 from typing import Any, ParamSpec, TypeVar
 from urllib.parse import urlparse
@@ -479,6 +480,143 @@ def match_url_with_domain_pattern(url: str, domain_pattern: str, log_warnings: b
 		return False
 
 
+GLOB_CHARS = ('*', '?', '[')
+
+
+class _HostRules:
+	"""Host side of all the domain patterns sharing one scheme pattern"""
+
+	def __init__(self):
+		self.any_host: str | None = None
+		self.exact: dict[str, str] = {}
+		# reversed host labels of *.example.com patterns, a node holding '.' (never a label) is the end of a pattern
+		self.suffixes: dict[str, dict] = {}
+		self.globs: list[tuple[re.Pattern, str]] = []
+
+	def add_suffix(self, parent_domain: str, domain_pattern: str) -> None:
+		node = self.suffixes
+		for label in reversed(parent_domain.split('.')):
+			node = node.setdefault(label, {})
+		node.setdefault('.', domain_pattern)
+
+	def match(self, domain: str) -> str | None:
+		if domain in self.exact:
+			return self.exact[domain]
+
+		if self.suffixes:
+			node = self.suffixes
+			for label in reversed(domain.split('.')):
+				node = node.get(label)
+				if node is None:
+					break
+				if '.' in node:
+					return node['.']
+
+		for regex, domain_pattern in self.globs:
+			if regex.match(domain):
+				return domain_pattern
+
+		return self.any_host
+
+
+class DomainPatternMatcher:
+	"""
+	A list of domain patterns compiled once, with the same semantics as match_url_with_domain_pattern(). SECURITY CRITICAL.
+
+	Patterns are grouped by scheme pattern, then split into an exact host set, a trie of *.example.com suffixes and
+	a regex fallback for the remaining globs. Decisions for recent urls are cached, use compile_domain_patterns()
+	to also reuse the compiled matcher for the same list of patterns.
+	"""
+
+	def __init__(self, domain_patterns: Iterable[str], log_warnings: bool = False, cache_size: int = 1024):
+		self.domain_patterns = tuple(domain_patterns)
+		self._rules: dict[str, _HostRules] = {}
+		self._scheme_globs: dict[str, re.Pattern] = {}
+		for domain_pattern in self.domain_patterns:
+			self._add(domain_pattern, log_warnings)
+		self.match = lru_cache(maxsize=cache_size)(self._match)
+
+	def _add(self, domain_pattern: str, log_warnings: bool) -> None:
+		# same normalization as match_url_with_domain_pattern()
+		pattern = domain_pattern.lower()
+		if '://' in pattern:
+			pattern_scheme, pattern_domain = pattern.split('://', 1)
+		else:
+			pattern_scheme = 'https'  # Default to matching only https for security
+			pattern_domain = pattern
+		if ':' in pattern_domain and not pattern_domain.startswith(':'):
+			pattern_domain = pattern_domain.split(':', 1)[0]
+
+		rules = self._rules.get(pattern_scheme)
+		if rules is None:
+			rules = self._rules[pattern_scheme] = _HostRules()
+			if any(char in pattern_scheme for char in GLOB_CHARS):
+				self._scheme_globs[pattern_scheme] = re.compile(translate(pattern_scheme))
+
+		if pattern_domain == '*':
+			rules.any_host = rules.any_host or domain_pattern
+			return
+		rules.exact.setdefault(pattern_domain, domain_pattern)
+		if '*' not in pattern_domain:
+			return
+
+		if pattern_domain.count('*.') > 1 or pattern_domain.count('.*') > 1:
+			if log_warnings:
+				logger.error(f'⛔️ Multiple wildcards in pattern=[{domain_pattern}] are not supported')
+			return
+		if pattern_domain.endswith('.*'):
+			if log_warnings:
+				logger.error(f'⛔️ Wildcard TLDs like in pattern=[{domain_pattern}] are not supported for security')
+			return
+		if '*' in pattern_domain.replace('*.', ''):
+			if log_warnings:
+				logger.error(f'⛔️ Only *.domain style patterns are supported, ignoring pattern=[{domain_pattern}]')
+			return
+
+		parent_domain = pattern_domain[2:]
+		if pattern_domain.startswith('*.') and not any(char in parent_domain for char in GLOB_CHARS):
+			# *.example.com matches example.com and anything ending in .example.com
+			rules.add_suffix(parent_domain, domain_pattern)
+			return
+
+		if pattern_domain.startswith('*.'):
+			rules.globs.append((re.compile(translate(parent_domain)), domain_pattern))
+		rules.globs.append((re.compile(translate(pattern_domain)), domain_pattern))
+
+	def _match(self, url: str) -> str | None:
+		"""The pattern matching the url, or None"""
+		if url == 'about:blank':
+			return None
+
+		try:
+			parsed_url = urlparse(url)
+			scheme = parsed_url.scheme.lower() if parsed_url.scheme else ''
+			domain = parsed_url.hostname.lower() if parsed_url.hostname else ''
+		except Exception as e:
+			logger.error(f'⛔️ Error matching URL {url} with patterns {self.domain_patterns}: {type(e).__name__}: {e}')
+			return None
+
+		if not scheme or not domain:
+			return None
+
+		for pattern_scheme, rules in self._rules.items():
+			scheme_glob = self._scheme_globs.get(pattern_scheme)
+			if scheme_glob.match(scheme) if scheme_glob else scheme == pattern_scheme:
+				domain_pattern = rules.match(domain)
+				if domain_pattern is not None:
+					return domain_pattern
+		return None
+
+	def matches(self, url: str) -> bool:
+		return self.match(url) is not None
+
+
+@lru_cache(maxsize=128)
+def compile_domain_patterns(domain_patterns: tuple[str, ...], log_warnings: bool = False) -> DomainPatternMatcher:
+	"""Compiled matcher for a list of domain patterns, shared by all callers using the same patterns"""
+	return DomainPatternMatcher(domain_patterns, log_warnings=log_warnings)
+
+
 def merge_dicts(a: dict, b: dict, path: tuple[str, ...] = ()):
 	for key in b:
 		if key in a:
@@ -57,10 +57,11 @@ async def main():
 		# if current_agent:
 		# 	current_agent.pause()
 
-		await browser_session.create_new_tab()
+		# each agent gets its own tab, current page and cached state, sharing the one browser process
+		tab_session = await browser_session.new_tab_session()
 		current_agent = Agent(
 			task=task,
-			browser_session=browser_session,
+			browser_session=tab_session,
 			llm=llm,
 		)
 